@@ -0,0 +1,31 @@
+"""Analytics module for dashboard computations."""
+
+from .dashboard_queries import (
+    kpi_summary,
+    daily_spending_frame,
+    weekly_spending_frame,
+    anomalies_frame,
+    item_totals_frame,
+    top_items_frame,
+    price_history_frame,
+    price_change_frame,
+    product_summary_frame,
+    store_summary_frame,
+    store_monthly_frame,
+    store_weekday_frame,
+)
+
+__all__ = [
+    "kpi_summary",
+    "daily_spending_frame",
+    "weekly_spending_frame",
+    "anomalies_frame",
+    "item_totals_frame",
+    "top_items_frame",
+    "price_history_frame",
+    "price_change_frame",
+    "product_summary_frame",
+    "store_summary_frame",
+    "store_monthly_frame",
+    "store_weekday_frame",
+]
@@ -0,0 +1,401 @@
+"""Dashboard computations over the storage rollups, item and store dimension, line items and price history."""
+
+from datetime import date, timedelta
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from storage import (
+    query_range,
+    daily_totals,
+    weekly_totals,
+    spending_anomalies,
+    product_prices,
+    product_totals,
+)
+from storage.spending_stats import WEEKLY_WINDOW
+
+
+def kpi_summary(aggregates: Dict[str, Any], start: date, end: date) -> Dict[str, float]:
+    """
+    Compute the KPI figures for a date range from the rollups.
+
+    Args:
+        aggregates: Rollups as returned by storage.load_aggregates
+        start: First day of the range (inclusive)
+        end: Last day of the range (inclusive)
+
+    Returns:
+        dict: Receipt count and amounts in euros
+    """
+    # Rollups store amounts in cents
+    range_totals = query_range(aggregates, start, end)
+    return {
+        "receipts": range_totals["receipts"],
+        "spent": range_totals["total"] / 100,
+        "saved": range_totals["saved"] / 100,
+        "lidlplus": range_totals["lidlplus"] / 100,
+        "sticker": range_totals["sticker"] / 100,
+    }
+
+
+def daily_spending_frame(
+    aggregates: Dict[str, Any], start: date, end: date
+) -> pd.DataFrame:
+    """Build the daily and cumulative spending frame for a date range."""
+    daily_spending = pd.DataFrame(
+        [(day, cents / 100) for day, cents in daily_totals(aggregates, start, end)],
+        columns=["Datum", "Tägliche Ausgaben (€)"],
+    )
+    daily_spending["Kumulative Ausgaben (€)"] = daily_spending[
+        "Tägliche Ausgaben (€)"
+    ].cumsum()
+    return daily_spending
+
+
+def weekly_spending_frame(
+    aggregates: Dict[str, Any], start: date, end: date
+) -> pd.DataFrame:
+    """
+    Build the weekly spending frame with its moving average for a date range.
+
+    Args:
+        aggregates: Rollups as returned by storage.load_aggregates
+        start: First day of the range (inclusive)
+        end: Last day of the range (inclusive)
+
+    Returns:
+        DataFrame: Columns Woche, weekly spending and its WEEKLY_WINDOW-week
+                   moving average (euros), one row per week
+    """
+    # Earlier weeks are included so the average is complete from the first week on
+    weeks = weekly_totals(aggregates, start - timedelta(days=7 * (WEEKLY_WINDOW - 1)), end)
+    weekly = pd.DataFrame(weeks, columns=["Woche", "Wöchentliche Ausgaben (€)"])
+    weekly["Wöchentliche Ausgaben (€)"] /= 100
+    weekly[f"Durchschnitt {WEEKLY_WINDOW} Wochen (€)"] = (
+        weekly["Wöchentliche Ausgaben (€)"].rolling(WEEKLY_WINDOW, min_periods=1).mean()
+    )
+    return weekly.iloc[WEEKLY_WINDOW - 1 :].reset_index(drop=True)
+
+
+def anomalies_frame(aggregates: Dict[str, Any]) -> pd.DataFrame:
+    """
+    List the recent weeks with unusually high or low spending (overall and
+    per store) for display.
+
+    Args:
+        aggregates: Rollups as returned by storage.load_aggregates
+
+    Returns:
+        DataFrame: Display-ready frame with German column names
+    """
+    anomalies = spending_anomalies(aggregates)
+    return pd.DataFrame(
+        {
+            "Woche ab": [anomaly["week"] for anomaly in anomalies],
+            "Filiale": [anomaly["store"] or "Alle Filialen" for anomaly in anomalies],
+            "Ausgaben (€)": [anomaly["cents"] / 100 for anomaly in anomalies],
+            "Üblich (€)": [round(anomaly["mean"] / 100, 2) for anomaly in anomalies],
+            "z-Wert": [round(anomaly["z"], 1) for anomaly in anomalies],
+        }
+    )
+
+
+def item_totals_frame(
+    line_items: np.ndarray, item_dimension: Dict[str, Any], start: date, end: date
+) -> pd.DataFrame:
+    """
+    Sum quantity and value per product for a date range, excluding Pfand items.
+
+    Args:
+        line_items: Line items as returned by storage.load_line_store
+        item_dimension: Item dimension as returned by storage.load_item_dimension
+        start: First day of the range (inclusive)
+        end: Last day of the range (inclusive)
+
+    Returns:
+        DataFrame: Columns name, unit, quantity, total_value (euros), one row per product
+    """
+    products = item_dimension["products"]
+    totals = product_totals(line_items, len(products), start.toordinal(), end.toordinal())
+    selected = np.flatnonzero(totals["lines"])
+    return pd.DataFrame(
+        {
+            "name": [products[key]["name"] for key in selected],
+            "unit": [products[key]["unit"] for key in selected],
+            "quantity": totals["quantity"][selected],
+            "total_value": totals["cents"][selected] / 100,
+        },
+        index=pd.Index(selected, name="product"),
+    )
+
+
+def top_items_frame(items_df: pd.DataFrame, mode: str, n: int = 10) -> pd.DataFrame:
+    """
+    Select the top items for display.
+
+    Args:
+        items_df: Frame as returned by item_totals_frame
+        mode: 'Menge' (by quantity) or 'Gesamtpreis' (by total value)
+        n: Number of items to return
+
+    Returns:
+        DataFrame: Display-ready frame with German column names
+    """
+    if mode == "Menge":
+        grouped = items_df.sort_values("quantity", ascending=False).head(n).copy()
+
+        # Format quantities nicely and add units
+        grouped["Gesamtmenge"] = [
+            f"{quantity:.3f} {unit}" if unit == "kg" else f"{int(quantity)} {unit}"
+            for quantity, unit in zip(grouped["quantity"], grouped["unit"])
+        ]
+        display_df = grouped[["name", "Gesamtmenge"]]
+        display_df.columns = ["Artikel", "Gesamtmenge"]
+        return display_df
+
+    grouped = (
+        items_df[["name", "total_value"]]
+        .sort_values("total_value", ascending=False)
+        .head(n)
+        .copy()
+    )
+    grouped.columns = ["Artikel", "Ausgaben gesamt (€)"]
+    grouped["Ausgaben gesamt (€)"] = grouped["Ausgaben gesamt (€)"].round(2)
+    return grouped
+
+
+def price_history_frame(
+    price_history: Dict[str, Any], product_key: int, start: date, end: date
+) -> pd.DataFrame:
+    """
+    Get the unit prices paid for one product in a date range.
+
+    Args:
+        price_history: Price history as returned by storage.load_price_history
+        product_key: Product key of the item dimension
+        start: First day of the range (inclusive)
+        end: Last day of the range (inclusive)
+
+    Returns:
+        DataFrame: Columns Datum and Preis (€), one row per purchase
+    """
+    days, unit_cents = product_prices(price_history, product_key)
+    first = np.searchsorted(days, start.toordinal(), side="left")
+    last = np.searchsorted(days, end.toordinal(), side="right")
+    return pd.DataFrame(
+        {
+            "Datum": [date.fromordinal(int(day)) for day in days[first:last]],
+            "Preis (€)": unit_cents[first:last] / 100,
+        }
+    )
+
+
+def price_change_frame(
+    price_history: Dict[str, Any],
+    item_dimension: Dict[str, Any],
+    start: date,
+    end: date,
+) -> pd.DataFrame:
+    """
+    Compare the first and last unit price of every product in a date range.
+
+    Products bought only once in the range and deposit items are left out.
+
+    Args:
+        price_history: Price history as returned by storage.load_price_history
+        item_dimension: Item dimension as returned by storage.load_item_dimension
+        start: First day of the range (inclusive)
+        end: Last day of the range (inclusive)
+
+    Returns:
+        DataFrame: Columns product, name, unit, purchases, first_price, last_price
+        (euros) and change (percent)
+    """
+    offsets = price_history["offsets"]
+    days = price_history["day"]
+    product_count = len(offsets) - 1
+
+    # Range bounds of every product slice at once (slices are sorted by day)
+    sort_key = (price_history["product"].astype(np.int64) << 32) | days.astype(np.int64)
+    products = np.arange(product_count, dtype=np.int64)
+    first = np.searchsorted(sort_key, (products << 32) | start.toordinal(), side="left")
+    last = np.searchsorted(sort_key, (products << 32) | end.toordinal(), side="right")
+
+    is_deposit = np.array(
+        [product["is_deposit"] for product in item_dimension["products"][:product_count]],
+        dtype=bool,
+    )
+    selected = np.flatnonzero((last - first >= 2) & ~is_deposit)
+    if not len(selected):
+        return pd.DataFrame(
+            columns=["product", "name", "unit", "purchases", "first_price", "last_price", "change"]
+        )
+
+    unit_cents = price_history["unit_cents"]
+    first_cents = unit_cents[first[selected]]
+    last_cents = unit_cents[last[selected] - 1]
+    return pd.DataFrame(
+        {
+            "product": selected,
+            "name": [item_dimension["products"][key]["name"] for key in selected],
+            "unit": [item_dimension["products"][key]["unit"] for key in selected],
+            "purchases": last[selected] - first[selected],
+            "first_price": first_cents / 100,
+            "last_price": last_cents / 100,
+            "change": np.where(
+                first_cents > 0, (last_cents - first_cents) / np.maximum(first_cents, 1) * 100, 0.0
+            ),
+        }
+    )
+
+
+def product_summary_frame(
+    price_history: Dict[str, Any], item_dimension: Dict[str, Any], product_keys: List[int]
+) -> pd.DataFrame:
+    """
+    Summarize the purchases of the given products (e.g. search results).
+
+    Args:
+        price_history: Price history as returned by storage.load_price_history
+        item_dimension: Item dimension as returned by storage.load_item_dimension
+        product_keys: Product keys in display order
+
+    Returns:
+        DataFrame: Columns product, name, unit, purchases, last_purchase and
+        last_price (euros), one row per product
+    """
+    rows = []
+    for key in product_keys:
+        product = item_dimension["products"][key]
+        days, unit_cents = product_prices(price_history, key)
+        rows.append(
+            {
+                "product": key,
+                "name": product["name"],
+                "unit": product["unit"],
+                "purchases": len(days),
+                "last_purchase": date.fromordinal(int(days[-1])) if len(days) else None,
+                "last_price": unit_cents[-1] / 100 if len(days) else None,
+            }
+        )
+    return pd.DataFrame(
+        rows, columns=["product", "name", "unit", "purchases", "last_purchase", "last_price"]
+    )
+
+
+def _store_visits(
+    store_dimension: Dict[str, Any], store_key: int, start: date, end: date
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Purchase days and totals (cents) of one store's receipts in a date range."""
+    entries = store_dimension["index"][store_key]
+    days = np.asarray(entries["days"], dtype=np.int64)
+    mask = (days >= start.toordinal()) & (days <= end.toordinal())
+    return days[mask], np.asarray(entries["cents"], dtype=np.int64)[mask]
+
+
+def _store_address(info: Dict[str, Any]) -> str:
+    """Format the address of a store object of the API (empty if unknown)."""
+    locality = f"{info.get('postalCode', '')} {info.get('locality', '')}".strip()
+    return ", ".join(part for part in (info.get("address"), locality) if part)
+
+
+def store_summary_frame(store_dimension: Dict[str, Any], start: date, end: date) -> pd.DataFrame:
+    """
+    Summarize the visits of every store in a date range.
+
+    Args:
+        store_dimension: Store dimension as returned by storage.load_store_dimension
+        start: First day of the range (inclusive)
+        end: Last day of the range (inclusive)
+
+    Returns:
+        DataFrame: Columns store, name, address, visits, spend and avg_visit
+        (euros), visits_per_month, avg_gap (days between visits) and
+        last_visit, one row per store visited in the range, most spend first
+    """
+    months = max((end - start).days + 1, 1) / 30.4375
+    rows = []
+    for key, store in enumerate(store_dimension["stores"]):
+        days, cents = _store_visits(store_dimension, key, start, end)
+        if not len(days):
+            continue
+        info = store["info"] or {}
+        visit_days = np.unique(days)
+        rows.append(
+            {
+                "store": key,
+                "name": store["name"],
+                "address": _store_address(info),
+                "visits": len(days),
+                "spend": cents.sum() / 100,
+                "avg_visit": cents.mean() / 100,
+                "visits_per_month": len(days) / months,
+                "avg_gap": float(np.diff(visit_days).mean()) if len(visit_days) > 1 else None,
+                "last_visit": date.fromordinal(int(days.max())),
+            }
+        )
+    columns = [
+        "store",
+        "name",
+        "address",
+        "visits",
+        "spend",
+        "avg_visit",
+        "visits_per_month",
+        "avg_gap",
+        "last_visit",
+    ]
+    return pd.DataFrame(rows, columns=columns).sort_values("spend", ascending=False)
+
+
+def store_monthly_frame(
+    store_dimension: Dict[str, Any], store_keys: List[int], start: date, end: date
+) -> pd.DataFrame:
+    """
+    Get the monthly spending of the given stores in a date range.
+
+    Args:
+        store_dimension: Store dimension as returned by storage.load_store_dimension
+        store_keys: Store keys of the dimension
+        start: First day of the range (inclusive)
+        end: Last day of the range (inclusive)
+
+    Returns:
+        DataFrame: One column per store (its name) with the spending in euros,
+        indexed by month (YYYY-MM)
+    """
+    columns = {}
+    for key in store_keys:
+        days, cents = _store_visits(store_dimension, key, start, end)
+        months = [date.fromordinal(int(day)).isoformat()[:7] for day in days]
+        name = store_dimension["stores"][key]["name"]
+        if name in columns:  # Different stores with the same name
+            name = f"{name} ({key})"
+        columns[name] = pd.Series(cents / 100, index=months, dtype=float).groupby(level=0).sum()
+    return pd.DataFrame(columns).fillna(0.0).sort_index()
+
+
+def store_weekday_frame(
+    store_dimension: Dict[str, Any], store_key: int, start: date, end: date
+) -> pd.DataFrame:
+    """
+    Count the visits of one store per weekday in a date range.
+
+    Args:
+        store_dimension: Store dimension as returned by storage.load_store_dimension
+        store_key: Store key of the dimension
+        start: First day of the range (inclusive)
+        end: Last day of the range (inclusive)
+
+    Returns:
+        DataFrame: Column Besuche indexed by weekday (Mo ... So)
+    """
+    days, _ = _store_visits(store_dimension, store_key, start, end)
+    # Proleptic ordinal 1 (0001-01-01) was a Monday
+    counts = np.bincount((days - 1) % 7, minlength=7) if len(days) else np.zeros(7, dtype=int)
+    weekdays = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
+    # Ordered so charts keep the weekday order instead of sorting by name
+    index = pd.CategoricalIndex(weekdays, categories=weekdays, ordered=True, name="Wochentag")
+    return pd.DataFrame({"Besuche": counts}, index=index)
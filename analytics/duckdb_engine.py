@@ -0,0 +1,182 @@
+"""Optional DuckDB query engine that reads receipt files in place."""
+
+import os
+from datetime import date
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+from storage import partition_paths
+
+try:
+    import duckdb
+except ImportError:  # DuckDB is an optional dependency
+    duckdb = None
+
+DUCKDB_AVAILABLE = duckdb is not None
+
+# Explicit schema for JSON sources; amounts are read as text because they are
+# stored as comma-decimal strings (or numbers for sticker discounts)
+RECEIPT_COLUMNS = {
+    "id": "VARCHAR",
+    "purchase_date": "VARCHAR",
+    "total_price": "VARCHAR",
+    "saved_amount": "VARCHAR",
+    "lidlplus_saved_amount": "VARCHAR",
+    "sticker_discount_amount": "VARCHAR",
+    "store": "VARCHAR",
+    "items": "STRUCT(art_id VARCHAR, name VARCHAR, price VARCHAR, quantity VARCHAR, unit VARCHAR)[]",
+}
+
+
+def _amount(column: str, default: int = 0) -> str:
+    """SQL expression converting a comma-decimal column to DOUBLE (`default` if empty)."""
+    return f"coalesce(try_cast(replace(CAST({column} AS VARCHAR), ',', '.') AS DOUBLE), {default})"
+
+
+class DuckDBEngine:
+    """Run the dashboard queries as SQL directly on JSON, JSONL or Parquet files."""
+
+    def __init__(self, source: str) -> None:
+        """
+        Args:
+            source: Receipt file or glob (e.g. 'lidl_receipts.json', 'receipts/*.parquet')
+        """
+        if not DUCKDB_AVAILABLE:
+            raise ImportError(
+                "DuckDB ist nicht installiert. Installiere es mit 'pip install duckdb'."
+            )
+        self.source = source
+        self._connection = duckdb.connect(database=":memory:")
+
+    def _scan(self, start: Optional[date] = None, end: Optional[date] = None) -> str:
+        """
+        SQL table function reading the source file(s) in place.
+
+        For a receipts file with an archive, only the receipts file and the
+        partitions overlapping the date range are read.
+        """
+        extension = os.path.splitext(self.source)[1].lower()
+        if extension == ".parquet":
+            source = self.source.replace("'", "''")
+            return f"read_parquet('{source}', union_by_name = true)"
+
+        paths = [self.source]
+        if extension == ".json" and not any(char in self.source for char in "*?["):
+            paths = partition_paths(start, end, self.source)
+        files = ", ".join("'{}'".format(path.replace("'", "''")) for path in paths)
+        columns = ", ".join(
+            f"'{name}': '{sql_type}'" for name, sql_type in RECEIPT_COLUMNS.items()
+        )
+        json_format = "newline_delimited" if extension in (".jsonl", ".ndjson") else "auto"
+        return (
+            f"read_json([{files}], format = '{json_format}', "
+            f"columns = {{{columns}}}, filename = true)"
+        )
+
+    def _receipts(self, start: Optional[date] = None, end: Optional[date] = None) -> str:
+        """Receipts with a parsed date and at least one item (as in the rollups)."""
+        hot_file = self.source.replace("'", "''")
+        return f"""
+            SELECT
+                CAST(try_strptime(purchase_date, '%Y.%m.%d') AS DATE) AS day,
+                {_amount("total_price")} AS total,
+                {_amount("saved_amount")} AS saved,
+                {_amount("lidlplus_saved_amount")} AS lidlplus,
+                {_amount("sticker_discount_amount")} AS sticker,
+                items
+            FROM {self._scan(start, end)}
+            WHERE len(items) > 0
+            -- A receipt re-fetched after archiving is taken from the receipts file
+            QUALIFY id IS NULL
+                OR row_number() OVER (PARTITION BY id ORDER BY filename = '{hot_file}' DESC) = 1
+        """
+
+    def _query(self, sql: str, params: List[Any]) -> pd.DataFrame:
+        # A cursor per query keeps the shared connection usable from several threads
+        return self._connection.cursor().execute(sql, params).df()
+
+    def date_bounds(self) -> Any:
+        """Return the first and last purchase day in the source."""
+        row = self._query(
+            f"SELECT min(day) AS first, max(day) AS last FROM ({self._receipts()}) WHERE day IS NOT NULL",
+            [],
+        ).iloc[0]
+        if pd.isna(row["first"]):
+            return None
+        return pd.Timestamp(row["first"]).date(), pd.Timestamp(row["last"]).date()
+
+    def kpi_summary(self, start: date, end: date) -> Dict[str, float]:
+        """Compute the KPI figures for a date range (same shape as analytics.kpi_summary)."""
+        row = self._query(
+            f"""
+            SELECT count(*) AS receipts, coalesce(sum(total), 0) AS spent,
+                   coalesce(sum(saved), 0) AS saved, coalesce(sum(lidlplus), 0) AS lidlplus,
+                   coalesce(sum(sticker), 0) AS sticker
+            FROM ({self._receipts(start, end)})
+            WHERE day BETWEEN ? AND ?
+            """,
+            [start, end],
+        ).iloc[0]
+        return {
+            "receipts": int(row["receipts"]),
+            "spent": round(float(row["spent"]), 2),
+            "saved": round(float(row["saved"]), 2),
+            "lidlplus": round(float(row["lidlplus"]), 2),
+            "sticker": round(float(row["sticker"]), 2),
+        }
+
+    def daily_spending_frame(self, start: date, end: date) -> pd.DataFrame:
+        """Build the daily and cumulative spending frame for a date range."""
+        return self._query(
+            f"""
+            SELECT day AS "Datum",
+                   round(sum(total), 2) AS "Tägliche Ausgaben (€)",
+                   round(sum(sum(total)) OVER (ORDER BY day), 2) AS "Kumulative Ausgaben (€)"
+            FROM ({self._receipts(start, end)})
+            WHERE day BETWEEN ? AND ?
+            GROUP BY day
+            ORDER BY day
+            """,
+            [start, end],
+        )
+
+    def item_totals_frame(self, start: date, end: date, limit: int = None) -> pd.DataFrame:
+        """
+        Sum quantity and value per product for a date range, excluding Pfand items.
+
+        Args:
+            start: First day of the range (inclusive)
+            end: Last day of the range (inclusive)
+            limit: Only return the `limit` products with the highest quantity and
+                   the `limit` products with the highest value
+
+        Returns:
+            DataFrame: Columns name, unit, quantity, total_value (euros)
+        """
+        sql = f"""
+            WITH lines AS (
+                SELECT unnest(items) AS item
+                FROM ({self._receipts(start, end)})
+                WHERE day BETWEEN ? AND ?
+            ),
+            products AS (
+                SELECT any_value(item.name) AS name,
+                       any_value(coalesce(item.unit, 'stk')) AS unit,
+                       sum({_amount("item.quantity", 1)}) AS quantity,
+                       round(sum({_amount("item.price")} * {_amount("item.quantity", 1)}), 2) AS total_value
+                FROM lines
+                WHERE NOT contains(lower(item.name), 'pfand')
+                GROUP BY coalesce(item.art_id, ''), lower(trim(item.name))
+            )
+        """
+        if limit is None:
+            return self._query(f"{sql} SELECT * FROM products", [start, end])
+        return self._query(
+            f"""{sql}
+            (SELECT * FROM products ORDER BY quantity DESC LIMIT {int(limit)})
+            UNION
+            (SELECT * FROM products ORDER BY total_value DESC LIMIT {int(limit)})
+            """,
+            [start, end],
+        )
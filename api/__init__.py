@@ -1,8 +1,25 @@
 """API client module for shopping analyzer."""
 
-from .lidl_client import get_tickets_page, get_receipt_details_and_html
+import importlib
 
-__all__ = [
-    "get_tickets_page",
-    "get_receipt_details_and_html",
-]
+# Submodules are only imported on first attribute access (PEP 562) so that
+# e.g. `get_data.py --help` does not load requests, bs4 or browser_cookie3.
+_EXPORTS = {
+    "get_tickets_page": ".lidl_client",
+    "get_receipt_details_and_html": ".lidl_client",
+    "fetch_receipt_source": ".lidl_client",
+    "fetch_receipt_source_paced": ".lidl_client",
+    "parse_receipt_source": ".lidl_client",
+    "fetch_and_parse_receipts": ".pipeline",
+    "RequestPacer": ".pacing",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
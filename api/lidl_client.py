@@ -1,15 +1,20 @@
 """Lidl API client for fetching receipt data."""
 
 import json
+import time
 from typing import Optional, Dict, Any
 import requests
 
-from config import LidlConfig
-from parsing import parse_receipt_html
+import parsing
+from config import LidlProfile, resolve_profile
+from metrics import METRICS
+from profiling import PARSE_TRACER
+from storage import save_receipt_source, source_hash
+from .pacing import RequestPacer, THROTTLE_RETRIES
 
 
 def get_tickets_page(
-    session: requests.Session, page: int = 1
+    session: requests.Session, page: int = 1, profile: Optional[LidlProfile] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Fetch tickets for a specific page using the API.
@@ -17,14 +22,20 @@ def get_tickets_page(
     Args:
         session: requests.Session with authentication
         page: Page number to fetch
+        profile: Account profile. If None, uses the settings from config.
 
     Returns:
         dict: API response data or None if error
     """
+    profile = resolve_profile(profile)
     try:
-        response = session.get(
-            f"{LidlConfig.get_tickets_url()}?country={LidlConfig.get_country_code()}&page={page}",
-            timeout=LidlConfig.DEFAULT_TIMEOUT,
+        with METRICS.timer("page_fetch_seconds", "Latency of tickets page requests"):
+            response = session.get(
+                f"{profile.get_tickets_url()}?country={profile.get_country_code()}&page={page}",
+                timeout=profile.timeout,
+            )
+        METRICS.counter("bytes_downloaded_total", "Response bytes downloaded").inc(
+            len(response.content)
         )
         response.raise_for_status()
 
@@ -47,6 +58,7 @@ def get_tickets_page(
             return None
 
     except requests.exceptions.HTTPError as e:
+        METRICS.counter("http_errors_total", "Failed API requests").inc()
         if e.response.status_code == 401:
             print(f"✗ Nicht autorisiert beim Abrufen der Tickets-Seite {page}")
             print(
@@ -56,6 +68,7 @@ def get_tickets_page(
             print(f"✗ HTTP-Fehler beim Abrufen der Tickets-Seite {page}: {e}")
         return None
     except requests.exceptions.RequestException as e:
+        METRICS.counter("http_errors_total", "Failed API requests").inc()
         print(f"✗ Fehler beim Abrufen der Tickets-Seite {page}: {e}")
         return None
     except json.JSONDecodeError as e:
@@ -63,24 +76,47 @@ def get_tickets_page(
         return None
 
 
-def get_receipt_details_and_html(
-    session: requests.Session, receipt_id: str
+def fetch_receipt_source(
+    session: requests.Session,
+    receipt_id: str,
+    profile: Optional[LidlProfile] = None,
+    pacer: Optional[RequestPacer] = None,
 ) -> Optional[Dict[str, Any]]:
     """
-    Fetch receipt details and HTML content for a specific receipt.
+    Fetch the ticket fields and HTML content of a specific receipt.
 
     Args:
         session: requests.Session with authentication
         receipt_id: Receipt ID to fetch
+        profile: Account profile. If None, uses the settings from config.
+        pacer: Adaptive pacing that is told the status and latency of the request
 
     Returns:
-        dict: Parsed receipt data or None if error
+        dict: Source with 'id', 'date', 'totalAmount', 'store' (name), 'store_info'
+              (store object or None) and 'html', or None if error
     """
+    profile = resolve_profile(profile)
     try:
-        url = LidlConfig.get_receipt_url(receipt_id)
-        full_url = f"{url}?country={LidlConfig.get_country_code()}&languageCode={LidlConfig.get_language_code()}"
+        url = profile.get_receipt_url(receipt_id)
+        full_url = f"{url}?country={profile.get_country_code()}&languageCode={profile.get_language_code()}"
 
-        response = session.get(full_url, timeout=LidlConfig.DEFAULT_TIMEOUT)
+        request_start = time.perf_counter()
+        try:
+            with METRICS.timer("receipt_fetch_seconds", "Latency of receipt detail requests"):
+                response = session.get(full_url, timeout=profile.timeout)
+        except requests.exceptions.RequestException:
+            if pacer is not None:
+                pacer.record(None, time.perf_counter() - request_start)
+            raise
+        if pacer is not None:
+            pacer.record(
+                response.status_code,
+                time.perf_counter() - request_start,
+                response.headers.get("Retry-After"),
+            )
+        METRICS.counter("bytes_downloaded_total", "Response bytes downloaded").inc(
+            len(response.content)
+        )
         response.raise_for_status()
 
         data = response.json()
@@ -91,13 +127,12 @@ def get_receipt_details_and_html(
         else:
             ticket_data = data
 
-        # Extract basic info
-        receipt_date = ticket_data["date"][:10].replace("-", ".")
-        total_amount = ticket_data["totalAmount"]
-
-        # Handle store info (could be nested or direct)
+        # Handle store info (could be nested or direct); the full store
+        # object (ID, address) is kept for the store dimension
+        store_info = None
         if isinstance(ticket_data.get("store"), dict):
-            store = ticket_data["store"].get("name", "Unknown")
+            store_info = ticket_data["store"]
+            store = store_info.get("name", "Unknown")
         else:
             store = ticket_data.get("store", "Unknown")
 
@@ -108,14 +143,17 @@ def get_receipt_details_and_html(
             print(f"  Kein HTML-Inhalt gefunden für receipt_id: {receipt_id}")
             return None
 
-        # Parse the HTML receipt from the API
-        parsed_data = parse_receipt_html(
-            html_content, receipt_id, receipt_date, total_amount, store
-        )
-
-        return parsed_data
+        return {
+            "id": receipt_id,
+            "date": ticket_data["date"],
+            "totalAmount": ticket_data["totalAmount"],
+            "store": store,
+            "store_info": store_info,
+            "html": html_content,
+        }
 
     except requests.exceptions.HTTPError as e:
+        METRICS.counter("http_errors_total", "Failed API requests").inc()
         if e.response.status_code == 401:
             print(f"  Nicht autorisiert beim Abrufen von receipt_id: {receipt_id}")
             print(
@@ -125,8 +163,120 @@ def get_receipt_details_and_html(
             print(f"  HTTP-Fehler beim Abrufen: {e}")
         return None
     except requests.exceptions.RequestException as e:
+        METRICS.counter("http_errors_total", "Failed API requests").inc()
         print(f"  Fehler beim Abrufen: {e}")
         return None
     except Exception as e:
         print(f"  Unerwarteter Fehler: {e}")
         return None
+
+
+def parse_receipt_source(source: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parse a receipt source (as returned by fetch_receipt_source).
+
+    The parsed receipt carries the hash of its HTML and the parser version,
+    so later runs can tell whether it is up to date.
+
+    Args:
+        source: Receipt source with ticket fields and HTML
+
+    Returns:
+        dict: Parsed receipt data
+    """
+    html_content = source["html"]
+    receipt_id = source["id"]
+
+    # Parse the HTML receipt from the API
+    # Accessed through the package so bs4 is only loaded once a receipt is parsed
+    parse_start = time.perf_counter()
+    parsed_data = parsing.parse_receipt_html(
+        html_content,
+        receipt_id,
+        source["date"][:10].replace("-", "."),
+        source["totalAmount"],
+        source["store"],
+    )
+    parse_seconds = time.perf_counter() - parse_start
+    METRICS.histogram("parse_seconds", "Total parse time per receipt").observe(
+        parse_seconds
+    )
+    PARSE_TRACER.record(
+        receipt_id,
+        parse_seconds,
+        html_bytes=len(html_content),
+        items=len(parsed_data.get("items", [])),
+    )
+
+    # Sources cached before store objects were kept lack the field
+    if "store_info" in source:
+        parsed_data["store_info"] = source["store_info"]
+    parsed_data["source_hash"] = source_hash(html_content)
+    parsed_data["parser_version"] = parsing.PARSER_VERSION
+    return parsed_data
+
+
+def fetch_receipt_source_paced(
+    session: requests.Session,
+    receipt_id: str,
+    pacer: RequestPacer,
+    profile: Optional[LidlProfile] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Fetch a receipt source at the pace of the server, repeating overloaded requests.
+
+    Waits for the pacer before every attempt; a request answered with 429/5xx
+    (or without response) is repeated up to THROTTLE_RETRIES times.
+
+    Args:
+        session: requests.Session with authentication
+        receipt_id: Receipt ID to fetch
+        pacer: Adaptive request pacing
+        profile: Account profile. If None, uses the settings from config.
+
+    Returns:
+        dict: Source as returned by fetch_receipt_source, or None if error
+    """
+    for _ in range(THROTTLE_RETRIES + 1):
+        pacer.wait()
+        source = fetch_receipt_source(session, receipt_id, profile, pacer)
+        if source is not None or not pacer.throttled:
+            return source
+    return None
+
+
+def get_receipt_details_and_html(
+    session: requests.Session,
+    receipt_id: str,
+    profile: Optional[LidlProfile] = None,
+    pacer: Optional[RequestPacer] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Fetch receipt details and HTML content for a specific receipt.
+
+    The source is kept in the source cache, so the receipt can be re-parsed
+    later (e.g. after a parser upgrade) without fetching it again.
+
+    Args:
+        session: requests.Session with authentication
+        receipt_id: Receipt ID to fetch
+        profile: Account profile. If None, uses the settings from config.
+        pacer: Adaptive pacing to wait for before fetching (see fetch_receipt_source_paced)
+
+    Returns:
+        dict: Parsed receipt data or None if error
+    """
+    profile = resolve_profile(profile)
+    if pacer is None:
+        source = fetch_receipt_source(session, receipt_id, profile)
+    else:
+        source = fetch_receipt_source_paced(session, receipt_id, pacer, profile)
+    if source is None:
+        return None
+    save_receipt_source(source, profile.receipts_file)
+
+    try:
+        return parse_receipt_source(source)
+    except Exception as e:
+        print(f"  Unerwarteter Fehler: {e}")
+        return None
@@ -0,0 +1,124 @@
+"""Adaptive pacing of receipt requests (additive increase, multiplicative decrease)."""
+
+import time
+from typing import Optional
+
+from config import LidlProfile, resolve_profile
+from metrics import METRICS
+
+# Requests per second added after every healthy response
+RATE_INCREASE = 0.25
+
+# Rate factor after a 429/5xx response or a failed connection
+ERROR_BACKOFF = 0.5
+
+# Rate factor after a response much slower than the usual latency
+LATENCY_BACKOFF = 0.75
+
+# A response slower than this multiple of the usual latency (plus the slack,
+# so jitter of very fast responses is ignored) counts as overload
+LATENCY_FACTOR = 2.0
+LATENCY_SLACK = 0.05
+
+# Weight of the newest response in the usual latency (moving average)
+LATENCY_WEIGHT = 0.2
+
+# Lowest rate the pacing backs off to (requests per second)
+MIN_RATE = 0.2
+
+# Longest Retry-After pause that is honoured (seconds)
+MAX_RETRY_AFTER = 60.0
+
+# Repetitions of a request that failed due to server load (429/5xx)
+THROTTLE_RETRIES = 2
+
+
+class RequestPacer:
+    """
+    Pace sequential requests by the observed server responses.
+
+    The rate starts at one request per `request_delay` and grows by
+    RATE_INCREASE after every healthy response up to `max_rate`. A 429/5xx
+    response or a failed connection halves it (and a Retry-After header
+    pauses all requests), a response much slower than the usual latency
+    lowers it by a quarter.
+    """
+
+    def __init__(self, max_rate: float, request_delay: float = 0.0) -> None:
+        self.max_rate = max(max_rate, MIN_RATE)
+        start_rate = 1.0 / request_delay if request_delay > 0 else self.max_rate
+        self.rate = min(max(start_rate, MIN_RATE), self.max_rate)
+        self.peak_rate = self.rate
+        self.latency: Optional[float] = None
+        self.backoffs = 0
+        self.requests = 0
+        self.throttled = False  # the last request failed due to server load
+        self._last_start: Optional[float] = None
+        self._paused_until = 0.0
+
+    @classmethod
+    def from_profile(cls, profile: Optional[LidlProfile] = None) -> "RequestPacer":
+        """Create a pacer with the ceiling and starting pause of a profile."""
+        profile = resolve_profile(profile)
+        return cls(profile.max_request_rate, profile.request_delay)
+
+    def wait(self) -> None:
+        """Sleep until the next request may start."""
+        now = time.monotonic()
+        ready = self._paused_until
+        if self._last_start is not None:
+            ready = max(ready, self._last_start + 1.0 / self.rate)
+        METRICS.sleep(ready - now)
+        self._last_start = time.monotonic()
+        self.requests += 1
+        METRICS.histogram("request_rate", "Receipt request rate of the adaptive pacing (1/s)").observe(
+            self.rate
+        )
+
+    def record(
+        self, status: Optional[int], seconds: float, retry_after: Optional[str] = None
+    ) -> None:
+        """
+        Adjust the rate to the outcome of a request.
+
+        Args:
+            status: HTTP status code, or None if no response was received
+            seconds: Duration of the request
+            retry_after: Retry-After header of the response, if any
+        """
+        self.throttled = status is None or status == 429 or status >= 500
+        if self.throttled:
+            self._back_off(ERROR_BACKOFF)
+            try:
+                pause = min(float(retry_after), MAX_RETRY_AFTER) if retry_after else 0.0
+            except ValueError:  # HTTP date instead of seconds
+                pause = 0.0
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            return
+        if status >= 400:
+            # Client errors (e.g. 401, 404) say nothing about the server load
+            return
+
+        if self.latency is not None and seconds > LATENCY_FACTOR * self.latency + LATENCY_SLACK:
+            self._back_off(LATENCY_BACKOFF)
+        else:
+            self.rate = min(self.rate + RATE_INCREASE, self.max_rate)
+            self.peak_rate = max(self.peak_rate, self.rate)
+        # The usual latency follows lasting changes, so a slower server is
+        # only treated as overloaded until its new latency is learnt
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += LATENCY_WEIGHT * (seconds - self.latency)
+
+    def _back_off(self, factor: float) -> None:
+        self.rate = max(self.rate * factor, MIN_RATE)
+        self.backoffs += 1
+        METRICS.counter("pacing_backoffs_total", "Rate reductions of the adaptive pacing").inc()
+
+    def summary(self) -> str:
+        """Describe the reached rate for the end of a run."""
+        return (
+            f"Anfragerate: bis zu {self.peak_rate:.1f}/s (Obergrenze {self.max_rate:.1f}/s), "
+            f"zuletzt {self.rate:.1f}/s, {self.backoffs}x gedrosselt"
+        )
@@ -0,0 +1,194 @@
+"""Receipt download overlapped with parsing in a pool of worker processes."""
+
+import contextvars
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+import requests
+
+from config import LidlProfile, resolve_profile
+from metrics import METRICS
+from profiling import PARSE_TRACER
+from storage import save_receipt_source
+from .lidl_client import fetch_receipt_source_paced, parse_receipt_source, get_receipt_details_and_html
+from .pacing import RequestPacer
+
+# Fetched receipts that may wait for their parse result, per parse worker.
+# When the parsers fall behind, the fetch thread blocks (backpressure).
+QUEUE_SIZE_PER_WORKER = 2
+
+# Parse pools by number of workers, shared by all runs of the process
+# (e.g. the accounts of a batch run)
+_POOLS: Dict[int, ProcessPoolExecutor] = {}
+_POOLS_LOCK = threading.Lock()
+
+_DONE = object()
+
+
+def parse_worker_count(profile: Optional[LidlProfile] = None) -> int:
+    """Get the number of parse worker processes (0 parses on the fetching thread)."""
+    profile = resolve_profile(profile)
+    if profile.parse_workers is None:
+        return os.cpu_count() or 1
+    return max(profile.parse_workers, 0)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    with _POOLS_LOCK:
+        pool = _POOLS.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            # With the fork start method all workers are started by the first
+            # task, so they are forked here and not next to the fetch thread
+            pool.submit(int).result()
+            _POOLS[workers] = pool
+        return pool
+
+
+def _discard_pool(workers: int) -> None:
+    with _POOLS_LOCK:
+        pool = _POOLS.pop(workers, None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _parse_in_worker(
+    source: Dict[str, Any],
+) -> Tuple[Dict[str, Any], float, List[Tuple[str, str, float]]]:
+    # Metrics recorded inside the worker process are lost, so its timings
+    # (parse_seconds and the stages parse_soup_seconds, ...) are returned and
+    # recorded by the calling process. The worker's registry is emptied
+    # first, so it only holds the observations of this receipt.
+    METRICS.reset()
+    start = time.perf_counter()
+    receipt_data = parse_receipt_source(source)
+    parse_seconds = time.perf_counter() - start
+    stages = [
+        (histogram.name, histogram.description, histogram.sum)
+        for histogram in METRICS.histograms.values()
+    ]
+    return receipt_data, parse_seconds, stages
+
+
+def fetch_and_parse_receipts(
+    session: requests.Session,
+    receipt_ids: Iterable[str],
+    profile: Optional[LidlProfile] = None,
+    pacer: Optional[RequestPacer] = None,
+) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    """
+    Fetch and parse receipts, overlapping network waits with parsing.
+
+    A fetch thread downloads the receipts one after another (paced by the
+    server's responses, see RequestPacer) and keeps their sources in the
+    source cache, while a process pool with one worker per core parses them.
+    Only a bounded number of fetched receipts may wait for parsing; if the
+    parsers fall behind, downloading pauses.
+
+    Args:
+        session: requests.Session with authentication
+        receipt_ids: Receipt IDs to fetch
+        profile: Account profile. If None, uses the settings from config.
+        pacer: Request pacing, e.g. to report the reached rate afterwards.
+               If None, a new one is created from the profile.
+
+    Yields:
+        tuple: (receipt ID, parsed receipt data or None if fetching or parsing
+               failed), in the order of receipt_ids
+    """
+    profile = resolve_profile(profile)
+    receipt_ids = list(receipt_ids)
+    workers = parse_worker_count(profile)
+    if pacer is None:
+        pacer = RequestPacer.from_profile(profile)
+
+    if workers == 0:
+        for receipt_id in receipt_ids:
+            yield receipt_id, get_receipt_details_and_html(session, receipt_id, profile, pacer)
+        return
+    if not receipt_ids:
+        return
+
+    pool = _get_pool(workers)
+    pending: queue.Queue = queue.Queue(maxsize=workers * QUEUE_SIZE_PER_WORKER)
+    stop = threading.Event()
+    errors: List[BaseException] = []
+
+    def put(entry: Any) -> bool:
+        # Stop waiting for a free slot once the consumer is gone
+        while not stop.is_set():
+            try:
+                pending.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def fetch_all() -> None:
+        try:
+            for receipt_id in receipt_ids:
+                if stop.is_set():
+                    return
+
+                source = fetch_receipt_source_paced(session, receipt_id, pacer, profile)
+                if source is None:
+                    entry = (receipt_id, None, 0)
+                else:
+                    save_receipt_source(source, profile.receipts_file)
+                    entry = (receipt_id, pool.submit(_parse_in_worker, source), len(source["html"]))
+                if not put(entry):
+                    return
+        except BaseException as e:  # re-raised in the consuming thread
+            errors.append(e)
+        finally:
+            put(_DONE)
+
+    # Run in the caller's context, so its messages keep e.g. a batch run's account prefix
+    fetcher = threading.Thread(
+        target=contextvars.copy_context().run, args=(fetch_all,), name="receipt-fetcher", daemon=True
+    )
+    fetcher.start()
+    try:
+        while True:
+            entry = pending.get()
+            if entry is _DONE:
+                break
+            receipt_id, future, html_bytes = entry
+            if future is None:
+                yield receipt_id, None
+                continue
+
+            try:
+                receipt_data, parse_seconds, stages = future.result()
+            except BrokenProcessPool as e:
+                # A worker died (e.g. killed); the next run starts a new pool
+                _discard_pool(workers)
+                print(f"  Unerwarteter Fehler: {e}")
+                receipt_data = None
+            except Exception as e:
+                print(f"  Unerwarteter Fehler: {e}")
+                receipt_data = None
+            else:
+                for name, description, seconds in stages:
+                    METRICS.histogram(name, description).observe(seconds)
+                PARSE_TRACER.record(
+                    receipt_id,
+                    parse_seconds,
+                    html_bytes=html_bytes,
+                    items=len(receipt_data.get("items", [])),
+                )
+            yield receipt_id, receipt_data
+    finally:
+        stop.set()
+        fetcher.join()
+        while not pending.empty():
+            entry = pending.get_nowait()
+            if entry is not _DONE and entry[1] is not None:
+                entry[1].cancel()
+
+    if errors:
+        raise errors[0]
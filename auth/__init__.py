@@ -1,12 +1,25 @@
 """Authentication module for shopping analyzer."""
 
-from .browser_auth import extract_browser_cookies
-from .file_auth import load_cookies_from_file
-from .session_manager import setup_and_test_session, test_api_connection
-
-__all__ = [
-    "extract_browser_cookies",
-    "load_cookies_from_file",
-    "setup_and_test_session",
-    "test_api_connection",
-]
+import importlib
+
+# Submodules are only imported on first attribute access (PEP 562) so that
+# e.g. `get_data.py --help` does not load requests, bs4 or browser_cookie3.
+_EXPORTS = {
+    "extract_browser_cookies": ".browser_auth",
+    "load_cookies_from_file": ".file_auth",
+    "setup_and_test_session": ".session_manager",
+    "test_api_connection": ".session_manager",
+    "load_cookie_cache": ".cookie_cache",
+    "save_cookie_cache": ".cookie_cache",
+    "clear_cookie_cache": ".cookie_cache",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,27 +1,31 @@
 """Browser cookie extraction for authentication."""
 
 import requests
-import browser_cookie3
 
-from config import LidlConfig
+from config import LidlConfig, resolve_profile
 
 
-def extract_browser_cookies(browser="firefox"):
+def extract_browser_cookies(browser="firefox", profile=None):
     """
     Extract authentication cookies from browser for Lidl website.
 
     Args:
         browser: Browser to extract cookies from ('firefox', 'chrome', or 'chromium')
+        profile: Account profile. If None, uses the settings from config.
 
     Returns:
         requests.Session: Session with Lidl authentication cookies
     """
     browser_name = LidlConfig.SUPPORTED_BROWSERS.get(browser, browser)
-    cookie_domain = LidlConfig.get_cookie_domain()
+    cookie_domain = resolve_profile(profile).get_cookie_domain()
 
     print(f"Extrahiere Cookies für {cookie_domain} aus {browser_name} Browser...")
 
     try:
+        # Imported here: browser_cookie3 pulls in its crypto/keyring dependencies,
+        # which are not needed for cookie-file or cached-cookie runs
+        import browser_cookie3
+
         # Load cookies from specified browser
         if browser == "firefox":
             cookies = browser_cookie3.firefox(domain_name=cookie_domain)
@@ -43,6 +47,7 @@ def extract_browser_cookies(browser="firefox"):
                     value=cookie.value,
                     secure=cookie.secure,
                     path=cookie.path,
+                    expires=cookie.expires,
                 )
             )
 
@@ -0,0 +1,127 @@
+"""Local cookie-jar cache to avoid browser cookie extraction on every run."""
+
+import os
+import json
+import time
+from typing import Optional
+import requests
+
+from config import LidlProfile, resolve_profile
+
+
+def _cookie_cache_path(file_path: Optional[str], profile: LidlProfile) -> str:
+    return file_path or profile.cookie_cache_file
+
+
+def save_cookie_cache(
+    session: requests.Session,
+    browser: str,
+    file_path: Optional[str] = None,
+    profile: Optional[LidlProfile] = None,
+) -> None:
+    """
+    Store the session cookies in a cache file only readable by the current user.
+
+    Args:
+        session: requests.Session with validated authentication cookies
+        browser: Browser the cookies were extracted from
+        file_path: Path to the cache file. If None, uses the profile's cache file.
+        profile: Account profile. If None, uses the settings from config.
+    """
+    profile = resolve_profile(profile)
+    file_path = _cookie_cache_path(file_path, profile)
+    cache_data = {
+        "browser": browser,
+        "cookie_domain": profile.get_cookie_domain(),
+        "saved_at": time.time(),
+        "cookies": [
+            {
+                "domain": cookie.domain,
+                "name": cookie.name,
+                "value": cookie.value,
+                "path": cookie.path,
+                "secure": cookie.secure,
+                "expires": cookie.expires,
+            }
+            for cookie in session.cookies
+        ],
+    }
+
+    try:
+        # Create the file with 0600 permissions before any secret is written
+        temp_path = f"{file_path}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(cache_data, file)
+        os.chmod(temp_path, 0o600)
+        os.replace(temp_path, file_path)
+    except OSError as e:
+        print(f"⚠ Cookie-Cache konnte nicht gespeichert werden: {e}")
+
+
+def load_cookie_cache(
+    browser: str,
+    file_path: Optional[str] = None,
+    profile: Optional[LidlProfile] = None,
+) -> Optional[requests.Session]:
+    """
+    Load cached cookies for a browser if the cache is recent and not expired.
+
+    Args:
+        browser: Browser the cookies must have been extracted from
+        file_path: Path to the cache file. If None, uses the profile's cache file.
+        profile: Account profile. If None, uses the settings from config.
+
+    Returns:
+        requests.Session: Session with cached cookies, or None if no usable cache
+    """
+    profile = resolve_profile(profile)
+    file_path = _cookie_cache_path(file_path, profile)
+    if not os.path.exists(file_path):
+        return None
+
+    try:
+        with open(file_path, "r", encoding="utf-8") as file:
+            cache_data = json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    now = time.time()
+    if (
+        cache_data.get("browser") != browser
+        or cache_data.get("cookie_domain") != profile.get_cookie_domain()
+        or now - cache_data.get("saved_at", 0) > profile.cookie_cache_max_age
+    ):
+        return None
+
+    session = requests.Session()
+    for cookie_data in cache_data.get("cookies", []):
+        expires = cookie_data.get("expires")
+        if expires is not None and expires <= now:
+            continue
+        session.cookies.set_cookie(
+            requests.cookies.create_cookie(
+                domain=cookie_data["domain"],
+                name=cookie_data["name"],
+                value=cookie_data["value"],
+                path=cookie_data.get("path", "/"),
+                secure=cookie_data.get("secure", False),
+                expires=expires,
+            )
+        )
+
+    if len(session.cookies) == 0:
+        return None
+
+    print(f"✓ {len(session.cookies)} Cookies aus dem Cookie-Cache geladen")
+    return session
+
+
+def clear_cookie_cache(
+    file_path: Optional[str] = None, profile: Optional[LidlProfile] = None
+) -> None:
+    """Delete the cookie cache file if it exists."""
+    try:
+        os.remove(_cookie_cache_path(file_path, resolve_profile(profile)))
+    except FileNotFoundError:
+        pass
@@ -5,10 +5,12 @@ import json
 from typing import Optional
 import requests
 
-from config import LidlConfig
+from config import LidlConfig, LidlProfile, resolve_profile
 
 
-def load_cookies_from_file(file_path: Optional[str] = None) -> Optional[requests.Session]:
+def load_cookies_from_file(
+    file_path: Optional[str] = None, profile: Optional[LidlProfile] = None
+) -> Optional[requests.Session]:
     """
     Load authentication cookies from a JSON file (e.g., exported from EditThisCookie).
     
@@ -17,12 +19,14 @@ def load_cookies_from_file(file_path: Optional[str] = None) -> Optional[requests
     
     Args:
         file_path: Path to the cookie JSON file. If None, uses default from config.
+        profile: Account profile (selects the cookie domain). If None, uses config.
     
     Returns:
         requests.Session: Session with loaded cookies, or None if error
     """
     if file_path is None:
         file_path = LidlConfig.COOKIES_JSON_FILE
+    cookie_domain = resolve_profile(profile).get_cookie_domain()
     
     print(f"Lade Cookies aus Datei: {file_path}...")
     
@@ -56,9 +60,9 @@ def load_cookies_from_file(file_path: Optional[str] = None) -> Optional[requests
         # Add cookies to session
         cookie_count = 0
         for cookie_data in cookies_list:
-            # Skip cookies not for lidl.de domain
+            # Skip cookies not for the profile's Lidl domain
             domain = cookie_data.get('domain', '')
-            if 'lidl.de' not in domain:
+            if cookie_domain not in domain:
                 continue
             
             # Create cookie with available fields
@@ -75,7 +79,7 @@ def load_cookies_from_file(file_path: Optional[str] = None) -> Optional[requests
             cookie_count += 1
         
         if cookie_count == 0:
-            print("✗ Keine Cookies für lidl.de in der Datei gefunden.")
+            print(f"✗ Keine Cookies für {cookie_domain} in der Datei gefunden.")
             return None
         
         print(f"✓ Erfolgreich {cookie_count} Cookies aus Datei geladen")
@@ -1,97 +1,168 @@
 """Session management and API connection testing."""
 
 import json
-from typing import Optional
+from typing import Optional, Dict, Any, Tuple
 import requests
 
-from config import LidlConfig
+from config import LidlProfile, resolve_profile
+from metrics import METRICS
 from cli.prompts import select_auth_method
 from .file_auth import load_cookies_from_file
 from .browser_auth import extract_browser_cookies
+from .cookie_cache import load_cookie_cache, save_cookie_cache, clear_cookie_cache
+
+# Responses that reject the cookies (expired or logged out session)
+AUTH_ERROR_CODES = (401, 403)
 
 
 def setup_and_test_session(
     auth_method: Optional[str] = None,
     cookies_file: Optional[str] = None,
-) -> Optional[requests.Session]:
+    profile: Optional[LidlProfile] = None,
+) -> Tuple[Optional[requests.Session], Optional[Dict[str, Any]]]:
     """
     Common setup logic for both initial_setup and update_data.
     Handles browser selection, cookie extraction, and API testing.
 
+    The API test fetches the first tickets page; it is returned so that the
+    workflows don't need to request it again.
+
     Args:
         auth_method: Authentication method - 'firefox', 'chrome', 'chromium', or 'file'.
-                     If None, prompts user interactively.
+                     If None, uses the profile's method or prompts user interactively.
         cookies_file: Path to cookies file (only used when auth_method is 'file').
+        profile: Account profile. If None, uses the settings from config.
 
     Returns:
-        requests.Session: Authenticated session if successful, None otherwise
+        tuple: (authenticated session, first tickets page), or (None, None) on failure
     """
-    # Use provided auth_method or prompt user interactively
+    profile = resolve_profile(profile)
+
+    # Use provided auth_method (or the profile's) or prompt user interactively
+    auth_method = auth_method or profile.auth_method
+    cookies_file = cookies_file or profile.cookies_file
     if auth_method is None:
         auth_method = select_auth_method()
 
     # Extract cookies based on selected method
     if auth_method == "file":
-        session = load_cookies_from_file(cookies_file)
+        session = load_cookies_from_file(cookies_file, profile=profile)
     else:
+        # Cached browser cookies skip the slow cookie database decryption
+        if profile.use_cookie_cache:
+            session = load_cookie_cache(auth_method, profile=profile)
+            if session:
+                print("Teste API-Verbindung...")
+                try:
+                    first_page = _fetch_first_page(session, profile)
+                    return (session, first_page) if first_page else (None, None)
+                except requests.exceptions.HTTPError as e:
+                    if e.response.status_code not in AUTH_ERROR_CODES:
+                        # The cookies may still be valid; only rejected ones are replaced
+                        _report_api_error(e, profile)
+                        return None, None
+                    print("Cookie-Cache ist abgelaufen, extrahiere Cookies erneut...")
+                    clear_cookie_cache(profile=profile)
+                except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+                    _report_api_error(e, profile)
+                    return None, None
+
         # auth_method is the browser name ('firefox', 'chrome', or 'chromium')
-        session = extract_browser_cookies(auth_method)
+        session = extract_browser_cookies(auth_method, profile=profile)
     
     if not session:
-        return None
+        return None, None
 
     # Test API connection
-    if not test_api_connection(session):
-        return None
+    first_page = test_api_connection(session, profile=profile)
+    if not first_page:
+        return None, None
+
+    if auth_method != "file" and profile.use_cookie_cache:
+        save_cookie_cache(session, auth_method, profile=profile)
 
-    return session
+    return session, first_page
 
 
-def test_api_connection(session: requests.Session) -> bool:
+def test_api_connection(
+    session: requests.Session,
+    verbose: bool = True,
+    profile: Optional[LidlProfile] = None,
+) -> Optional[Dict[str, Any]]:
     """
     Test if the API connection with extracted cookies works.
 
     Args:
         session: requests.Session with authentication cookies
+        verbose: Print error details
+        profile: Account profile. If None, uses the settings from config.
 
     Returns:
-        bool: True if connection works, False otherwise
+        dict: First tickets page (same shape as api.get_tickets_page) if the
+              connection works, None otherwise
     """
+    profile = resolve_profile(profile)
     print("Teste API-Verbindung...")
 
     try:
-        # Test the tickets API endpoint
+        return _fetch_first_page(session, profile)
+    except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+        if verbose:
+            _report_api_error(e, profile)
+        return None
+
+
+def _fetch_first_page(session: requests.Session, profile: LidlProfile) -> Optional[Dict[str, Any]]:
+    """
+    Fetch the first tickets page.
+
+    Returns:
+        dict: First tickets page, or None if it contains no receipts
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails
+        json.JSONDecodeError: If the response is not valid JSON
+    """
+    # Test the tickets API endpoint
+    with METRICS.timer("page_fetch_seconds", "Latency of tickets page requests"):
         response = session.get(
-            f"{LidlConfig.get_tickets_url()}?country={LidlConfig.get_country_code()}&page=1",
-            timeout=LidlConfig.DEFAULT_TIMEOUT,
+            f"{profile.get_tickets_url()}?country={profile.get_country_code()}&page=1",
+            timeout=profile.timeout,
         )
-        response.raise_for_status()
+    METRICS.counter("bytes_downloaded_total", "Response bytes downloaded").inc(
+        len(response.content)
+    )
+    response.raise_for_status()
+
+    data = response.json()
+    if isinstance(data, list):
+        # Direct array of tickets
+        data = {"items": data, "page": 1, "size": len(data), "totalCount": len(data)}
+
+    if isinstance(data, dict) and data.get("items"):
+        print(
+            f"✓ API-Verbindung erfolgreich! {data.get('totalCount', len(data['items']))} Kassenbons gefunden"
+        )
+        return data
+    print("⚠ API-Antwort enthält keine Kassenbons")
+    return None
 
-        data = response.json()
-        if "items" in data and len(data["items"]) > 0:
-            print(
-                f"✓ API-Verbindung erfolgreich! {data['totalCount']} Kassenbons gefunden"
-            )
-            return True
-        else:
-            print("⚠ API-Antwort enthält keine Kassenbons")
-            return False
 
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 401:
-            print("✗ API-Verbindung fehlgeschlagen: Nicht autorisiert (401)")
+def _report_api_error(error: Exception, profile: LidlProfile) -> None:
+    """Print a failed API connection test."""
+    if isinstance(error, requests.exceptions.HTTPError):
+        status = error.response.status_code
+        if status in AUTH_ERROR_CODES:
+            print(f"✗ API-Verbindung fehlgeschlagen: Nicht autorisiert ({status})")
             print(
                 "Bitte stelle sicher, dass du in deinem Browser bei Lidl angemeldet bist."
             )
             print(
-                f"Öffne {LidlConfig.get_base_url()} im Browser und melde dich an, bevor du das Programm ausführst."
+                f"Öffne {profile.get_base_url()} im Browser und melde dich an, bevor du das Programm ausführst."
             )
         else:
-            print(f"✗ API-Verbindungsfehler ({e.response.status_code}): {e}")
-        return False
-    except requests.exceptions.RequestException as e:
-        print(f"✗ API-Verbindungsfehler: {e}")
-        return False
-    except json.JSONDecodeError as e:
-        print(f"✗ JSON-Decodierungsfehler: {e}")
-        return False
+            print(f"✗ API-Verbindungsfehler ({status}): {error}")
+    elif isinstance(error, json.JSONDecodeError):
+        print(f"✗ JSON-Decodierungsfehler: {error}")
+    else:
+        print(f"✗ API-Verbindungsfehler: {error}")
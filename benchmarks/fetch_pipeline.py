@@ -0,0 +1,136 @@
+"""
+End-to-end throughput benchmark of the fetch pipeline against the mock API.
+
+Starts benchmarks/mock_lidl_api.py in-process, runs the `initial` workflow into
+a temporary receipts file, lets new receipts appear and runs `update`. Prints
+receipts per second, request counts and the main latency histograms per phase.
+
+Usage:
+    python benchmarks/fetch_pipeline.py                               # 200 receipts, no latency
+    python benchmarks/fetch_pipeline.py --receipts 500 --latency 0.03 --new 25
+    python benchmarks/fetch_pipeline.py --request-delay 0.5           # with production pacing
+    python benchmarks/fetch_pipeline.py --max-rate 5 --max-request-rate 20  # adaptive pacing vs. a rate limit
+    python benchmarks/fetch_pipeline.py --parse-workers 0             # without the parse pool
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.mock_lidl_api import MockLidlAPI, add_settings_args, settings_from_args  # noqa: E402
+from config import LidlProfile  # noqa: E402
+from metrics import METRICS, metrics_summary  # noqa: E402
+from storage import load_existing_receipts  # noqa: E402
+from workflows import initial_setup, update_data  # noqa: E402
+
+# Histograms shown per phase
+REPORTED_HISTOGRAMS = [
+    "page_fetch_seconds",
+    "receipt_fetch_seconds",
+    "parse_seconds",
+    "parse_soup_seconds",
+    "parse_items_seconds",
+    "storage_write_seconds",
+]
+
+
+def run_phase(name, workflow, profile, api, verbose):
+    """Run one workflow and print its throughput."""
+    METRICS.reset()
+    requests_before = dict(api.stats)
+    receipts_before = len(load_existing_receipts(profile.receipts_file)[0])
+
+    output = sys.stdout if verbose else io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        success = workflow(profile=profile)
+    elapsed = time.perf_counter() - start
+
+    added = len(load_existing_receipts(profile.receipts_file)[0]) - receipts_before
+    requests = {key: api.stats[key] - requests_before[key] for key in api.stats}
+    summary = metrics_summary()
+
+    print(f"\n{name}: {'ok' if success else 'FEHLGESCHLAGEN'}")
+    print(f"  Kassenbons:     {added} in {elapsed:.2f} s ({added / elapsed if elapsed else 0:.1f} Kassenbons/s)")
+    print(
+        f"  Anfragen:       {requests['requests']} "
+        f"(Seiten {requests['pages']}, Kassenbons {requests['receipts']}, "
+        f"429 {requests['rate_limited']}, 500 {requests['errors']})"
+    )
+    sleep_seconds = summary["counters"].get("sleep_seconds_total", 0)
+    print(f"  Pausen:         {sleep_seconds:.2f} s")
+    rate = summary["histograms"].get("request_rate")
+    if rate:
+        print(
+            f"  Anfragerate:    p50={rate['p50']:.1f}/s  max={rate['max']:.1f}/s "
+            f"({summary['counters'].get('pacing_backoffs_total', 0):.0f}x gedrosselt)"
+        )
+    for histogram in REPORTED_HISTOGRAMS:
+        stats = summary["histograms"].get(histogram)
+        if stats:
+            print(
+                f"  {histogram:24} n={stats['count']:<5} "
+                f"p50={stats['p50'] * 1000:7.2f} ms  p95={stats['p95'] * 1000:7.2f} ms"
+            )
+    return {"phase": name, "success": success, "receipts": added, "seconds": elapsed, "requests": requests}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_settings_args(parser)
+    parser.add_argument("--new", type=int, default=10, help="Receipts added before the update (default: 10)")
+    parser.add_argument("--request-delay", type=float, default=0.0, help="Pause between receipts (default: 0)")
+    parser.add_argument(
+        "--max-request-rate",
+        type=float,
+        default=1000.0,
+        help="Ceiling of the adaptive pacing in requests per second (default: 1000, i.e. unpaced)",
+    )
+    parser.add_argument(
+        "--parse-workers", type=int, help="Parse processes (default: one per core, 0: parse inline)"
+    )
+    parser.add_argument("--json", metavar="FILE", help="Also write the results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Show the workflow output")
+    args = parser.parse_args()
+
+    api = MockLidlAPI(settings_from_args(args))
+    base_url = api.start()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        cookies_file = os.path.join(work_dir, "cookies.json")
+        with open(cookies_file, "w", encoding="utf-8") as file:
+            json.dump([{"domain": ".lidl.de", "name": "mock", "value": "1"}], file)
+
+        profile = LidlProfile.from_config(
+            base_url=base_url,
+            auth_method="file",
+            cookies_file=cookies_file,
+            receipts_file=os.path.join(work_dir, "lidl_receipts.json"),
+            use_cookie_cache=False,
+            request_delay=args.request_delay,
+            max_request_rate=args.max_request_rate,
+            parse_workers=args.parse_workers,
+        )
+
+        print(f"Mock-API: {base_url} ({args.receipts} Kassenbons, Latenz {args.latency * 1000:.0f} ms)")
+        results = [run_phase("initial", initial_setup, profile, api, args.verbose)]
+        api.add_receipts(args.new)
+        results.append(run_phase("update", update_data, profile, api, args.verbose))
+
+    api.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""
+Local stand-in for the Lidl receipts API, for reproducible benchmarks.
+
+Serves `/mre/api/v1/tickets?page=N` and `/mre/api/v1/tickets/<id>` with
+synthetic receipts (deterministic for a seed) in the format the parsers
+expect. Latency, server errors, rate limiting (429, random or above a request
+rate) and pagination quirks can be injected. Authentication is not checked.
+
+Usage:
+    python benchmarks/mock_lidl_api.py --receipts 500 --latency 0.05 --port 8080
+    echo '[{"domain": ".lidl.de", "name": "mock", "value": "1"}]' > mock_cookies.json
+    python get_data.py initial --cookies-file mock_cookies.json --base-url http://127.0.0.1:8080
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+TICKETS_PATH = "/mre/api/v1/tickets"
+
+PRODUCTS = [
+    ("Vollmilch 3,5%", "1,09", "stk"),
+    ("Butter", "2,29", "stk"),
+    ("Bananen", "1,69", "kg"),
+    ("Äpfel Braeburn", "2,49", "kg"),
+    ("Toastbrot", "1,19", "stk"),
+    ("Gouda jung", "1,89", "stk"),
+    ("Eier Bodenhaltung 10er", "2,59", "stk"),
+    ("Spaghetti", "0,99", "stk"),
+    ("Tomaten passiert", "0,79", "stk"),
+    ("Mineralwasser 1,5l", "0,29", "stk"),
+    ("Pfand 0,25", "0,25", "stk"),
+    ("Kaffee gemahlen", "4,99", "stk"),
+    ("Joghurt Natur", "0,55", "stk"),
+    ("Hähnchenbrustfilet", "5,49", "stk"),
+    ("Kartoffeln festkochend", "2,19", "stk"),
+    ("Paprika rot", "3,99", "kg"),
+    ("Haferflocken", "0,89", "stk"),
+    ("Orangensaft", "1,49", "stk"),
+    ("Schokolade Vollmilch", "0,99", "stk"),
+    ("Toilettenpapier 8 Rollen", "3,45", "stk"),
+]
+
+STORES = [
+    {"id": "DE1001", "name": "Lidl Berlin-Mitte", "address": "Invalidenstr. 12", "postalCode": "10115", "locality": "Berlin"},
+    {"id": "DE2002", "name": "Lidl Hamburg-Altona", "address": "Große Bergstr. 160", "postalCode": "22767", "locality": "Hamburg"},
+    {"id": "DE3003", "name": "Lidl München-Pasing", "address": "Landsberger Str. 520", "postalCode": "81241", "locality": "München"},
+    {"id": "DE4004", "name": "Lidl Köln-Ehrenfeld", "address": "Venloer Str. 389", "postalCode": "50825", "locality": "Köln"},
+]
+
+
+@dataclass
+class MockSettings:
+    """Behaviour of the mock server."""
+
+    receipts: int = 200
+    page_size: int = 10
+    seed: int = 1
+    latency: float = 0.0  # seconds added to every response
+    latency_jitter: float = 0.0  # random extra latency (0..jitter seconds)
+    error_rate: float = 0.0  # fraction of requests answered with HTTP 500
+    rate_limit_rate: float = 0.0  # fraction of requests answered with HTTP 429
+    retry_after: int = 1  # Retry-After header of 429 responses (seconds)
+    non_html_rate: float = 0.05  # fraction of tickets without a digital receipt
+    list_response: bool = False  # serve ticket pages as a bare JSON array
+    nested_tickets: bool = False  # wrap page entries as {"ticket": {...}}
+    drift_rate: float = 0.0  # chance that a new receipt appears before each page request
+    max_rate: float = 0.0  # requests per second tolerated, faster ones get HTTP 429 (0 = no limit)
+
+
+def _euros(cents: int) -> str:
+    return f"{cents // 100},{cents % 100:02d}"
+
+
+def _cents(amount: str) -> int:
+    euros, cents = amount.split(",")
+    return int(euros) * 100 + int(cents)
+
+
+class MockLidlAPI:
+    """Synthetic receipt history served over HTTP from a background thread."""
+
+    def __init__(self, settings: Optional[MockSettings] = None) -> None:
+        self.settings = settings or MockSettings()
+        self._rng = random.Random(self.settings.seed)
+        self._lock = threading.Lock()
+        # Receipt indices, newest first; index i is generated from (seed, i)
+        self._order: List[int] = list(range(self.settings.receipts - 1, -1, -1))
+        self._recent_requests: deque = deque()  # start times within the last second (max_rate)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"requests": 0, "pages": 0, "receipts": 0, "errors": 0, "rate_limited": 0}
+
+    # --- Synthetic data ---
+
+    def receipt_id(self, index: int) -> str:
+        return f"mock-{self.settings.seed}-{index:06d}"
+
+    def _receipt_rng(self, index: int) -> random.Random:
+        return random.Random(self.settings.seed * 1_000_003 + index)
+
+    def _receipt_date(self, index: int) -> datetime:
+        # One receipt about every two days, starting 2022-03-01
+        return datetime(2022, 3, 1, 18, 0) + timedelta(hours=47 * index)
+
+    def _has_html(self, index: int) -> bool:
+        return self._receipt_rng(index).random() >= self.settings.non_html_rate
+
+    def ticket_summary(self, index: int) -> Dict[str, Any]:
+        """Entry of a tickets page."""
+        ticket = {
+            "id": self.receipt_id(index),
+            "isHtml": self._has_html(index),
+            "date": self._receipt_date(index).isoformat(),
+        }
+        return {"ticket": ticket} if self.settings.nested_tickets else ticket
+
+    def receipt_html(self, index: int) -> Dict[str, Any]:
+        """Build the htmlPrintedReceipt and total of a receipt."""
+        rng = self._receipt_rng(index)
+        lines = []
+        total = 0
+        # Like a real receipt, an article appears on one line ("3 Stk x 0,99")
+        for art_id in rng.sample(range(len(PRODUCTS)), rng.randint(3, min(25, len(PRODUCTS)))):
+            name, unit_price, unit = PRODUCTS[art_id]
+            if unit == "kg":
+                quantity = f"{rng.randint(200, 2500) / 1000:.3f}".replace(".", ",")
+                line_cents = round(_cents(unit_price) * float(quantity.replace(",", ".")))
+                detail = f"{quantity} kg x {unit_price} EUR/kg"
+            else:
+                quantity = str(rng.randint(1, 4))
+                line_cents = _cents(unit_price) * int(quantity)
+                detail = f"{quantity} Stk x {unit_price}" if quantity != "1" else ""
+            total += line_cents
+            attrs = (
+                f'data-art-id="{10000 + art_id}" data-art-description="{name}" '
+                f'data-art-quantity="{quantity}" data-unit-price="{unit_price}"'
+            )
+            lines.append(
+                f'<span class="article" {attrs}>{name}</span> '
+                f'<span class="article" {attrs}>{detail}</span> '
+                f'<span class="article css_bold" {attrs}>{_euros(line_cents)}</span> A'
+            )
+
+        saved = rng.choice([0, 0, 0, 20, 50, 100])
+        if saved:
+            lines.append(f"Preisvorteil -{_euros(saved)}")
+        lidlplus = rng.choice([0, 0, 30, 75])
+        paid = max(total - saved - lidlplus, 1)
+
+        html = (
+            '<div class="receipt"><span class="purchase_list">'
+            + "\n".join(lines)
+            + "\n</span>"
+            + f'<div><span id="purchase_summary_1">zu zahlen</span> '
+            f'<span class="css_bold">{_euros(paid)}</span></div>'
+            + (
+                f'<span class="vat_info">Mit Lidl Plus {_euros(lidlplus)} EUR gespart</span>'
+                if lidlplus
+                else ""
+            )
+            + "</div>"
+        )
+        return {"html": html, "total": paid / 100}
+
+    def receipt_payload(self, index: int) -> Dict[str, Any]:
+        """Response of the receipt detail endpoint."""
+        rng = self._receipt_rng(index)
+        receipt = self.receipt_html(index)
+        return {
+            "ticket": {
+                "id": self.receipt_id(index),
+                "date": self._receipt_date(index).isoformat(),
+                "totalAmount": receipt["total"],
+                "store": dict(rng.choice(STORES)),
+                "htmlPrintedReceipt": receipt["html"],
+            }
+        }
+
+    def add_receipts(self, count: int) -> None:
+        """Let `count` new receipts appear at the top of the history."""
+        with self._lock:
+            newest = self._order[0] if self._order else -1
+            self._order[:0] = range(newest + count, newest, -1)
+            self.settings.receipts += count
+
+    def tickets_page(self, page: int) -> Any:
+        """Response of the tickets endpoint."""
+        if self._rng.random() < self.settings.drift_rate:
+            self.add_receipts(1)
+        size = self.settings.page_size
+        with self._lock:
+            indices = self._order[(page - 1) * size : page * size]
+            total_count = len(self._order)
+        items = [self.ticket_summary(index) for index in indices]
+        if self.settings.list_response:
+            return items
+        return {"items": items, "page": page, "size": size, "totalCount": total_count}
+
+    # --- HTTP server ---
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _fault(self) -> Optional[int]:
+        """Pick an injected status code for the next request (None = normal response)."""
+        settings = self.settings
+        delay = settings.latency + settings.latency_jitter * self._rng.random()
+        if delay > 0:
+            time.sleep(delay)
+        if settings.max_rate > 0:
+            now = time.monotonic()
+            with self._lock:
+                while self._recent_requests and self._recent_requests[0] <= now - 1.0:
+                    self._recent_requests.popleft()
+                limited = len(self._recent_requests) >= settings.max_rate
+                self._recent_requests.append(now)
+            if limited:
+                return 429
+        roll = self._rng.random()
+        if roll < settings.rate_limit_rate:
+            return 429
+        if roll < settings.rate_limit_rate + settings.error_rate:
+            return 500
+        return None
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload: Any = None, headers=None) -> None:
+                body = json.dumps(payload if payload is not None else {"status": status}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                api._count("requests")
+                url = urlparse(self.path)
+                fault = api._fault()
+                if fault == 429:
+                    api._count("rate_limited")
+                    return self._send(429, headers={"Retry-After": str(api.settings.retry_after)})
+                if fault == 500:
+                    api._count("errors")
+                    return self._send(500)
+
+                if url.path == TICKETS_PATH:
+                    api._count("pages")
+                    page = int(parse_qs(url.query).get("page", ["1"])[0])
+                    return self._send(200, api.tickets_page(page))
+
+                prefix = f"{TICKETS_PATH}/mock-{api.settings.seed}-"
+                if url.path.startswith(prefix):
+                    try:
+                        index = int(url.path[len(prefix):])
+                    except ValueError:
+                        index = -1
+                    if 0 <= index < api.settings.receipts:
+                        api._count("receipts")
+                        return self._send(200, api.receipt_payload(index))
+                self._send(404)
+
+        return Handler
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving in a background thread (port 0 picks a free port) and return the base URL."""
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        """Shut the server down."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def add_settings_args(parser: argparse.ArgumentParser) -> None:
+    """Command line options for MockSettings (shared with the benchmark)."""
+    parser.add_argument("--receipts", type=int, default=200, help="Receipts in the history (default: 200)")
+    parser.add_argument("--page-size", type=int, default=10, help="Tickets per page (default: 10)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the synthetic data (default: 1)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Random extra latency (0..N seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of HTTP 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of HTTP 429 responses")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After of 429 responses (seconds)")
+    parser.add_argument("--non-html-rate", type=float, default=0.05, help="Fraction of tickets without HTML receipt")
+    parser.add_argument("--list-response", action="store_true", help="Serve ticket pages as a bare array")
+    parser.add_argument("--nested-tickets", action="store_true", help="Wrap page entries as {'ticket': {...}}")
+    parser.add_argument("--drift-rate", type=float, default=0.0, help="Chance of a new receipt before each page request")
+    parser.add_argument("--max-rate", type=float, default=0.0, help="Requests per second before HTTP 429 (default: no limit)")
+
+
+def settings_from_args(args: argparse.Namespace) -> MockSettings:
+    return MockSettings(
+        receipts=args.receipts,
+        page_size=args.page_size,
+        seed=args.seed,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        non_html_rate=args.non_html_rate,
+        list_response=args.list_response,
+        nested_tickets=args.nested_tickets,
+        drift_rate=args.drift_rate,
+        max_rate=args.max_rate,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    add_settings_args(parser)
+    args = parser.parse_args()
+
+    api = MockLidlAPI(settings_from_args(args))
+    url = api.start(args.host, args.port)
+    print(f"Mock-Lidl-API läuft auf {url} ({args.receipts} Kassenbons) - Beenden mit Strg+C")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        api.stop()
+        print(f"\nAnfragen: {api.stats}")
+
+
+if __name__ == "__main__":
+    main()
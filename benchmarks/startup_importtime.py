@@ -0,0 +1,98 @@
+"""
+Startup-time benchmark for get_data.py based on `python -X importtime`.
+
+Runs a get_data.py command line several times in fresh interpreters, parses the
+import-time report from stderr and prints the total import time, the slowest
+modules and whether heavy dependencies were loaded.
+
+Usage:
+    python benchmarks/startup_importtime.py                  # get_data.py --help
+    python benchmarks/startup_importtime.py -- update --bad  # argument error path
+    python benchmarks/startup_importtime.py --runs 10 --top 20
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies that should only be loaded when a command really needs them
+HEAVY_MODULES = ["requests", "bs4", "browser_cookie3", "pandas", "numpy", "streamlit"]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_importtime(command: List[str]) -> Tuple[Dict[str, int], int]:
+    """
+    Run get_data.py once with -X importtime.
+
+    Returns:
+        tuple: (cumulative microseconds per module, total microseconds of top-level imports)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "get_data.py", *command],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+
+    cumulative = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative_us, indent, module = match.groups()
+        cumulative[module] = int(cumulative_us)
+        # Top-level imports have a single space of indentation
+        if len(indent) == 1:
+            total += int(cumulative_us)
+    return cumulative, total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Number of runs (default: 5)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to show (default: 10)")
+    parser.add_argument(
+        "command",
+        nargs="*",
+        default=["--help"],
+        help="Arguments passed to get_data.py (default: --help)",
+    )
+    args = parser.parse_args()
+
+    totals = []
+    module_times: Dict[str, List[int]] = {}
+    for _ in range(args.runs):
+        cumulative, total = run_importtime(args.command)
+        totals.append(total)
+        for module, micros in cumulative.items():
+            module_times.setdefault(module, []).append(micros)
+
+    print(f"Command: python get_data.py {' '.join(args.command)}")
+    print(
+        f"Import time over {args.runs} runs: median {statistics.median(totals) / 1000:.1f} ms, "
+        f"min {min(totals) / 1000:.1f} ms, max {max(totals) / 1000:.1f} ms"
+    )
+
+    print(f"\nSlowest {args.top} modules (median cumulative):")
+    medians = sorted(
+        ((statistics.median(times), module) for module, times in module_times.items()),
+        reverse=True,
+    )
+    for micros, module in medians[: args.top]:
+        print(f"  {micros / 1000:8.1f} ms  {module}")
+
+    print("\nHeavy dependencies loaded:")
+    for module in HEAVY_MODULES:
+        print(f"  {module:16} {'yes' if module in module_times else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
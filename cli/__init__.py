@@ -1,10 +1,21 @@
 """CLI module for command-line interface."""
 
-from .menu import main
-from .prompts import select_auth_method, select_browser
-
-__all__ = [
-    "main",
-    "select_auth_method",
-    "select_browser",
-]
+import importlib
+
+# Submodules are only imported on first attribute access (PEP 562) so that
+# e.g. `get_data.py --help` does not load requests, bs4 or browser_cookie3.
+_EXPORTS = {
+    "main": ".menu",
+    "select_auth_method": ".prompts",
+    "select_browser": ".prompts",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,6 @@
 """Configuration module for shopping analyzer."""
 
 from .lidl_config import LidlConfig
+from .profile import LidlProfile, resolve_profile, load_profiles
 
-__all__ = ["LidlConfig"]
-
+__all__ = ["LidlConfig", "LidlProfile", "resolve_profile", "load_profiles"]
@@ -1,5 +1,7 @@
 """Configuration constants for Lidl API integration."""
 
+import os
+
 
 class LidlConfig:
     """Configuration constants for Lidl API integration."""
@@ -7,24 +9,47 @@ class LidlConfig:
     # File paths
     RECEIPTS_JSON_FILE = "lidl_receipts.json"
     COOKIES_JSON_FILE = "lidl_cookies.json"
+    COOKIE_CACHE_FILE = "lidl_cookie_cache.json"
 
     # Country settings (can be changed via set_country)
     COUNTRY = "de"
 
+    # Alternative API base URL, e.g. the local mock server in benchmarks/
+    # (None uses https://www.lidl.<country>)
+    BASE_URL = os.environ.get("LIDL_BASE_URL") or None
+
     # Request settings
     DEFAULT_TIMEOUT = 15
-    REQUEST_DELAY = 0.5
+    REQUEST_DELAY = 0.5  # pause between receipts at the start, before the pacing adapts
+    MAX_REQUEST_RATE = 4.0  # receipt requests per second the adaptive pacing may reach
     PAGES_TO_CHECK = 3
 
+    # Parse worker processes (None: one per CPU core, 0: parse on the fetching thread)
+    PARSE_WORKERS = None
+
+    # Archive settings: receipts of older months are moved to compressed
+    # monthly partitions (opt-in; None keeps everything in the receipts file)
+    ARCHIVE_HOT_MONTHS = None  # months kept in the receipts file, incl. the current one
+
+    # Watch mode settings (long-running incremental sync)
+    WATCH_INTERVAL = 15 * 60  # seconds between polls
+    WATCH_JITTER = 0.1  # random deviation of the interval (fraction)
+
     # Browser settings
     SUPPORTED_BROWSERS = {"firefox": "Firefox", "chrome": "Chrome", "chromium": "Chromium"}
 
+    # Cookie cache settings (reuse extracted browser cookies across runs)
+    USE_COOKIE_CACHE = True
+    COOKIE_CACHE_MAX_AGE = 12 * 60 * 60  # seconds
+
     # API settings
     DEFAULT_PAGE_SIZE = 10
 
     @classmethod
     def get_base_url(cls) -> str:
-        """Get the base URL for the current country."""
+        """Get the base URL for the current country (or the configured override)."""
+        if cls.BASE_URL:
+            return cls.BASE_URL.rstrip("/")
         return f"https://www.lidl.{cls.COUNTRY}"
 
     @classmethod
@@ -0,0 +1,179 @@
+"""Per-account configuration profiles (country, auth, files and pacing)."""
+
+import dataclasses
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .lidl_config import LidlConfig
+
+
+@dataclass(frozen=True)
+class LidlProfile:
+    """
+    Immutable configuration of a single Lidl Plus account.
+
+    Unlike the class-level LidlConfig, several profiles can be used at the same
+    time (e.g. one per country), each with its own storage and cookie files.
+    """
+
+    name: Optional[str] = None
+    country: str = LidlConfig.COUNTRY
+    base_url: Optional[str] = LidlConfig.BASE_URL
+    auth_method: Optional[str] = None
+    cookies_file: Optional[str] = None
+    receipts_file: str = LidlConfig.RECEIPTS_JSON_FILE
+    cookie_cache_file: str = LidlConfig.COOKIE_CACHE_FILE
+    use_cookie_cache: bool = LidlConfig.USE_COOKIE_CACHE
+    cookie_cache_max_age: float = LidlConfig.COOKIE_CACHE_MAX_AGE
+    request_delay: float = LidlConfig.REQUEST_DELAY
+    max_request_rate: float = LidlConfig.MAX_REQUEST_RATE
+    timeout: float = LidlConfig.DEFAULT_TIMEOUT
+    pages_to_check: int = LidlConfig.PAGES_TO_CHECK
+    archive_hot_months: Optional[int] = LidlConfig.ARCHIVE_HOT_MONTHS
+    parse_workers: Optional[int] = LidlConfig.PARSE_WORKERS
+
+    @classmethod
+    def from_config(cls, **overrides) -> "LidlProfile":
+        """Create a profile from the current LidlConfig settings, with optional overrides."""
+        profile = cls(
+            country=LidlConfig.COUNTRY,
+            base_url=LidlConfig.BASE_URL,
+            receipts_file=LidlConfig.RECEIPTS_JSON_FILE,
+            cookie_cache_file=LidlConfig.COOKIE_CACHE_FILE,
+            use_cookie_cache=LidlConfig.USE_COOKIE_CACHE,
+            cookie_cache_max_age=LidlConfig.COOKIE_CACHE_MAX_AGE,
+            request_delay=LidlConfig.REQUEST_DELAY,
+            max_request_rate=LidlConfig.MAX_REQUEST_RATE,
+            timeout=LidlConfig.DEFAULT_TIMEOUT,
+            pages_to_check=LidlConfig.PAGES_TO_CHECK,
+            archive_hot_months=LidlConfig.ARCHIVE_HOT_MONTHS,
+            parse_workers=LidlConfig.PARSE_WORKERS,
+        )
+        return dataclasses.replace(profile, **overrides)
+
+    def get_base_url(self) -> str:
+        """Get the base URL for the profile's country (or the configured override)."""
+        if self.base_url:
+            return self.base_url.rstrip("/")
+        return f"https://www.lidl.{self.country}"
+
+    def get_tickets_url(self) -> str:
+        """Get the tickets API URL."""
+        return f"{self.get_base_url()}/mre/api/v1/tickets"
+
+    def get_receipt_url(self, receipt_id: str) -> str:
+        """Get the receipt API URL for a specific receipt."""
+        return f"{self.get_base_url()}/mre/api/v1/tickets/{receipt_id}"
+
+    def get_country_code(self) -> str:
+        """Get the country code in uppercase (e.g., 'DE', 'BG')."""
+        return self.country.upper()
+
+    def get_language_code(self) -> str:
+        """Get the language code (e.g., 'de-DE', 'bg-BG')."""
+        return f"{self.country}-{self.country.upper()}"
+
+    def get_cookie_domain(self) -> str:
+        """Get the domain for cookie extraction (e.g., 'lidl.de', 'lidl.bg')."""
+        return f"lidl.{self.country}"
+
+
+def resolve_profile(profile: Optional[LidlProfile] = None) -> LidlProfile:
+    """Return the given profile, or one built from the current LidlConfig settings."""
+    return profile if profile is not None else LidlProfile.from_config()
+
+
+# Keys accepted in a [profiles.<name>] table of a batch file
+_PROFILE_KEYS = {
+    "country",
+    "base_url",
+    "browser",
+    "cookies_file",
+    "receipts_file",
+    "cookie_cache_file",
+    "use_cookie_cache",
+    "request_delay",
+    "max_request_rate",
+    "timeout",
+    "pages_to_check",
+    "archive_hot_months",
+    "parse_workers",
+}
+
+
+def load_profiles(file_path: str) -> Tuple[List[LidlProfile], Optional[str]]:
+    """
+    Load account profiles from a TOML batch file.
+
+    Each account is a `[profiles.<name>]` table that needs either `browser` or
+    `cookies_file`. Storage and cookie cache files default to per-profile names
+    (e.g. 'lidl_receipts_<name>.json'). An optional top-level `merged_file`
+    names a combined receipts file for the dashboard.
+
+    Args:
+        file_path: Path to the TOML file
+
+    Returns:
+        tuple: (list of profiles, merged receipts file or None)
+
+    Raises:
+        ValueError: If the file contains no or invalid profiles
+    """
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        import tomli as tomllib
+
+    with open(file_path, "rb") as file:
+        data = tomllib.load(file)
+
+    tables = data.get("profiles", {})
+    if not tables:
+        raise ValueError(f"Keine Profile in {file_path} gefunden ([profiles.<name>] Tabellen)")
+
+    profiles = []
+    for name, table in tables.items():
+        unknown = set(table) - _PROFILE_KEYS
+        if unknown:
+            raise ValueError(f"Profil '{name}': unbekannte Einstellungen {sorted(unknown)}")
+
+        browser = table.get("browser")
+        cookies_file = table.get("cookies_file")
+        if bool(browser) == bool(cookies_file):
+            raise ValueError(f"Profil '{name}': genau eines von 'browser' oder 'cookies_file' angeben")
+        if browser and browser not in LidlConfig.SUPPORTED_BROWSERS:
+            raise ValueError(f"Profil '{name}': unbekannter Browser '{browser}'")
+
+        overrides = {
+            key: table[key]
+            for key in (
+                "base_url",
+                "use_cookie_cache",
+                "request_delay",
+                "max_request_rate",
+                "timeout",
+                "pages_to_check",
+                "archive_hot_months",
+                "parse_workers",
+            )
+            if key in table
+        }
+        profiles.append(
+            LidlProfile.from_config(
+                name=name,
+                country=table.get("country", LidlConfig.COUNTRY).lower(),
+                auth_method=browser or "file",
+                cookies_file=cookies_file,
+                receipts_file=table.get("receipts_file", f"lidl_receipts_{name}.json"),
+                cookie_cache_file=table.get("cookie_cache_file", f"lidl_cookie_cache_{name}.json"),
+                **overrides,
+            )
+        )
+
+    # Concurrent runs must never write to the same file
+    for attribute in ("receipts_file", "cookie_cache_file"):
+        paths = [getattr(profile, attribute) for profile in profiles]
+        if len(set(paths)) != len(paths):
+            raise ValueError(f"Mehrere Profile verwenden dieselbe Datei für '{attribute}'")
+
+    return profiles, data.get("merged_file")
@@ -1,263 +1,391 @@
 import streamlit as st
-import pandas as pd
-import json
 import os # Imported to check for file existence
+import sys
+import time
+
+from storage import (
+    load_aggregates,
+    load_item_dimension,
+    load_price_history,
+    load_line_store,
+    open_search_index,
+    search_products,
+    receipts_mtime_ns,
+    date_bounds,
+    spending_forecast,
+)
+from analytics import (
+    kpi_summary,
+    daily_spending_frame,
+    weekly_spending_frame,
+    anomalies_frame,
+    item_totals_frame,
+    top_items_frame,
+    product_summary_frame,
+)
+from analytics.duckdb_engine import DuckDBEngine, DUCKDB_AVAILABLE
 
 # --- Data Loading and Preparation ---
 
-# Define the filename
-DATA_FILE = "lidl_receipts.json"
+# Define the filename (another file, e.g. the merged view of a batch run, can be
+# passed with `streamlit run dashboard.py -- lidl_receipts_all.json`)
+DATA_FILE = sys.argv[1] if len(sys.argv) > 1 else "lidl_receipts.json"
 
-# Function to load data from the JSON file
-def load_data(filename):
-    if not os.path.exists(filename):
-        st.error(f"Fehler: Die Datei '{filename}' wurde nicht gefunden. Bitte erstellen Sie sie im gleichen Verzeichnis wie das Skript.")
-        return None # Return None to stop the script from running further
+# Query engines: precomputed rollups (default) or SQL on the receipts file (optional)
+ENGINE_ROLLUPS = "Rollups"
+ENGINE_DUCKDB = "DuckDB"
 
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data
-    except json.JSONDecodeError:
-        st.error(f"Fehler: Die Datei '{filename}' ist keine gültige JSON-Datei. Bitte überprüfen Sie das Format.")
-        return None
-    except Exception as e:
-        st.error(f"Ein unerwarteter Fehler ist aufgetreten: {e}")
-        return None
+# Seconds between checks for new data in auto-refresh mode
+DEFAULT_REFRESH_INTERVAL = 30
 
-# Load the data
-data = load_data(DATA_FILE)
+MONTH_NAMES = [
+    "Januar", "Februar", "März", "April", "Mai", "Juni",
+    "Juli", "August", "September", "Oktober", "November", "Dezember",
+]
 
-# --- Main Application Logic ---
-# We only run the dashboard logic if the data was loaded successfully
-if data:
-    # Convert to a pandas DataFrame
-    df = pd.DataFrame(data)
-
-    # --- Data Cleaning and Transformation ---
-
-    # Function to convert comma-decimal strings to floats
-    def to_float(x):
-        if x is None or x == '' or str(x).strip() == '':
-            return 0.0
-        return float(str(x).replace(',', '.'))
-
-    # Apply conversions
-    df['purchase_date'] = pd.to_datetime(df['purchase_date'], format='%Y.%m.%d')
-    df['total_price'] = df['total_price'].apply(to_float)
-    df['saved_amount'] = df['saved_amount'].apply(to_float)
-    df['lidlplus_saved_amount'] = df['lidlplus_saved_amount'].apply(to_float) if 'lidlplus_saved_amount' in df.columns else 0.0
-    # Handle sticker discounts (RABATT X%) if present
-    if 'sticker_discount_amount' in df.columns:
-        df['sticker_discount_amount'] = df['sticker_discount_amount'].apply(to_float)
-    else:
-        df['sticker_discount_amount'] = 0.0
+# Loaded storage files are shared read-only between reruns; the data version
+# (modification stamp of the receipts file) is part of every cache key, so new
+# data only invalidates entries of the old version. Old versions are evicted
+# through max_entries.
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_aggregates(filename, version):
+    return load_aggregates(filename)
 
-    # --- Data Filtering ---
-    # Filter out entries with null/zero total_price or empty items array
-    initial_count = len(df)
-    
-    # Remove entries where total_price is null, 0, or NaN
-    
-    # Remove entries where items array is empty or null
-    df = df[df['items'].notna()]  # Remove null items
-    df = df[df['items'].apply(lambda x: isinstance(x, list) and len(x) > 0)]  # Remove empty arrays
-    
-    filtered_count = len(df)
-    filtered_out = initial_count - filtered_count
-    
-    if filtered_out > 0:
-        st.info(f"Info: Kassenbons ({filtered_out}) wurden herausgefiltert. Entweder hatten sie keinen Gesamtpreis oder keine Artikel. Kassenbons vor Februar 2023 sind möglicherweise betroffen.")
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_item_dimension(filename, version):
+    return load_item_dimension(filename)
 
-    # --- Streamlit Dashboard ---
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_price_history(filename, version):
+    return load_price_history(filename)
 
-    st.set_page_config(layout="wide", page_title="Lidl Kassenbons Dashboard", page_icon="🛒")
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_line_store(filename, version):
+    return load_line_store(filename)
 
-    # Custom CSS for better styling
-    st.markdown("""
-    <style>
-    .main .block-container {
-        padding-top: 2rem;
-    }
-    .metric-card {
-        background-color: #f0f2f6;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border-left: 4px solid #1f77b4;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_search_index(filename, version):
+    return open_search_index(filename)
 
-    st.title("Lidl+ Dashboard")
+@st.cache_resource(show_spinner=False)
+def cached_duckdb_engine(filename):
+    return DuckDBEngine(filename)
 
-    # --- Sidebar for Filters ---
-    st.sidebar.header("Nach Datum filtern")
-    min_date = df['purchase_date'].min().date()
-    max_date = df['purchase_date'].max().date()
+# --- Per-section computations (memoized on data version and date range) ---
 
-    start_date = st.sidebar.date_input("Startdatum", min_date, min_value=min_date, max_value=max_date)
-    end_date = st.sidebar.date_input("Enddatum", max_date, min_value=min_date, max_value=max_date)
+@st.cache_data(show_spinner=False, max_entries=64)
+def compute_date_bounds(filename, version, engine):
+    if engine == ENGINE_DUCKDB:
+        return cached_duckdb_engine(filename).date_bounds()
+    return date_bounds(cached_aggregates(filename, version))
 
-    # Convert dates to datetime objects for comparison
-    start_datetime = pd.to_datetime(start_date)
-    end_datetime = pd.to_datetime(end_date) + pd.Timedelta(days=1)
+@st.cache_data(show_spinner=False, max_entries=64)
+def compute_kpis(filename, version, engine, start_date, end_date):
+    if engine == ENGINE_DUCKDB:
+        return cached_duckdb_engine(filename).kpi_summary(start_date, end_date)
+    return kpi_summary(cached_aggregates(filename, version), start_date, end_date)
 
-    # Filter dataframe based on date range
-    filtered_df = df[(df['purchase_date'] >= start_datetime) & (df['purchase_date'] < end_datetime)]
+@st.cache_data(show_spinner=False, max_entries=64)
+def compute_daily_spending(filename, version, engine, start_date, end_date):
+    if engine == ENGINE_DUCKDB:
+        return cached_duckdb_engine(filename).daily_spending_frame(start_date, end_date)
+    return daily_spending_frame(cached_aggregates(filename, version), start_date, end_date)
 
-    # --- Main Page ---
+@st.cache_data(show_spinner=False, max_entries=64)
+def compute_weekly_spending(filename, version, start_date, end_date):
+    # Weekly totals and running statistics only exist in the rollups
+    return weekly_spending_frame(cached_aggregates(filename, version), start_date, end_date)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def compute_item_totals(filename, version, engine, start_date, end_date):
+    if engine == ENGINE_DUCKDB:
+        # Let DuckDB do the top-N selection instead of returning every product
+        return cached_duckdb_engine(filename).item_totals_frame(start_date, end_date, limit=10)
+    return item_totals_frame(
+        cached_line_store(filename, version), cached_item_dimension(filename, version), start_date, end_date
+    )
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def compute_top_items(filename, version, engine, start_date, end_date, view_mode):
+    items_df = compute_item_totals(filename, version, engine, start_date, end_date)
+    return top_items_frame(items_df, view_mode)
 
+# Function to load the first and last purchase day of the JSON file
+def load_data(filename, version, engine):
+    if not os.path.exists(filename):
+        st.error(f"Fehler: Die Datei '{filename}' wurde nicht gefunden. Bitte erstellen Sie sie im gleichen Verzeichnis wie das Skript.")
+        return None # Return None to stop the script from running further
+
+    try:
+        bounds = compute_date_bounds(filename, version, engine)
+    except Exception as e:
+        st.error(f"Ein unerwarteter Fehler ist aufgetreten: {e}")
+        return None
+
+    if not bounds:
+        st.error(f"Fehler: Die Datei '{filename}' enthält keine gültigen Kassenbons. Bitte überprüfen Sie das Format.")
+        return None
+    return bounds
+
+# --- Dashboard Sections ---
+
+def render_kpis(version, engine, start_date, end_date):
     st.header("Kennzahlen")
 
-    # Calculate metrics from the filtered data
-    total_receipts = len(filtered_df)
-    total_spent = filtered_df['total_price'].sum()
-    total_saved = filtered_df['saved_amount'].sum()
-    # Sticker discounts (separate from regular 'saved_amount')
-    sticker_saved = filtered_df['sticker_discount_amount'].sum() if 'sticker_discount_amount' in filtered_df.columns else 0.0
-    
-    # Handle Lidl Plus savings if available
-    if 'lidlplus_saved_amount' in filtered_df.columns:
-        lidlplus_saved = filtered_df['lidlplus_saved_amount'].sum()
-    else:
-        lidlplus_saved = 0
+    kpis = compute_kpis(DATA_FILE, version, engine, start_date, end_date)
+    total_spent = kpis['spent']
 
     # First row: Basic metrics
     st.markdown("##### Grunddaten")
     col1, col2 = st.columns(2)
     col1.metric("Ausgaben gesamt", f"€{total_spent:,.2f}")
 
-    col2.metric("Kassenbons gesamt", f"{total_receipts}")
-    
+    col2.metric("Kassenbons gesamt", f"{kpis['receipts']}")
+
     # Second row: Lidl Plus savings
     st.markdown("##### Lidl Plus Ersparnisse")
     col1, col2 = st.columns(2)
-    lidlplus_percentage = (lidlplus_saved / total_spent * 100) if total_spent > 0 else 0
-    col1.metric("Lidl Plus gespart", f"€{lidlplus_saved:,.2f}")
+    lidlplus_percentage = (kpis['lidlplus'] / total_spent * 100) if total_spent > 0 else 0
+    col1.metric("Lidl Plus gespart", f"€{kpis['lidlplus']:,.2f}")
     col2.metric("Lidl Plus Sparquote", f"{lidlplus_percentage:.1f}%")
-    
+
     # Third row: Regular savings
     st.markdown("##### Reguläre Rabatte")
     col1, col2 = st.columns(2)
-    regular_percentage = (total_saved / total_spent * 100) if total_spent > 0 else 0
-    col1.metric("Reguläre Rabatte gespart", f"€{total_saved:,.2f}")
+    regular_percentage = (kpis['saved'] / total_spent * 100) if total_spent > 0 else 0
+    col1.metric("Reguläre Rabatte gespart", f"€{kpis['saved']:,.2f}")
     col2.metric("Reguläre Sparquote", f"{regular_percentage:.1f}%")
 
     # Fourth row: Sticker discounts (RABATT X%)
     st.markdown("##### Sticker Rabatte (RABATT X%)")
     col1, col2 = st.columns(2)
-    sticker_percentage = (sticker_saved / total_spent * 100) if total_spent > 0 else 0
-    col1.metric("Sticker Rabatte gespart", f"€{sticker_saved:,.2f}")
+    sticker_percentage = (kpis['sticker'] / total_spent * 100) if total_spent > 0 else 0
+    col1.metric("Sticker Rabatte gespart", f"€{kpis['sticker']:,.2f}")
     col2.metric("Sticker Sparquote", f"{sticker_percentage:.1f}%")
 
-    st.markdown("---")
+    return kpis['receipts']
 
-    # --- Spending Over Time ---
+def render_spending(version, engine, start_date, end_date):
     st.header("Ausgaben über Zeit")
-    
-    if not filtered_df.empty:
-        # Create daily spending aggregation
-        spending_over_time = filtered_df.copy()
-        spending_over_time['date'] = spending_over_time['purchase_date'].dt.date
-        daily_spending = spending_over_time.groupby('date')['total_price'].sum().reset_index()
-        daily_spending.columns = ['Datum', 'Tägliche Ausgaben (€)']
-        
-        # Calculate cumulative spending
-        daily_spending['Kumulative Ausgaben (€)'] = daily_spending['Tägliche Ausgaben (€)'].cumsum()
-        
+
+    daily_spending = compute_daily_spending(DATA_FILE, version, engine, start_date, end_date)
+
+    if not daily_spending.empty:
         # Toggle for daily vs cumulative view
         spending_view = st.radio("Ausgabenansicht:", ["Täglich", "Kumulativ"], horizontal=True, key="spending_view")
-        
+
         if spending_view == "Täglich":
             st.bar_chart(daily_spending.set_index('Datum')['Tägliche Ausgaben (€)'])
-            
+
             # Show summary stats
             col1, col2, col3 = st.columns(3)
             col1.metric("Durchschnittliche tägliche Ausgaben", f"€{daily_spending['Tägliche Ausgaben (€)'].mean():.2f}")
             col2.metric("Höchste tägliche Ausgaben", f"€{daily_spending['Tägliche Ausgaben (€)'].max():.2f}")
             col3.metric("Niedrigste tägliche Ausgaben", f"€{daily_spending['Tägliche Ausgaben (€)'].min():.2f}")
-            
+
         else:  # Cumulative view
             st.bar_chart(daily_spending.set_index('Datum')['Kumulative Ausgaben (€)'])
-            
+
             # Show growth metrics
             total_days = len(daily_spending)
             avg_daily_growth = daily_spending['Kumulative Ausgaben (€)'].iloc[-1] / total_days if total_days > 0 else 0
-            
+
             col1, col2 = st.columns(2)
             col1.metric("Tage gesamt", total_days)
             col2.metric("Durchschnittliches tägliches Wachstum", f"€{avg_daily_growth:.2f}")
     else:
         st.write("Keine Ausgabendaten für den ausgewählten Datumsbereich verfügbar.")
 
-    st.markdown("---")
+def render_forecast(version, start_date, end_date, last_day):
+    st.header("Prognose und Auffälligkeiten")
 
-    # --- Top 10 Most Purchased Items ---
+    # Relative to the last purchase, so a history that was not synced for a while still makes sense
+    aggregates = cached_aggregates(DATA_FILE, version)
+    forecast = spending_forecast(aggregates, last_day)
+    st.caption(f"Stand: letzter Einkauf am {last_day:%d.%m.%Y}")
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric(
+        "Ausgaben diese Woche",
+        f"€{forecast['week_spent'] / 100:,.2f}",
+        f"{(forecast['week_spent'] - forecast['weekly_average']) / 100:+,.2f} € ggü. Durchschnitt",
+        delta_color="inverse",
+    )
+    col2.metric("Durchschnitt pro Woche (4 Wochen)", f"€{forecast['weekly_average'] / 100:,.2f}")
+    col3.metric(
+        f"Prognose {MONTH_NAMES[last_day.month - 1]}",
+        f"€{forecast['month_forecast'] / 100:,.2f}",
+        help=f"Bisher €{forecast['month_spent'] / 100:,.2f}, Rest des Monats nach dem Wochendurchschnitt",
+    )
+    next_month = forecast["next_month"]
+    seasonal_note = (
+        f"saisonal angepasst (Faktor {forecast['seasonal_factor']:.2f})"
+        if forecast["seasonal_factor"]
+        else "ohne saisonale Anpassung (weniger als zwei Jahre Daten)"
+    )
+    col4.metric(
+        f"Prognose {MONTH_NAMES[next_month.month - 1]}",
+        f"€{forecast['next_month_forecast'] / 100:,.2f}",
+        help=f"Durchschnitt der letzten 3 Monate, {seasonal_note}",
+    )
+
+    weekly_spending = compute_weekly_spending(DATA_FILE, version, start_date, end_date)
+    if not weekly_spending.empty:
+        st.line_chart(weekly_spending.set_index("Woche"))
+
+    st.markdown("##### Auffällige Wochen (gesamt und pro Filiale)")
+    anomalies = anomalies_frame(aggregates)
+    if anomalies.empty:
+        st.write("Keine auffälligen Wochen in letzter Zeit.")
+    else:
+        st.dataframe(anomalies, width='stretch', hide_index=True)
+
+def render_top_items(version, engine, start_date, end_date):
     st.header("Top 10 der meistgekauften Artikel")
 
-    if not filtered_df.empty:
-        # Toggle for quantity vs price
-        view_mode = st.radio("Anzeigen nach:", ["Menge", "Gesamtpreis"], horizontal=True)
-        
-        # Extract all items from the filtered receipts
-        items_data = []
-        for _, row in filtered_df.iterrows():
-            if row.get('items') and isinstance(row['items'], list):
-                for item in row['items']:
-                    try:
-                        # Handle both string and numeric quantities, convert commas to dots for German format
-                        quantity_str = str(item.get('quantity', 1))
-                        quantity = float(quantity_str.replace(',', '.'))
-                        price = to_float(item.get('price', 0))
-                        unit = item.get('unit', 'stk')  # Default to 'stk' if no unit specified
-                    except (ValueError, TypeError):
-                        quantity = 1.0
-                        price = 0
-                        unit = 'stk'
-                    
-                    items_data.append({
-                        'name': item['name'],
-                        'quantity': quantity,
-                        'price': price,
-                        'unit': unit,
-                        'total_value': quantity * price
-                    })
-
-        if items_data:
-            items_df = pd.DataFrame(items_data)
-            
-            # Filter out Pfand items (deposit bottles/cans)
-            items_df = items_df[~items_df['name'].str.contains('Pfand', case=False, na=False)]
-            
-            if view_mode == "Menge":
-                # Group by item name and sum quantities, keeping track of units
-                grouped = items_df.groupby('name').agg({
-                    'quantity': 'sum',
-                    'unit': 'first'  # Take the first unit (should be consistent for same item)
-                }).reset_index()
-                grouped = grouped.sort_values('quantity', ascending=False).head(10)
-                
-                # Format quantities nicely and add units
-                grouped['Gesamtmenge'] = grouped.apply(lambda row: 
-                    f"{row['quantity']:.3f} {row['unit']}" if row['unit'] == 'kg' 
-                    else f"{int(row['quantity'])} {row['unit']}", axis=1)
-                
-                # Select only the columns we want to display
-                display_df = grouped[['name', 'Gesamtmenge']].copy()
-                display_df.columns = ['Artikel', 'Gesamtmenge']
-                
-                st.dataframe(display_df, width='stretch', hide_index=True)
-                
-            else:  # Total Price view
-                # Group by item name and sum total values
-                grouped = items_df.groupby('name')['total_value'].sum().reset_index()
-                grouped = grouped.sort_values('total_value', ascending=False).head(10)
-                grouped.columns = ['Artikel', 'Ausgaben gesamt (€)']
-                grouped['Ausgaben gesamt (€)'] = grouped['Ausgaben gesamt (€)'].round(2)
-                
-                st.dataframe(grouped, width='stretch', hide_index=True)
-        else:
-            st.write("Keine Artikel im ausgewählten Datumsbereich gefunden.")
+    # The item table is only built while this section is shown
+    if not st.checkbox("Artikelauswertung anzeigen", value=True, key="show_top_items"):
+        return
+
+    # Toggle for quantity vs price
+    view_mode = st.radio("Anzeigen nach:", ["Menge", "Gesamtpreis"], horizontal=True)
+
+    display_df = compute_top_items(DATA_FILE, version, engine, start_date, end_date, view_mode)
+
+    if not display_df.empty:
+        st.dataframe(display_df, width='stretch', hide_index=True)
+    else:
+        st.write("Keine Artikel im ausgewählten Datumsbereich gefunden.")
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def compute_search_results(filename, version, query):
+    product_keys = search_products(cached_search_index(filename, version), query)
+    return product_summary_frame(
+        cached_price_history(filename, version), cached_item_dimension(filename, version), product_keys
+    )
+
+def render_search(version):
+    st.header("Artikelsuche")
+
+    # Searches the whole history, independent of the selected date range
+    query = st.text_input("Artikel suchen", placeholder="z.B. Milch, Bananen, Joghurt", key="search_query")
+    if not query.strip():
+        return
+
+    results = compute_search_results(DATA_FILE, version, query.strip())
+    if results.empty:
+        st.write(f"Keine Artikel für '{query}' gefunden.")
+        return
+
+    display_df = results[["name", "unit", "purchases", "last_purchase", "last_price"]]
+    display_df.columns = ["Artikel", "Einheit", "Käufe", "Zuletzt gekauft", "Letzter Preis (€)"]
+    st.dataframe(display_df, width='stretch', hide_index=True)
+
+# Re-running a fragment only re-executes its own widgets (Streamlit >= 1.37),
+# so toggling the item view does not touch the other sections.
+if hasattr(st, "fragment"):
+    render_spending = st.fragment(render_spending)
+    render_forecast = st.fragment(render_forecast)
+    render_top_items = st.fragment(render_top_items)
+    render_search = st.fragment(render_search)
+
+def watch_for_new_data(filename, version, interval):
+    """Poll the receipts file stamp (a single stat call) and rerun the page once it changes."""
+    if hasattr(st, "fragment"):
+        # Only this tiny fragment reruns on the timer; the page reruns on new data
+        @st.fragment(run_every=interval)
+        def poll():
+            if receipts_mtime_ns(filename) != version:
+                st.rerun()
+
+        poll()
+    else:
+        # Older Streamlit: block until the next check, then rerun the whole page
+        time.sleep(interval)
+        st.rerun()
+
+st.set_page_config(layout="wide", page_title="Lidl Kassenbons Dashboard", page_icon="🛒")
+
+# Watch mode for wall displays: pick up data written by a background `get_data.py update`
+st.sidebar.header("Aktualisierung")
+auto_refresh = st.sidebar.checkbox("Automatisch aktualisieren", value=False, key="auto_refresh")
+refresh_interval = st.sidebar.number_input(
+    "Prüfintervall (Sekunden)", min_value=5, value=DEFAULT_REFRESH_INTERVAL, step=5, disabled=not auto_refresh
+)
+
+# Optional DuckDB engine queries the receipts file in place instead of the rollups
+engine = ENGINE_ROLLUPS
+if DUCKDB_AVAILABLE:
+    engine = st.sidebar.radio("Abfrage-Engine", [ENGINE_ROLLUPS, ENGINE_DUCKDB], horizontal=True)
+
+# Load the date bounds (rollups are rebuilt automatically if the receipts file changed)
+data_version = receipts_mtime_ns(DATA_FILE)
+data = load_data(DATA_FILE, data_version, engine)
+
+# --- Main Application Logic ---
+# We only run the dashboard logic if the data was loaded successfully
+if data:
+    # --- Data Filtering ---
+    # Receipts without items or date are excluded from the rollups
+    if engine == ENGINE_ROLLUPS:
+        filtered_out = cached_aggregates(DATA_FILE, data_version)['skipped']
+
+        if filtered_out > 0:
+            st.info(f"Info: Kassenbons ({filtered_out}) wurden herausgefiltert. Entweder hatten sie keinen Gesamtpreis oder keine Artikel. Kassenbons vor Februar 2023 sind möglicherweise betroffen.")
+
+    # --- Streamlit Dashboard ---
+
+    # Custom CSS for better styling
+    st.markdown("""
+    <style>
+    .main .block-container {
+        padding-top: 2rem;
+    }
+    .metric-card {
+        background-color: #f0f2f6;
+        padding: 1rem;
+        border-radius: 0.5rem;
+        border-left: 4px solid #1f77b4;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    st.title("Lidl+ Dashboard")
+
+    # --- Sidebar for Filters ---
+    st.sidebar.header("Nach Datum filtern")
+    min_date, max_date = data
 
+    start_date = st.sidebar.date_input("Startdatum", min_date, min_value=min_date, max_value=max_date)
+    end_date = st.sidebar.date_input("Enddatum", max_date, min_value=min_date, max_value=max_date)
+
+    # --- Main Page ---
+
+    total_receipts = render_kpis(data_version, engine, start_date, end_date)
+
+    st.markdown("---")
+
+    # --- Spending Over Time ---
+    render_spending(data_version, engine, start_date, end_date)
+
+    st.markdown("---")
+
+    # --- Forecast and Anomalies ---
+    render_forecast(data_version, start_date, end_date, max_date)
+
+    st.markdown("---")
+
+    # --- Top 10 Most Purchased Items ---
+    if total_receipts > 0:
+        render_top_items(data_version, engine, start_date, end_date)
     else:
-        st.write("Keine Daten für den ausgewählten Datumsbereich verfügbar.")
\ No newline at end of file
+        st.header("Top 10 der meistgekauften Artikel")
+        st.write("Keine Daten für den ausgewählten Datumsbereich verfügbar.")
+
+    st.markdown("---")
+
+    # --- Article Search ---
+    render_search(data_version)
+
+if auto_refresh:
+    watch_for_new_data(DATA_FILE, data_version, refresh_interval)
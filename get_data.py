@@ -11,14 +11,23 @@ Usage:
     python get_data.py update --browser chromium   # Non-interactive update
     python get_data.py initial --cookies-file cookies.json  # Use cookie file
     python get_data.py update --country bg --browser chromium  # Bulgaria
+    python get_data.py update --browser firefox --metrics-json run.json  # Timing summary
+    python get_data.py initial --browser firefox --profile --trace-parse 20  # Profiling
+    python get_data.py batch profiles.toml         # Several accounts concurrently
+    python get_data.py watch --browser firefox --interval 600  # Continuous sync
+    python get_data.py search "milch"              # Search purchased articles
+    python get_data.py refresh --browser firefox   # Re-fetch changed, re-parse outdated receipts
+    python get_data.py export --start 2024-01-01   # Receipts and items as CSV files
 """
 
 import argparse
 import sys
+from datetime import date
 
-from cli import main
-from config import LidlConfig
-from workflows import initial_setup, update_data
+from config import LidlConfig, LidlProfile, load_profiles
+
+# Output file of --trace-parse
+PARSE_TRACE_FILE = "parse_trace.json"
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -47,6 +56,60 @@ def create_parser() -> argparse.ArgumentParser:
             metavar="CODE",
             help="Two-letter country code (e.g., 'de', 'bg', 'nl'). Default: de",
         )
+        subparser.add_argument(
+            "--base-url",
+            metavar="URL",
+            help="Use another API base URL, e.g. the mock server from benchmarks/ (default: https://www.lidl.<country>)",
+        )
+        subparser.add_argument(
+            "--metrics-json",
+            metavar="FILE",
+            help="Write a JSON run summary with per-stage timings and counters",
+        )
+        subparser.add_argument(
+            "--metrics-prometheus",
+            metavar="FILE",
+            help="Write the run metrics in Prometheus text format",
+        )
+        subparser.add_argument(
+            "--profile",
+            nargs="?",
+            const="get_data_profile",
+            metavar="PREFIX",
+            help="Profile the run and write PREFIX.pstats and PREFIX.collapsed (default prefix: get_data_profile)",
+        )
+        subparser.add_argument(
+            "--trace-parse",
+            type=int,
+            metavar="N",
+            help="Record the N receipts with the slowest parse times (written to parse_trace.json)",
+        )
+        subparser.add_argument(
+            "--no-cookie-cache",
+            action="store_true",
+            help="Always extract fresh cookies from the browser (ignore and don't write the cookie cache)",
+        )
+        subparser.add_argument(
+            "--archive",
+            type=int,
+            nargs="?",
+            const=1,
+            metavar="MONTHS",
+            help="Move receipts of closed months to the compressed archive, keeping the last MONTHS months (default: 1, the current one) in the receipts file",
+        )
+        subparser.add_argument(
+            "--parse-workers",
+            type=int,
+            metavar="N",
+            help="Number of processes parsing receipts while downloading (default: one per CPU core, 0: no extra processes)",
+        )
+        subparser.add_argument(
+            "--max-request-rate",
+            type=float,
+            metavar="N",
+            help=f"Highest number of receipt requests per second (default: {LidlConfig.MAX_REQUEST_RATE}); "
+            "the rate adapts to the server's responses up to this limit",
+        )
 
     # Initial setup subcommand
     initial_parser = subparsers.add_parser(
@@ -62,29 +125,291 @@ def create_parser() -> argparse.ArgumentParser:
     )
     add_common_args(update_parser)
 
+    # Watch subcommand
+    watch_parser = subparsers.add_parser(
+        "watch",
+        aliases=["serve"],
+        help="Keep running and add new receipts as they appear",
+    )
+    add_common_args(watch_parser)
+    watch_parser.add_argument(
+        "--interval",
+        type=float,
+        default=LidlConfig.WATCH_INTERVAL,
+        metavar="SECONDS",
+        help=f"Seconds between checks for new receipts (default: {LidlConfig.WATCH_INTERVAL})",
+    )
+    watch_parser.add_argument(
+        "--jitter",
+        type=float,
+        default=LidlConfig.WATCH_JITTER,
+        metavar="FRACTION",
+        help=f"Random deviation of the interval, e.g. 0.1 for ±10%% (default: {LidlConfig.WATCH_JITTER})",
+    )
+
+    # Refresh subcommand
+    refresh_parser = subparsers.add_parser(
+        "refresh",
+        help="Re-fetch changed receipts and re-parse receipts of an older parser version",
+    )
+    add_common_args(refresh_parser)
+    refresh_parser.add_argument(
+        "--no-fetch",
+        action="store_true",
+        help="Only re-parse receipts from the local source cache (no login, no requests)",
+    )
+
+    # Batch subcommand
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Update several accounts/countries concurrently from a TOML profile file",
+    )
+    batch_parser.add_argument(
+        "profiles_file",
+        metavar="PROFILES",
+        help="TOML file with one [profiles.<name>] table per account",
+    )
+    batch_parser.add_argument(
+        "--initial",
+        action="store_true",
+        help="Run the initial setup instead of an update for every account",
+    )
+    batch_parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="Number of accounts processed at the same time (default: all)",
+    )
+    batch_parser.add_argument(
+        "--merged-file",
+        metavar="FILE",
+        help="Write the receipts of all accounts to FILE (overrides merged_file in the profile file)",
+    )
+    batch_parser.add_argument(
+        "--metrics-json",
+        metavar="FILE",
+        help="Write a JSON run summary with per-stage timings and counters",
+    )
+    batch_parser.add_argument(
+        "--metrics-prometheus",
+        metavar="FILE",
+        help="Write the run metrics in Prometheus text format",
+    )
+
+    # Search subcommand
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Search all purchased articles by name or article number",
+    )
+    search_parser.add_argument("query", metavar="TERM", help="Search text (parts of words are matched)")
+    search_parser.add_argument(
+        "--file",
+        default=LidlConfig.RECEIPTS_JSON_FILE,
+        metavar="FILE",
+        help=f"Receipts file to search (default: {LidlConfig.RECEIPTS_JSON_FILE})",
+    )
+    search_parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        metavar="N",
+        help="Maximum number of articles shown (default: 20)",
+    )
+    search_parser.add_argument(
+        "--no-fuzzy",
+        action="store_true",
+        help="Don't retry with similar words if nothing matches exactly",
+    )
+
+    # Export subcommand
+    export_parser = subparsers.add_parser(
+        "export",
+        help="Export receipts and line items as CSV (or Excel) files",
+    )
+    export_parser.add_argument(
+        "--file",
+        default=LidlConfig.RECEIPTS_JSON_FILE,
+        metavar="FILE",
+        help=f"Receipts file to export (default: {LidlConfig.RECEIPTS_JSON_FILE})",
+    )
+    export_parser.add_argument(
+        "--output-dir",
+        default="export",
+        metavar="DIR",
+        help="Directory for receipts.csv and items.csv (default: export)",
+    )
+    export_parser.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        metavar="YYYY-MM-DD",
+        help="First purchase date to export (default: oldest receipt)",
+    )
+    export_parser.add_argument(
+        "--end",
+        type=date.fromisoformat,
+        metavar="YYYY-MM-DD",
+        help="Last purchase date to export (default: newest receipt)",
+    )
+    export_parser.add_argument(
+        "--xlsx",
+        action="store_true",
+        help="Also write receipts.xlsx (requires openpyxl)",
+    )
+    export_parser.add_argument(
+        "--delimiter",
+        default=";",
+        help="CSV field delimiter (default: ';')",
+    )
+
     return parser
 
 
-def run_workflow(args: argparse.Namespace, workflow_func) -> bool:
+def run_workflow(args: argparse.Namespace, workflow_func, **workflow_kwargs) -> bool:
     """Run a workflow with the appropriate auth method."""
-    # Set country if provided
+    # Command line settings go into a profile instead of the global config
+    overrides = {}
     if args.country:
-        LidlConfig.set_country(args.country)
+        overrides["country"] = args.country.lower()
+    if args.base_url:
+        overrides["base_url"] = args.base_url
+    if args.no_cookie_cache:
+        overrides["use_cookie_cache"] = False
+    if args.archive is not None:
+        overrides["archive_hot_months"] = args.archive
+    if args.parse_workers is not None:
+        overrides["parse_workers"] = args.parse_workers
+    if args.max_request_rate is not None:
+        overrides["max_request_rate"] = args.max_request_rate
+    if args.profile:
+        # The profiler only samples this process, so parse here as well
+        overrides["parse_workers"] = 0
 
     if args.browser:
-        return workflow_func(auth_method=args.browser)
+        kwargs = {"auth_method": args.browser}
     elif args.cookies_file:
-        return workflow_func(auth_method="file", cookies_file=args.cookies_file)
+        kwargs = {"auth_method": "file", "cookies_file": args.cookies_file}
     else:
         # Interactive mode
-        return workflow_func()
+        kwargs = {}
+    kwargs["profile"] = LidlProfile.from_config(**overrides)
+    kwargs.update(workflow_kwargs)
+
+    if args.trace_parse:
+        from profiling import PARSE_TRACER
+
+        PARSE_TRACER.enable(args.trace_parse)
+
+    try:
+        if args.profile:
+            from profiling import run_profiled
+
+            return run_profiled(workflow_func, args.profile, **kwargs)
+        return workflow_func(**kwargs)
+    finally:
+        write_metrics(args)
+        if args.trace_parse:
+            PARSE_TRACER.report(PARSE_TRACE_FILE)
+
+
+def run_batch_command(args: argparse.Namespace) -> bool:
+    """Run the batch workflow for all profiles of a TOML file."""
+    from workflows import run_batch
+
+    try:
+        profiles, merged_file = load_profiles(args.profiles_file)
+    except (OSError, ValueError) as e:
+        print(f"✗ Profildatei konnte nicht geladen werden: {e}")
+        return False
+
+    try:
+        return run_batch(
+            profiles,
+            initial=args.initial,
+            max_workers=args.workers,
+            merged_file=args.merged_file or merged_file,
+        )
+    finally:
+        write_metrics(args)
+
+
+def run_search_command(args: argparse.Namespace) -> bool:
+    """Search the purchased articles and print them with their last price."""
+    from storage import load_item_dimension, load_price_history, open_search_index, search_products
+    from analytics import product_summary_frame
+
+    connection = open_search_index(args.file)
+    if connection is None:
+        print(f"✗ Die Datei '{args.file}' wurde nicht gefunden.")
+        return False
+
+    try:
+        product_keys = search_products(connection, args.query, args.limit, fuzzy=not args.no_fuzzy)
+    finally:
+        connection.close()
+    if not product_keys:
+        print(f"Keine Artikel für '{args.query}' gefunden.")
+        return True
+
+    results = product_summary_frame(
+        load_price_history(args.file), load_item_dimension(args.file), product_keys
+    )
+    width = max(len("Artikel"), results["name"].str.len().max())
+    print(f"{'Artikel':<{width}}  {'Käufe':>5}  {'Zuletzt':>10}  {'Preis':>13}")
+    for row in results.itertuples():
+        last_purchase = row.last_purchase.strftime("%d.%m.%Y") if row.last_purchase else "-"
+        price = f"{row.last_price:.2f} €/{row.unit}" if row.last_purchase else "-"
+        print(f"{row.name:<{width}}  {row.purchases:>5}  {last_purchase:>10}  {price:>13}")
+    return True
+
+
+def run_export_command(args: argparse.Namespace) -> bool:
+    """Export the receipts of the requested date range."""
+    from storage import export_receipts, receipts_mtime_ns
+
+    if receipts_mtime_ns(args.file) is None:
+        print(f"✗ Die Datei '{args.file}' wurde nicht gefunden.")
+        return False
+
+    try:
+        receipt_count, item_count = export_receipts(
+            args.output_dir,
+            start=args.start,
+            end=args.end,
+            receipts_file=args.file,
+            xlsx=args.xlsx,
+            delimiter=args.delimiter,
+        )
+    except (ImportError, OSError) as e:
+        print(f"✗ Export fehlgeschlagen: {e}")
+        return False
+    print(f"{receipt_count} Kassenbons mit {item_count} Artikeln nach '{args.output_dir}' exportiert.")
+    return True
+
+
+def write_metrics(args: argparse.Namespace) -> None:
+    """Write the run metrics to the files requested on the command line."""
+    if not (args.metrics_json or args.metrics_prometheus):
+        return
+
+    from metrics import write_json_summary, write_prometheus_text
+
+    if args.metrics_json:
+        write_json_summary(args.metrics_json)
+        print(f"Metriken gespeichert: {args.metrics_json}")
+    if args.metrics_prometheus:
+        write_prometheus_text(args.metrics_prometheus)
+        print(f"Metriken gespeichert: {args.metrics_prometheus}")
 
 
 if __name__ == "__main__":
     parser = create_parser()
     args = parser.parse_args()
 
+    # Workflows are imported only after argument parsing so that --help and
+    # usage errors don't pay for loading requests, bs4 and browser_cookie3
     if args.command == "initial":
+        from workflows import initial_setup
+
         success = run_workflow(args, initial_setup)
         if success:
             print("✓ Initial Setup erfolgreich abgeschlossen!")
@@ -93,6 +418,8 @@ if __name__ == "__main__":
             sys.exit(1)
 
     elif args.command == "update":
+        from workflows import update_data
+
         success = run_workflow(args, update_data)
         if success:
             print("✓ Update erfolgreich abgeschlossen!")
@@ -100,6 +427,44 @@ if __name__ == "__main__":
             print("✗ Update fehlgeschlagen!")
             sys.exit(1)
 
+    elif args.command in ("watch", "serve"):
+        from workflows import watch_receipts
+
+        success = run_workflow(
+            args, watch_receipts, interval=args.interval, jitter=args.jitter
+        )
+        if not success:
+            print("✗ Watch-Modus konnte nicht gestartet werden!")
+            sys.exit(1)
+
+    elif args.command == "batch":
+        success = run_batch_command(args)
+        if success:
+            print("✓ Batch-Update erfolgreich abgeschlossen!")
+        else:
+            print("✗ Batch-Update für mindestens ein Konto fehlgeschlagen!")
+            sys.exit(1)
+
+    elif args.command == "refresh":
+        from workflows import refresh_receipts
+
+        success = run_workflow(args, refresh_receipts, fetch=not args.no_fetch)
+        if success:
+            print("✓ Refresh erfolgreich abgeschlossen!")
+        else:
+            print("✗ Refresh fehlgeschlagen!")
+            sys.exit(1)
+
+    elif args.command == "search":
+        if not run_search_command(args):
+            sys.exit(1)
+
+    elif args.command == "export":
+        if not run_export_command(args):
+            sys.exit(1)
+
     else:
         # No subcommand - run interactive menu
+        from cli import main
+
         main()
@@ -0,0 +1,20 @@
+"""Metrics module for run timing and throughput instrumentation."""
+
+from .registry import METRICS, MetricsRegistry, Counter, Histogram
+from .exporters import (
+    metrics_summary,
+    write_json_summary,
+    prometheus_text,
+    write_prometheus_text,
+)
+
+__all__ = [
+    "METRICS",
+    "MetricsRegistry",
+    "Counter",
+    "Histogram",
+    "metrics_summary",
+    "write_json_summary",
+    "prometheus_text",
+    "write_prometheus_text",
+]
@@ -0,0 +1,80 @@
+"""Export recorded metrics as a JSON run summary or Prometheus text format."""
+
+import json
+import time
+from typing import Dict, Any, Optional
+
+from .registry import METRICS, MetricsRegistry
+
+PROMETHEUS_PREFIX = "shopping_analyzer_"
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 6)
+
+
+def metrics_summary(registry: MetricsRegistry = METRICS) -> Dict[str, Any]:
+    """
+    Build a JSON-serializable summary of all counters and histograms.
+
+    Returns:
+        dict: Run duration, counter values and per-histogram statistics
+    """
+    histograms = {}
+    for name, histogram in sorted(registry.histograms.items()):
+        histograms[name] = {
+            "count": histogram.count,
+            "sum": _round(histogram.sum),
+            "mean": _round(histogram.sum / histogram.count) if histogram.count else None,
+            "min": _round(histogram.min),
+            "p50": _round(histogram.percentile(0.5)),
+            "p95": _round(histogram.percentile(0.95)),
+            "max": _round(histogram.max),
+        }
+
+    return {
+        "started_at": registry.started_at,
+        "duration_seconds": round(time.time() - registry.started_at, 3),
+        "counters": {
+            name: _round(counter.value) for name, counter in sorted(registry.counters.items())
+        },
+        "histograms": histograms,
+    }
+
+
+def write_json_summary(file_path: str, registry: MetricsRegistry = METRICS) -> None:
+    """Write the run summary as JSON."""
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump(metrics_summary(registry), file, indent=2)
+
+
+def prometheus_text(registry: MetricsRegistry = METRICS) -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    lines = []
+    for name, counter in sorted(registry.counters.items()):
+        metric = f"{PROMETHEUS_PREFIX}{name}"
+        if counter.description:
+            lines.append(f"# HELP {metric} {counter.description}")
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {counter.value}")
+
+    for name, histogram in sorted(registry.histograms.items()):
+        metric = f"{PROMETHEUS_PREFIX}{name}"
+        if histogram.description:
+            lines.append(f"# HELP {metric} {histogram.description}")
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+        lines.append(f"{metric}_sum {histogram.sum}")
+        lines.append(f"{metric}_count {histogram.count}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_text(file_path: str, registry: MetricsRegistry = METRICS) -> None:
+    """Write all metrics in Prometheus text format (e.g. for the node_exporter textfile collector)."""
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(prometheus_text(registry))
@@ -0,0 +1,120 @@
+"""Lightweight in-process counters and histograms for pipeline instrumentation."""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Default histogram bucket upper bounds in seconds (Prometheus style)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Samples kept per histogram for percentile estimates
+MAX_SAMPLES = 10000
+
+
+class Counter:
+    """Monotonically increasing value (e.g. bytes downloaded)."""
+
+    def __init__(self, name: str, description: str = "") -> None:
+        self.name = name
+        self.description = description
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the counter."""
+        with self._lock:
+            self.value += amount
+
+
+class Histogram:
+    """Distribution of observed values (e.g. request latencies)."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self._samples: List[float] = []
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record a single observation."""
+        with self._lock:
+            self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+            if len(self._samples) < MAX_SAMPLES:
+                self._samples.append(value)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Estimate a percentile (0..1) from the retained samples."""
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(int(fraction * len(ordered)), len(ordered) - 1)
+        return ordered[index]
+
+
+class MetricsRegistry:
+    """Named collection of counters and histograms for one run."""
+
+    def __init__(self) -> None:
+        self.counters: Dict[str, Counter] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        """Get or create a counter."""
+        with self._lock:
+            if name not in self.counters:
+                self.counters[name] = Counter(name, description)
+            return self.counters[name]
+
+    def histogram(self, name: str, description: str = "") -> Histogram:
+        """Get or create a histogram."""
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram(name, description)
+            return self.histograms[name]
+
+    @contextmanager
+    def timer(self, name: str, description: str = "") -> Iterator[None]:
+        """Observe the wall-clock duration of a block in a histogram (seconds)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name, description).observe(time.perf_counter() - start)
+
+    def sleep(self, seconds: float) -> None:
+        """Sleep and account the time in the `sleep_seconds_total` counter."""
+        if seconds <= 0:
+            return
+        time.sleep(seconds)
+        self.counter("sleep_seconds_total", "Time spent sleeping between requests").inc(seconds)
+
+    def reset(self) -> None:
+        """Drop all recorded metrics (e.g. between runs in one process)."""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.started_at = time.time()
+
+
+# Process-wide registry used by the instrumented modules
+METRICS = MetricsRegistry()
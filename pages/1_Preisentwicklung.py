@@ -0,0 +1,82 @@
+import streamlit as st
+import sys
+from datetime import date
+
+from storage import load_item_dimension, load_price_history, receipts_mtime_ns
+from analytics import price_history_frame, price_change_frame
+
+# Same receipts file as the main dashboard (`streamlit run dashboard.py -- FILE`)
+DATA_FILE = sys.argv[1] if len(sys.argv) > 1 else "lidl_receipts.json"
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_item_dimension(filename, version):
+    return load_item_dimension(filename)
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_price_history(filename, version):
+    return load_price_history(filename)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def compute_price_changes(filename, version, start_date, end_date):
+    return price_change_frame(
+        cached_price_history(filename, version), cached_item_dimension(filename, version), start_date, end_date
+    )
+
+st.set_page_config(layout="wide", page_title="Preisentwicklung", page_icon="📈")
+st.title("Preisentwicklung")
+
+data_version = receipts_mtime_ns(DATA_FILE)
+if data_version is None:
+    st.error(f"Fehler: Die Datei '{DATA_FILE}' wurde nicht gefunden.")
+    st.stop()
+
+item_dimension = cached_item_dimension(DATA_FILE, data_version)
+price_history = cached_price_history(DATA_FILE, data_version)
+if not len(price_history["day"]):
+    st.error(f"Fehler: Die Datei '{DATA_FILE}' enthält keine gültigen Kassenbons.")
+    st.stop()
+
+# --- Sidebar for Filters ---
+st.sidebar.header("Nach Datum filtern")
+min_date = date.fromordinal(int(price_history["day"].min()))
+max_date = date.fromordinal(int(price_history["day"].max()))
+start_date = st.sidebar.date_input("Startdatum", min_date, min_value=min_date, max_value=max_date)
+end_date = st.sidebar.date_input("Enddatum", max_date, min_value=min_date, max_value=max_date)
+
+changes = compute_price_changes(DATA_FILE, data_version, start_date, end_date)
+
+# --- Inflation ---
+st.header("Preisänderungen im Zeitraum")
+if changes.empty:
+    st.write("Keine Artikel wurden im ausgewählten Datumsbereich mehrfach gekauft.")
+else:
+    # Products bought more often weigh more in the personal inflation rate
+    weighted_change = (changes["change"] * changes["purchases"]).sum() / changes["purchases"].sum()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Persönliche Teuerung (gewichtet)", f"{weighted_change:+.1f} %")
+    col2.metric("Median der Preisänderungen", f"{changes['change'].median():+.1f} %")
+    col3.metric("Verglichene Artikel", len(changes))
+
+    display_df = changes.sort_values("change", ascending=False)[
+        ["name", "unit", "purchases", "first_price", "last_price", "change"]
+    ].round({"first_price": 2, "last_price": 2, "change": 1})
+    display_df.columns = ["Artikel", "Einheit", "Käufe", "Erster Preis (€)", "Letzter Preis (€)", "Änderung (%)"]
+    st.dataframe(display_df, width='stretch', hide_index=True)
+
+st.markdown("---")
+
+# --- Price Trend of a Single Product ---
+st.header("Preisverlauf eines Artikels")
+if not changes.empty:
+    products = changes.sort_values("purchases", ascending=False)
+    product_key = st.selectbox(
+        "Artikel",
+        products["product"].tolist(),
+        format_func=lambda key: item_dimension["products"][key]["name"],
+    )
+    prices = price_history_frame(price_history, product_key, start_date, end_date)
+    unit = item_dimension["products"][product_key]["unit"]
+    st.caption(f"Preis pro {unit}")
+    st.line_chart(prices.groupby("Datum")["Preis (€)"].mean(), height=350)
+else:
+    st.write("Keine Daten für den ausgewählten Datumsbereich verfügbar.")
@@ -0,0 +1,84 @@
+import streamlit as st
+import sys
+from datetime import date
+
+from storage import load_store_dimension, receipts_mtime_ns
+from analytics import store_summary_frame, store_monthly_frame, store_weekday_frame
+
+# Same receipts file as the main dashboard (`streamlit run dashboard.py -- FILE`)
+DATA_FILE = sys.argv[1] if len(sys.argv) > 1 else "lidl_receipts.json"
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_store_dimension(filename, version):
+    return load_store_dimension(filename)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def compute_store_summary(filename, version, start_date, end_date):
+    return store_summary_frame(cached_store_dimension(filename, version), start_date, end_date)
+
+st.set_page_config(layout="wide", page_title="Filialen", page_icon="🏪")
+st.title("Filialen")
+
+data_version = receipts_mtime_ns(DATA_FILE)
+if data_version is None:
+    st.error(f"Fehler: Die Datei '{DATA_FILE}' wurde nicht gefunden.")
+    st.stop()
+
+store_dimension = cached_store_dimension(DATA_FILE, data_version)
+all_days = [day for entries in store_dimension["index"] for day in entries["days"]]
+if not all_days:
+    st.error(f"Fehler: Die Datei '{DATA_FILE}' enthält keine gültigen Kassenbons.")
+    st.stop()
+
+# --- Sidebar for Filters ---
+st.sidebar.header("Nach Datum filtern")
+min_date = date.fromordinal(min(all_days))
+max_date = date.fromordinal(max(all_days))
+start_date = st.sidebar.date_input("Startdatum", min_date, min_value=min_date, max_value=max_date)
+end_date = st.sidebar.date_input("Enddatum", max_date, min_value=min_date, max_value=max_date)
+
+summary = compute_store_summary(DATA_FILE, data_version, start_date, end_date)
+if summary.empty:
+    st.write("Keine Daten für den ausgewählten Datumsbereich verfügbar.")
+    st.stop()
+
+# --- Store Overview ---
+st.header("Übersicht")
+col1, col2, col3 = st.columns(3)
+col1.metric("Besuchte Filialen", len(summary))
+col2.metric("Einkäufe", int(summary["visits"].sum()))
+col3.metric("Stammfiliale", summary.sort_values("visits", ascending=False)["name"].iloc[0])
+
+display_df = summary[
+    ["name", "address", "visits", "spend", "avg_visit", "visits_per_month", "avg_gap", "last_visit"]
+].round({"spend": 2, "avg_visit": 2, "visits_per_month": 1, "avg_gap": 1})
+display_df.columns = [
+    "Filiale",
+    "Adresse",
+    "Einkäufe",
+    "Ausgaben gesamt (€)",
+    "Ø pro Einkauf (€)",
+    "Einkäufe pro Monat",
+    "Ø Tage zwischen Einkäufen",
+    "Letzter Einkauf",
+]
+st.dataframe(display_df, width='stretch', hide_index=True)
+
+st.markdown("---")
+
+# --- Monthly Spending per Store ---
+st.header("Monatliche Ausgaben pro Filiale")
+st.bar_chart(
+    store_monthly_frame(store_dimension, summary["store"].tolist(), start_date, end_date), height=350
+)
+
+st.markdown("---")
+
+# --- Visits of a Single Store ---
+st.header("Einkaufstage einer Filiale")
+store_key = st.selectbox(
+    "Filiale",
+    summary["store"].tolist(),
+    format_func=lambda key: store_dimension["stores"][key]["name"],
+)
+st.bar_chart(store_weekday_frame(store_dimension, store_key, start_date, end_date), height=300)
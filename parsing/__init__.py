@@ -1,11 +1,28 @@
 """Parsing module for receipt HTML processing."""
 
-from .receipt_parser import parse_receipt_html
-from .items_extractor import extract_receipt_items_from_html
-from .info_extractor import extract_basic_receipt_info_from_html
-
-__all__ = [
-    "parse_receipt_html",
-    "extract_receipt_items_from_html",
-    "extract_basic_receipt_info_from_html",
-]
+import importlib
+
+# Stored with every receipt; increase it whenever a parser change alters the
+# parsed data, so `get_data.py refresh` re-parses the stored receipts
+PARSER_VERSION = 1
+
+# Submodules are only imported on first attribute access (PEP 562) so that
+# e.g. `get_data.py --help` does not load requests, bs4 or browser_cookie3.
+_EXPORTS = {
+    "parse_receipt_html": ".receipt_parser",
+    "extract_receipt_items_from_html": ".items_extractor",
+    "extract_basic_receipt_info_from_html": ".info_extractor",
+    "recompute_savings": ".savings",
+    "compute_savings": ".savings",
+    "savings_arrays": ".savings",
+}
+
+__all__ = ["PARSER_VERSION", *_EXPORTS]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,11 @@
 """Main receipt HTML parser."""
 
 import re
+import time
 from typing import Dict, Any
 from bs4 import BeautifulSoup
 
+from metrics import METRICS
 from .info_extractor import extract_basic_receipt_info_from_html
 from .items_extractor import extract_receipt_items_from_html
 
@@ -24,15 +26,18 @@ def parse_receipt_html(
     Returns:
         dict: Parsed receipt data
     """
-    soup = BeautifulSoup(html_content, "html.parser")
+    with METRICS.timer("parse_soup_seconds", "BeautifulSoup HTML parsing per receipt"):
+        soup = BeautifulSoup(html_content, "html.parser")
 
     # Extract basic receipt info using the exact logic from the provided code snippet
-    receipt_data = extract_basic_receipt_info_from_html(
-        soup, receipt_id, receipt_date, store
-    )
+    with METRICS.timer("parse_info_seconds", "extract_basic_receipt_info_from_html per receipt"):
+        receipt_data = extract_basic_receipt_info_from_html(
+            soup, receipt_id, receipt_date, store
+        )
 
     # Extract items using the exact logic from the provided code snippet
-    receipt_data["items"] = extract_receipt_items_from_html(soup)
+    with METRICS.timer("parse_items_seconds", "extract_receipt_items_from_html per receipt"):
+        receipt_data["items"] = extract_receipt_items_from_html(soup)
 
     # Calculate total from items (this is the price without any savings)
     total_from_items = 0.0
@@ -84,6 +89,7 @@ def parse_receipt_html(
                 pass
 
         # Extract pfand savings from HTML
+        pfand_start = time.perf_counter()
         pfand_savings = 0.0
         try:
             purchase_list = soup.find("span", class_="purchase_list")
@@ -120,6 +126,10 @@ def parse_receipt_html(
         except:
             pass
 
+        METRICS.histogram(
+            "parse_pfand_seconds", "Pfand extraction per receipt"
+        ).observe(time.perf_counter() - pfand_start)
+
         if pfand_savings > 0:
             receipt_data["saved_pfand"] = f"{pfand_savings:.2f}".replace(".", ",")
             total_savings += pfand_savings
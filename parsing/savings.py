@@ -0,0 +1,147 @@
+"""Batch recomputation of the derived receipt totals in integer cents (NumPy)."""
+
+from typing import Dict, Any, List, NamedTuple
+
+import numpy as np
+
+
+class SavingsArrays(NamedTuple):
+    """Item and discount columns of a batch of receipts.
+
+    Items of all receipts are concatenated; `item_receipt` holds the index of
+    the receipt each item belongs to. The discount columns hold one value per
+    receipt.
+    """
+
+    item_receipt: np.ndarray  # int64
+    price_cents: np.ndarray  # int64, price per unit
+    quantity_milli: np.ndarray  # int64, quantity in thousandths (pieces or kg)
+    saved_cents: np.ndarray  # int64, Preisvorteil/Rabatt
+    lidlplus_cents: np.ndarray  # int64, Lidl Plus savings
+    sticker_cents: np.ndarray  # int64, sticker discounts (RABATT X%)
+    pfand_cents: np.ndarray  # int64, Pfand returns
+
+
+def _cents(value: Any) -> int:
+    if value is None or str(value).strip() == "":
+        return 0
+    try:
+        return int(round(float(str(value).replace(",", ".")) * 100))
+    except ValueError:
+        return 0
+
+
+def _milli(value: Any) -> int:
+    try:
+        return int(round(float(str(value).replace(",", ".")) * 1000))
+    except ValueError:
+        return 0
+
+
+def _format_cents(cents: int) -> str:
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100},{abs(cents) % 100:02d}"
+
+
+def savings_arrays(receipts: List[Dict[str, Any]]) -> SavingsArrays:
+    """
+    Collect the item prices, quantities and discounts of parsed receipts as arrays.
+
+    Items whose price or quantity cannot be read are left out, as in
+    parse_receipt_html.
+
+    Args:
+        receipts: Parsed receipts
+
+    Returns:
+        SavingsArrays: Columns for compute_savings
+    """
+    item_receipt: List[int] = []
+    price_cents: List[int] = []
+    quantity_milli: List[int] = []
+    for index, receipt in enumerate(receipts):
+        for item in receipt.get("items", []):
+            try:
+                price = float(item.get("price", "0").replace(",", "."))
+                quantity = float(item.get("quantity", "1").replace(",", "."))
+            except (ValueError, AttributeError):
+                continue
+            item_receipt.append(index)
+            price_cents.append(int(round(price * 100)))
+            quantity_milli.append(int(round(quantity * 1000)))
+
+    def column(field: str) -> np.ndarray:
+        return np.fromiter((_cents(r.get(field)) for r in receipts), np.int64, len(receipts))
+
+    return SavingsArrays(
+        item_receipt=np.array(item_receipt, dtype=np.int64),
+        price_cents=np.array(price_cents, dtype=np.int64),
+        quantity_milli=np.array(quantity_milli, dtype=np.int64),
+        saved_cents=column("saved_amount"),
+        lidlplus_cents=column("lidlplus_saved_amount"),
+        sticker_cents=column("sticker_discount_amount"),
+        pfand_cents=column("saved_pfand"),
+    )
+
+
+def compute_savings(arrays: SavingsArrays) -> Dict[str, np.ndarray]:
+    """
+    Compute the totals of all receipts of a batch at once.
+
+    Args:
+        arrays: Item and discount columns as returned by savings_arrays
+
+    Returns:
+        dict: Per-receipt int64 arrays 'total_no_saving' (sum of all items),
+              'savings' (all discounts and Pfand) and 'total' (amount paid)
+    """
+    receipt_count = len(arrays.saved_cents)
+    # Sum in thousandths of a cent and round once per receipt, like the
+    # float sum of the per-receipt parser; the float64 weights of bincount
+    # are exact for integers below 2**53
+    line_millicents = arrays.price_cents * arrays.quantity_milli
+    total_millicents = np.bincount(
+        arrays.item_receipt, weights=line_millicents, minlength=receipt_count
+    ).astype(np.int64)
+    total_no_saving = np.sign(total_millicents) * ((np.abs(total_millicents) + 500) // 1000)
+
+    savings = arrays.saved_cents + arrays.lidlplus_cents + arrays.sticker_cents + arrays.pfand_cents
+    return {
+        "total_no_saving": total_no_saving,
+        "savings": savings,
+        "total": total_no_saving - savings,
+    }
+
+
+def recompute_savings(receipts: List[Dict[str, Any]]) -> int:
+    """
+    Re-derive 'total_price_no_saving' and 'total_price' of many receipts in place.
+
+    Uses the already extracted items and discount fields instead of parsing
+    the receipt HTML again, e.g. after a change of the savings rules. As in
+    parse_receipt_html, receipts without a positive item total keep their
+    values and 'total_price' is only set if the amount paid is positive.
+
+    Args:
+        receipts: Parsed receipts (modified in place)
+
+    Returns:
+        int: Number of receipts whose totals changed
+    """
+    if not receipts:
+        return 0
+    totals = compute_savings(savings_arrays(receipts))
+
+    changed = 0
+    for receipt, total_no_saving, total in zip(
+        receipts, totals["total_no_saving"].tolist(), totals["total"].tolist()
+    ):
+        if total_no_saving <= 0:
+            continue
+        before = (receipt.get("total_price_no_saving"), receipt.get("total_price"))
+        receipt["total_price_no_saving"] = _format_cents(total_no_saving)
+        if total > 0:
+            receipt["total_price"] = _format_cents(total)
+        if (receipt.get("total_price_no_saving"), receipt.get("total_price")) != before:
+            changed += 1
+    return changed
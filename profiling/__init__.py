@@ -0,0 +1,11 @@
+"""Profiling module for opt-in performance diagnostics."""
+
+from .profiler import StackSampler, run_profiled
+from .parse_trace import ParseTracer, PARSE_TRACER
+
+__all__ = [
+    "StackSampler",
+    "run_profiled",
+    "ParseTracer",
+    "PARSE_TRACER",
+]
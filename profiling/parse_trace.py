@@ -0,0 +1,62 @@
+"""Track the receipts with the slowest parse times."""
+
+import heapq
+import json
+import threading
+from typing import Dict, Any, List
+
+
+class ParseTracer:
+    """Keep the N slowest parsed receipts (disabled until `enable` is called)."""
+
+    def __init__(self) -> None:
+        self.limit = 0
+        self._heap: List[tuple] = []  # min-heap of (seconds, receipt_id, details)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    def enable(self, limit: int) -> None:
+        """Start tracing the `limit` slowest receipts."""
+        with self._lock:
+            self.limit = limit
+            self._heap = []
+
+    def record(self, receipt_id: str, seconds: float, **details: Any) -> None:
+        """Record the parse time of a receipt (cheap no-op when disabled)."""
+        if not self.enabled:
+            return
+        entry = (seconds, receipt_id, details)
+        with self._lock:
+            if len(self._heap) < self.limit:
+                heapq.heappush(self._heap, entry)
+            elif seconds > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def slowest(self) -> List[Dict[str, Any]]:
+        """Return the traced receipts, slowest first."""
+        with self._lock:
+            entries = sorted(self._heap, key=lambda entry: entry[0], reverse=True)
+        return [
+            {"id": receipt_id, "parse_seconds": round(seconds, 6), **details}
+            for seconds, receipt_id, details in entries
+        ]
+
+    def report(self, file_path: str) -> None:
+        """Print the slowest receipts and write them as JSON."""
+        slowest = self.slowest()
+        print(f"\n=== LANGSAMSTE KASSENBONS ({len(slowest)}) ===")
+        for entry in slowest:
+            print(
+                f"{entry['parse_seconds'] * 1000:8.1f} ms  {entry['id']}"
+                f"  ({entry.get('html_bytes', 0)} Bytes HTML, {entry.get('items', 0)} Artikel)"
+            )
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(slowest, file, indent=2)
+        print(f"Parse-Trace gespeichert: {file_path}")
+
+
+# Process-wide tracer used by the API client
+PARSE_TRACER = ParseTracer()
@@ -0,0 +1,102 @@
+"""Opt-in cProfile and stack-sampling wrappers for workflow runs."""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Optional
+
+# Seconds between stack samples of the profiled thread
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+
+class StackSampler:
+    """Periodically sample one thread's stack and count collapsed stacks (flamegraph input)."""
+
+    def __init__(
+        self, thread_id: Optional[int] = None, interval: float = DEFAULT_SAMPLE_INTERVAL
+    ) -> None:
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write_collapsed(self, file_path: str) -> None:
+        """Write samples in collapsed-stack format (flamegraph.pl, speedscope, inferno)."""
+        with open(file_path, "w", encoding="utf-8") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+def run_profiled(
+    func: Callable[..., Any], output_prefix: str, *args: Any, **kwargs: Any
+) -> Any:
+    """
+    Run a function under cProfile and a stack sampler.
+
+    Writes `<output_prefix>.pstats` (open with `python -m pstats` or snakeviz) and
+    `<output_prefix>.collapsed` (collapsed stacks for flamegraph tools).
+
+    Args:
+        func: Function to profile (e.g. a workflow)
+        output_prefix: Path prefix for the output files
+
+    Returns:
+        The function's return value
+    """
+    profiler = cProfile.Profile()
+    sampler = StackSampler()
+
+    started = time.perf_counter()
+    sampler.start()
+    profiler.enable()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profiler.disable()
+        sampler.stop()
+        elapsed = time.perf_counter() - started
+
+        pstats_path = f"{output_prefix}.pstats"
+        collapsed_path = f"{output_prefix}.collapsed"
+        profiler.dump_stats(pstats_path)
+        sampler.write_collapsed(collapsed_path)
+
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(15)
+        print(f"\n=== PROFIL ({elapsed:.1f}s) ===")
+        print(summary.getvalue().strip())
+        print(f"Profil gespeichert: {pstats_path}")
+        print(f"Flamegraph-Stacks gespeichert: {collapsed_path}")
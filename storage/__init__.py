@@ -1,11 +1,50 @@
 """Storage module for receipt data persistence."""
 
-from .file_manager import load_existing_receipts, save_receipts_to_json
-from .receipt_repository import add_receipt_to_json, sort_receipts_by_date
-
-__all__ = [
-    "load_existing_receipts",
-    "save_receipts_to_json",
-    "add_receipt_to_json",
-    "sort_receipts_by_date",
-]
+import importlib
+
+# Submodules are only imported on first attribute access (PEP 562) so that
+# e.g. `from workflows import update_data` does not load numpy.
+_EXPORTS = {
+    "load_existing_receipts": ".file_manager",
+    "save_receipts_to_json": ".file_manager",
+    "receipts_mtime_ns": ".file_manager",
+    "add_receipt_to_json": ".receipt_repository",
+    "sort_receipts_by_date": ".receipt_repository",
+    "archive_closed_months": ".receipt_repository",
+    "replace_receipts": ".receipt_repository",
+    "load_aggregates": ".aggregates",
+    "query_range": ".aggregates",
+    "daily_totals": ".aggregates",
+    "date_bounds": ".aggregates",
+    "weekly_totals": ".spending_stats",
+    "spending_forecast": ".spending_stats",
+    "spending_anomalies": ".spending_stats",
+    "load_item_dimension": ".item_dimension",
+    "load_price_history": ".price_history",
+    "product_prices": ".price_history",
+    "load_line_store": ".line_store",
+    "product_totals": ".line_store",
+    "open_search_index": ".search_index",
+    "search_products": ".search_index",
+    "load_store_dimension": ".store_dimension",
+    "save_receipt_source": ".source_cache",
+    "load_receipt_source": ".source_cache",
+    "source_hash": ".source_cache",
+    "partition_paths": ".archive",
+    "load_archived_receipts": ".archive",
+    "with_archived": ".archive",
+    "iter_receipts": ".archive",
+    "export_receipts": ".export",
+    "merge_receipt_files": ".merge",
+    "ReceiptStore": ".receipt_store",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
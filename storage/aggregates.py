@@ -0,0 +1,273 @@
+"""Precomputed spending rollups maintained alongside the receipts file."""
+
+import json
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from .file_manager import load_existing_receipts, receipts_mtime_ns, sidecar_path, write_json_atomic
+from .archive import with_archived
+from .spending_stats import empty_spending_stats, update_spending_stats
+
+AGGREGATES_VERSION = 3
+
+# Monetary fields of a receipt that are rolled up (rollup key -> receipt field)
+AMOUNT_FIELDS = {
+    "total": "total_price",
+    "saved": "saved_amount",
+    "lidlplus": "lidlplus_saved_amount",
+    "sticker": "sticker_discount_amount",
+}
+
+
+def aggregates_path(receipts_file: Optional[str] = None) -> str:
+    """Get the rollup file path belonging to a receipts file."""
+    return sidecar_path("aggregates.json", receipts_file)
+
+
+def to_cents(value: Any) -> int:
+    """Convert a comma-decimal string or number to integer cents."""
+    if value is None or str(value).strip() == "":
+        return 0
+    try:
+        return int(round(float(str(value).replace(",", ".")) * 100))
+    except ValueError:
+        return 0
+
+
+def to_quantity(value: Any) -> float:
+    """Convert a comma-decimal quantity string to float (defaults to 1)."""
+    try:
+        return float(str(value if value is not None else 1).replace(",", "."))
+    except ValueError:
+        return 1.0
+
+
+def parse_purchase_date(date_str: Optional[str]) -> Optional[date]:
+    """Parse the 'YYYY.MM.DD' purchase date stored in receipts."""
+    if not date_str:
+        return None
+    try:
+        return datetime.strptime(date_str[:10], "%Y.%m.%d").date()
+    except ValueError:
+        return None
+
+
+def _empty_bucket() -> Dict[str, Any]:
+    # Item totals come from the line store (see line_store.product_totals)
+    bucket = {"receipts": 0, "stores": {}}
+    for key in AMOUNT_FIELDS:
+        bucket[key] = 0
+    return bucket
+
+
+def _apply(bucket: Dict[str, Any], receipt: Dict[str, Any], sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) a receipt's contribution to a bucket."""
+    bucket["receipts"] += sign
+    for key, field in AMOUNT_FIELDS.items():
+        bucket[key] += sign * to_cents(receipt.get(field))
+
+    store = receipt.get("store") or "Unknown"
+    store_totals = bucket["stores"].setdefault(store, [0, 0])
+    store_totals[0] += sign
+    store_totals[1] += sign * to_cents(receipt.get("total_price"))
+    if sign < 0 and store_totals[0] <= 0:
+        del bucket["stores"][store]
+
+
+def _merge(target: Dict[str, Any], bucket: Dict[str, Any]) -> None:
+    """Merge one rollup bucket into another."""
+    target["receipts"] += bucket["receipts"]
+    for key in AMOUNT_FIELDS:
+        target[key] += bucket[key]
+    for store, (visits, total) in bucket["stores"].items():
+        totals = target["stores"].setdefault(store, [0, 0])
+        totals[0] += visits
+        totals[1] += total
+
+
+def is_countable(receipt: Dict[str, Any]) -> bool:
+    """Only receipts with a valid date and at least one item are rolled up."""
+    items = receipt.get("items")
+    return (
+        isinstance(items, list)
+        and len(items) > 0
+        and parse_purchase_date(receipt.get("purchase_date")) is not None
+    )
+
+
+def apply_receipt(
+    aggregates: Dict[str, Any], receipt: Dict[str, Any], sign: int = 1
+) -> None:
+    """Incrementally add or remove a receipt from all rollups."""
+    if not is_countable(receipt):
+        aggregates["skipped"] += sign
+        return
+
+    day = parse_purchase_date(receipt["purchase_date"])
+    day_key = day.isoformat()
+    month_key = day_key[:7]
+
+    for rollup, key in (("daily", day_key), ("monthly", month_key)):
+        bucket = aggregates[rollup].setdefault(key, _empty_bucket())
+        _apply(bucket, receipt, sign)
+        if bucket["receipts"] <= 0:
+            del aggregates[rollup][key]
+    _apply(aggregates["overall"], receipt, sign)
+
+    store = receipt.get("store") or "Unknown"
+    update_spending_stats(aggregates, day, store, sign * to_cents(receipt.get("total_price")))
+
+
+def build_aggregates(receipts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build all rollups from scratch."""
+    aggregates = {
+        "version": AGGREGATES_VERSION,
+        "source_mtime_ns": None,
+        "skipped": 0,
+        "daily": {},
+        "monthly": {},
+        "overall": _empty_bucket(),
+        "weekly": {},  # week start -> total cents
+        "store_weekly": {},  # store -> week start -> total cents
+        "stats": empty_spending_stats(),
+    }
+    for receipt in receipts:
+        apply_receipt(aggregates, receipt)
+    return aggregates
+
+
+def save_aggregates(
+    aggregates: Dict[str, Any], receipts_file: Optional[str] = None
+) -> None:
+    """Persist rollups, stamped with the receipts file they describe."""
+    aggregates["source_mtime_ns"] = receipts_mtime_ns(receipts_file)
+    write_json_atomic(aggregates, aggregates_path(receipts_file), separators=(",", ":"))
+
+
+def _read_aggregates(receipts_file: Optional[str]) -> Optional[Dict[str, Any]]:
+    try:
+        with open(aggregates_path(receipts_file), "r", encoding="utf-8") as file:
+            aggregates = json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if aggregates.get("version") != AGGREGATES_VERSION:
+        return None
+    return aggregates
+
+
+def load_aggregates(receipts_file: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Load rollups for a receipts file, rebuilding them if missing or stale.
+
+    Only the writers (add_receipt_to_json, ReceiptStore, ...) persist them;
+    a reader (e.g. the dashboard) rebuilds stale rollups in memory, so it
+    never overwrites the file while an update is writing it.
+
+    Args:
+        receipts_file: Path to the receipts JSON file. If None, uses default from config.
+
+    Returns:
+        dict: Rollups, or None if the receipts file does not exist
+    """
+    source_mtime = receipts_mtime_ns(receipts_file)
+    if source_mtime is None:
+        return None
+
+    aggregates = _read_aggregates(receipts_file)
+    if aggregates is not None and aggregates.get("source_mtime_ns") == source_mtime:
+        return aggregates
+
+    # Derived files cover the receipts file and its archive partitions
+    _, receipts = load_existing_receipts(receipts_file)
+    return build_aggregates(with_archived(receipts, receipts_file))
+
+
+def update_aggregates(
+    receipts: List[Dict[str, Any]],
+    new_receipt: Dict[str, Any],
+    old_receipt: Optional[Dict[str, Any]] = None,
+    previous_mtime_ns: Optional[int] = None,
+    receipts_file: Optional[str] = None,
+) -> None:
+    """
+    Apply a single added/replaced receipt to the persisted rollups.
+
+    Must be called right after the receipts file was written. If the stored
+    rollups did not describe the file as it was before this write
+    (`previous_mtime_ns`), they are rebuilt from `receipts` instead.
+    """
+    aggregates = _read_aggregates(receipts_file)
+    if (
+        aggregates is None
+        or previous_mtime_ns is None
+        or aggregates.get("source_mtime_ns") != previous_mtime_ns
+    ):
+        aggregates = build_aggregates(with_archived(receipts, receipts_file))
+    else:
+        if old_receipt is not None:
+            apply_receipt(aggregates, old_receipt, sign=-1)
+        apply_receipt(aggregates, new_receipt)
+    save_aggregates(aggregates, receipts_file)
+
+
+def restamp_aggregates(
+    previous_mtime_ns: Optional[int], receipts_file: Optional[str] = None
+) -> None:
+    """Mark rollups as current after a content-preserving rewrite (e.g. sorting)."""
+    aggregates = _read_aggregates(receipts_file)
+    if aggregates is not None and aggregates.get("source_mtime_ns") == previous_mtime_ns:
+        save_aggregates(aggregates, receipts_file)
+
+
+def _month_end(month_start: date) -> date:
+    next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+def _iter_range_buckets(
+    aggregates: Dict[str, Any], start: date, end: date
+) -> Iterator[Dict[str, Any]]:
+    """Yield the minimal set of buckets covering [start, end] (inclusive)."""
+    month_start = start.replace(day=1)
+    while month_start <= end:
+        month_end = _month_end(month_start)
+        if start <= month_start and month_end <= end:
+            bucket = aggregates["monthly"].get(month_start.isoformat()[:7])
+            if bucket:
+                yield bucket
+        else:
+            day = max(start, month_start)
+            while day <= min(end, month_end):
+                bucket = aggregates["daily"].get(day.isoformat())
+                if bucket:
+                    yield bucket
+                day += timedelta(days=1)
+        month_start = month_end + timedelta(days=1)
+
+
+def query_range(aggregates: Dict[str, Any], start: date, end: date) -> Dict[str, Any]:
+    """Combine rollups into a single bucket for an inclusive date range."""
+    result = _empty_bucket()
+    for bucket in _iter_range_buckets(aggregates, start, end):
+        _merge(result, bucket)
+    return result
+
+
+def daily_totals(
+    aggregates: Dict[str, Any], start: date, end: date
+) -> List[Tuple[date, int]]:
+    """Return (day, total cents) pairs for all days with receipts in range."""
+    start_key, end_key = start.isoformat(), end.isoformat()
+    return [
+        (date.fromisoformat(day), bucket["total"])
+        for day, bucket in sorted(aggregates["daily"].items())
+        if start_key <= day <= end_key
+    ]
+
+
+def date_bounds(aggregates: Dict[str, Any]) -> Optional[Tuple[date, date]]:
+    """Return the first and last purchase day covered by the rollups."""
+    if not aggregates["daily"]:
+        return None
+    days = sorted(aggregates["daily"])
+    return date.fromisoformat(days[0]), date.fromisoformat(days[-1])
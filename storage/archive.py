@@ -0,0 +1,237 @@
+"""Monthly, gzip-compressed archive partitions for receipts of closed months."""
+
+import os
+import gzip
+import json
+from datetime import date
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+from .file_manager import sidecar_path, iter_json_array, write_json_atomic
+
+ARCHIVE_VERSION = 1
+
+
+def archive_dir(receipts_file: Optional[str] = None) -> str:
+    """Get the archive directory stored next to the receipts file."""
+    return sidecar_path("archive", receipts_file)
+
+
+def _manifest_path(receipts_file: Optional[str]) -> str:
+    return os.path.join(archive_dir(receipts_file), "manifest.json")
+
+
+def partition_key(receipt: Dict[str, Any]) -> Optional[str]:
+    """Get the partition ('YYYY-MM') of a receipt, None if it has no valid date."""
+    date_str = receipt.get("purchase_date") or ""
+    parts = date_str.split(".")
+    if len(parts) != 3 or not (parts[0].isdigit() and parts[1].isdigit()):
+        return None
+    return f"{parts[0]}-{parts[1]}"
+
+
+def _month_key(day: date) -> str:
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+def load_manifest(receipts_file: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load the archive manifest (empty if there is no archive).
+
+    The manifest lists every partition with its file, receipt count, first and
+    last purchase date and receipt IDs, so that duplicate checks and range
+    queries don't need to open any partition.
+    """
+    try:
+        with open(_manifest_path(receipts_file), "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        if manifest.get("version") == ARCHIVE_VERSION:
+            return manifest
+    except (OSError, json.JSONDecodeError):
+        pass
+    return {"version": ARCHIVE_VERSION, "partitions": {}}
+
+
+def save_manifest(manifest: Dict[str, Any], receipts_file: Optional[str] = None) -> None:
+    """Write the archive manifest atomically."""
+    write_json_atomic(manifest, _manifest_path(receipts_file))
+
+
+def archived_ids(receipts_file: Optional[str] = None) -> set[str]:
+    """Get the IDs of all archived receipts (from the manifest only)."""
+    ids = set()
+    for partition in load_manifest(receipts_file)["partitions"].values():
+        ids.update(partition["ids"])
+    return ids
+
+
+def read_partition(month: str, receipts_file: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Read the receipts of one archive partition (empty if it doesn't exist)."""
+    path = os.path.join(archive_dir(receipts_file), f"{month}.json.gz")
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return []
+
+
+def write_partition(
+    month: str, receipts: List[Dict[str, Any]], receipts_file: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Write a compressed partition atomically.
+
+    Returns:
+        dict: Manifest entry of the partition
+    """
+    directory = archive_dir(receipts_file)
+    os.makedirs(directory, exist_ok=True)
+    file_name = f"{month}.json.gz"
+    temp_path = os.path.join(directory, f"{file_name}.tmp")
+    with gzip.open(temp_path, "wt", encoding="utf-8") as file:
+        json.dump(receipts, file, ensure_ascii=False)
+    os.replace(temp_path, os.path.join(directory, file_name))
+
+    dates = sorted(receipt["purchase_date"] for receipt in receipts)
+    return {
+        "file": file_name,
+        "count": len(receipts),
+        "first": dates[0],
+        "last": dates[-1],
+        "ids": [receipt.get("id") or receipt.get("url", "") for receipt in receipts],
+    }
+
+
+def overlapping_partitions(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    receipts_file: Optional[str] = None,
+) -> List[str]:
+    """Get the archived months overlapping a date range (newest first)."""
+    months = load_manifest(receipts_file)["partitions"]
+    first = _month_key(start) if start else None
+    last = _month_key(end) if end else None
+    return sorted(
+        (
+            month
+            for month in months
+            if (first is None or month >= first) and (last is None or month <= last)
+        ),
+        reverse=True,
+    )
+
+
+def partition_paths(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    receipts_file: Optional[str] = None,
+) -> List[str]:
+    """
+    Get the files holding the receipts of a date range.
+
+    Returns:
+        list: The receipts file (if it exists) plus all overlapping archive partitions
+    """
+    from config import LidlConfig
+
+    receipts_file = receipts_file or LidlConfig.RECEIPTS_JSON_FILE
+    paths = [receipts_file] if os.path.exists(receipts_file) else []
+    directory = archive_dir(receipts_file)
+    paths.extend(
+        os.path.join(directory, f"{month}.json.gz")
+        for month in overlapping_partitions(start, end, receipts_file)
+    )
+    return paths
+
+
+def load_archived_receipts(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    receipts_file: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Load the archived receipts of all partitions overlapping a date range."""
+    receipts = []
+    for month in overlapping_partitions(start, end, receipts_file):
+        receipts.extend(read_partition(month, receipts_file))
+    return receipts
+
+
+def with_archived(
+    receipts: Iterable[Dict[str, Any]], receipts_file: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Combine the receipts of the receipts file with all archived receipts.
+
+    A receipt present in both (e.g. re-fetched after archiving) is taken from
+    the receipts file.
+    """
+    combined = list(receipts)
+    current_ids = {receipt.get("id") or receipt.get("url", "") for receipt in combined}
+    combined.extend(
+        receipt
+        for receipt in load_archived_receipts(receipts_file=receipts_file)
+        if (receipt.get("id") or receipt.get("url", "")) not in current_ids
+    )
+    return combined
+
+
+def find_archived_receipt(
+    receipt_id: str, receipts_file: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Look up an archived receipt, opening only the partition that contains it."""
+    for month, partition in load_manifest(receipts_file)["partitions"].items():
+        if receipt_id in partition["ids"]:
+            for receipt in read_partition(month, receipts_file):
+                if (receipt.get("id") or receipt.get("url", "")) == receipt_id:
+                    return receipt
+    return None
+
+
+def _in_range(receipt: Dict[str, Any], start: Optional[date], end: Optional[date]) -> bool:
+    if start is None and end is None:
+        return True
+    # Purchase dates are stored as 'YYYY.MM.DD', so they compare as text
+    day = (receipt.get("purchase_date") or "")[:10]
+    if start is not None and day < start.strftime("%Y.%m.%d"):
+        return False
+    return end is None or day <= end.strftime("%Y.%m.%d")
+
+
+def iter_receipts(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    receipts_file: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the receipts of a date range from the receipts file and the archive.
+
+    Receipts are decoded one at a time and only the partitions overlapping
+    the range are opened, so memory use does not grow with the history.
+    Receipts without a valid date are only included without a date filter.
+
+    Args:
+        start: First day of the range (inclusive, None for no limit)
+        end: Last day of the range (inclusive, None for no limit)
+        receipts_file: Path to the receipts JSON file. If None, uses default from config.
+    """
+    from config import LidlConfig
+
+    receipts_file = receipts_file or LidlConfig.RECEIPTS_JSON_FILE
+
+    # A receipt in both places (re-fetched after archiving) is taken from the receipts file
+    current_ids = set()
+    if os.path.exists(receipts_file):
+        with open(receipts_file, "r", encoding="utf-8") as file:
+            for receipt in iter_json_array(file):
+                current_ids.add(receipt.get("id") or receipt.get("url", ""))
+                if _in_range(receipt, start, end):
+                    yield receipt
+
+    directory = archive_dir(receipts_file)
+    for month in overlapping_partitions(start, end, receipts_file):
+        path = os.path.join(directory, f"{month}.json.gz")
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for receipt in iter_json_array(file):
+                if (receipt.get("id") or receipt.get("url", "")) not in current_ids and _in_range(
+                    receipt, start, end
+                ):
+                    yield receipt
@@ -0,0 +1,146 @@
+"""Streaming export of receipts and line items to flat CSV (or Excel) files."""
+
+import csv
+import os
+from datetime import date
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from .aggregates import to_cents, to_quantity
+from .archive import iter_receipts
+
+# Receipt fields exported to receipts.csv (besides id, date and item count)
+RECEIPT_AMOUNT_FIELDS = [
+    "total_price",
+    "total_price_no_saving",
+    "saved_amount",
+    "lidlplus_saved_amount",
+    "sticker_discount_amount",
+    "saved_pfand",
+]
+
+RECEIPT_HEADER = ["id", "purchase_date", "store", *RECEIPT_AMOUNT_FIELDS, "items"]
+ITEM_HEADER = [
+    "receipt_id",
+    "purchase_date",
+    "store",
+    "art_id",
+    "name",
+    "quantity",
+    "unit",
+    "price",
+    "line_total",
+]
+
+
+def _euros(value: Any, numeric: bool) -> Any:
+    """An amount as number (Excel) or as comma-decimal text like in the receipts file."""
+    if value is None or str(value).strip() == "":
+        return None if numeric else ""
+    cents = to_cents(value)
+    if numeric:
+        return cents / 100
+    return f"{cents / 100:.2f}".replace(".", ",")
+
+
+def _receipt_row(receipt: Dict[str, Any], numeric: bool) -> List[Any]:
+    return [
+        receipt.get("id") or receipt.get("url", ""),
+        (receipt.get("purchase_date") or "").replace(".", "-"),
+        receipt.get("store", ""),
+        *(_euros(receipt.get(field), numeric) for field in RECEIPT_AMOUNT_FIELDS),
+        len(receipt.get("items", [])),
+    ]
+
+
+def _item_rows(receipt: Dict[str, Any], numeric: bool) -> Iterator[List[Any]]:
+    receipt_id = receipt.get("id") or receipt.get("url", "")
+    purchase_date = (receipt.get("purchase_date") or "").replace(".", "-")
+    for item in receipt.get("items", []):
+        quantity = to_quantity(item.get("quantity"))
+        line_total = round(to_cents(item.get("price")) * quantity) / 100
+        yield [
+            receipt_id,
+            purchase_date,
+            receipt.get("store", ""),
+            item.get("art_id", ""),
+            item.get("name", ""),
+            quantity if numeric else str(item.get("quantity", "")),
+            item.get("unit", "stk"),
+            _euros(item.get("price"), numeric),
+            line_total if numeric else f"{line_total:.2f}".replace(".", ","),
+        ]
+
+
+def export_receipts(
+    output_dir: str = ".",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    receipts_file: Optional[str] = None,
+    xlsx: bool = False,
+    delimiter: str = ";",
+) -> Tuple[int, int]:
+    """
+    Write receipts.csv and items.csv (and optionally receipts.xlsx) for a date range.
+
+    Receipts are streamed from the receipts file and the overlapping archive
+    partitions and written row by row, so memory use stays bounded. Amounts
+    keep the comma-decimal format of the receipts file in the CSV files (the
+    default ';' delimiter opens directly in a German Excel); the Excel file
+    holds real numbers.
+
+    Args:
+        output_dir: Directory for the exported files (created if missing)
+        start: First day of the range (inclusive, None for no limit)
+        end: Last day of the range (inclusive, None for no limit)
+        receipts_file: Path to the receipts JSON file. If None, uses default from config.
+        xlsx: Also write receipts.xlsx with the sheets 'Kassenbons' and 'Artikel'
+        delimiter: CSV field delimiter
+
+    Returns:
+        tuple: (number of exported receipts, number of exported line items)
+
+    Raises:
+        ImportError: If xlsx is requested but openpyxl is not installed
+    """
+    workbook = None
+    if xlsx:
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ImportError(
+                "openpyxl ist nicht installiert. Installiere es mit 'pip install openpyxl'."
+            ) from None
+        # Write-only workbooks stream rows to temporary files
+        workbook = Workbook(write_only=True)
+        receipt_sheet = workbook.create_sheet("Kassenbons")
+        item_sheet = workbook.create_sheet("Artikel")
+        receipt_sheet.append(RECEIPT_HEADER)
+        item_sheet.append(ITEM_HEADER)
+
+    os.makedirs(output_dir, exist_ok=True)
+    receipt_count = item_count = 0
+    with open(
+        os.path.join(output_dir, "receipts.csv"), "w", encoding="utf-8-sig", newline=""
+    ) as receipts_csv, open(
+        os.path.join(output_dir, "items.csv"), "w", encoding="utf-8-sig", newline=""
+    ) as items_csv:
+        receipt_writer = csv.writer(receipts_csv, delimiter=delimiter)
+        item_writer = csv.writer(items_csv, delimiter=delimiter)
+        receipt_writer.writerow(RECEIPT_HEADER)
+        item_writer.writerow(ITEM_HEADER)
+
+        for receipt in iter_receipts(start, end, receipts_file):
+            receipt_writer.writerow(_receipt_row(receipt, numeric=False))
+            item_writer.writerows(_item_rows(receipt, numeric=False))
+            receipt_count += 1
+            item_count += len(receipt.get("items", []))
+
+            if workbook is not None:
+                receipt_sheet.append(_receipt_row(receipt, numeric=True))
+                for row in _item_rows(receipt, numeric=True):
+                    item_sheet.append(row)
+
+    if workbook is not None:
+        workbook.save(os.path.join(output_dir, "receipts.xlsx"))
+
+    return receipt_count, item_count
@@ -2,18 +2,37 @@
 
 import os
 import json
-from typing import Dict, List, Any
+from typing import IO, Dict, Iterator, List, Any, Optional
 
 
-def load_existing_receipts() -> tuple[set[str], list[Dict[str, Any]]]:
-    """Load existing receipts from JSON file."""
+def load_existing_receipts(
+    file_path: Optional[str] = None, strict: bool = False
+) -> tuple[set[str], list[Dict[str, Any]]]:
+    """
+    Load existing receipts from JSON file.
+
+    The returned IDs also include receipts moved to the archive partitions,
+    so they can be used to skip receipts that are already stored.
+
+    Args:
+        file_path: Path to the receipts file. If None, uses default from config.
+        strict: Raise on an unreadable receipts file instead of treating it as
+                empty. Writers set it, so they never overwrite the receipts.
+
+    Raises:
+        ValueError: If `strict` is set and the receipts file is corrupt
+    """
     from config import LidlConfig
-    
-    if not os.path.exists(LidlConfig.RECEIPTS_JSON_FILE):
-        return set(), []
+    from .archive import archived_ids
+
+    if file_path is None:
+        file_path = LidlConfig.RECEIPTS_JSON_FILE
+
+    if not os.path.exists(file_path):
+        return archived_ids(file_path), []
 
     try:
-        with open(LidlConfig.RECEIPTS_JSON_FILE, "r", encoding="utf-8") as file:
+        with open(file_path, "r", encoding="utf-8") as file:
             receipts = json.load(file)
         # Handle both old format (with 'url') and new format (with 'id')
         existing_ids = set()
@@ -23,15 +42,117 @@ def load_existing_receipts() -> tuple[set[str], list[Dict[str, Any]]]:
             elif "url" in receipt:
                 # For backward compatibility with old format
                 existing_ids.add(receipt["url"])
-        return existing_ids, receipts
+        return existing_ids | archived_ids(file_path), receipts
     except (json.JSONDecodeError, KeyError) as e:
+        if strict:
+            raise ValueError(f"Receipts file '{file_path}' is corrupt: {e}") from e
         print(f"Warning: Error loading existing receipts: {e}")
-        return set(), []
+        return archived_ids(file_path), []
+
+
+def write_json_atomic(data: Any, path: str, **dump_kwargs: Any) -> None:
+    """
+    Write JSON to a temporary file and move it into place.
+
+    Readers (e.g. the dashboard polling during an update) and crashes never
+    see a partially written file.
+    """
+    temp_path = f"{path}.tmp"
+    # One json.dumps call is much faster than json.dump writing token by token
+    text = json.dumps(data, ensure_ascii=False, **dump_kwargs)
+    with open(temp_path, "w", encoding="utf-8") as file:
+        file.write(text)
+    os.replace(temp_path, path)
 
 
-def save_receipts_to_json(receipts: List[Dict[str, Any]]) -> None:
+def save_receipts_to_json(
+    receipts: List[Dict[str, Any]], file_path: Optional[str] = None
+) -> None:
     """Save all receipts to JSON file."""
     from config import LidlConfig
-    
-    with open(LidlConfig.RECEIPTS_JSON_FILE, "w", encoding="utf-8") as file:
-        json.dump(receipts, file, ensure_ascii=False, indent=2)
+
+    if file_path is None:
+        file_path = LidlConfig.RECEIPTS_JSON_FILE
+
+    write_json_atomic(receipts, file_path, indent=2)
+
+
+def sidecar_path(suffix: str, file_path: Optional[str] = None) -> str:
+    """Get the path of a derived file stored next to the receipts file."""
+    from config import LidlConfig
+
+    if file_path is None:
+        file_path = LidlConfig.RECEIPTS_JSON_FILE
+
+    return f"{os.path.splitext(file_path)[0]}_{suffix}"
+
+
+def receipts_mtime_ns(file_path: Optional[str] = None) -> Optional[int]:
+    """Get the modification stamp of the receipts file (None if missing)."""
+    from config import LidlConfig
+
+    if file_path is None:
+        file_path = LidlConfig.RECEIPTS_JSON_FILE
+
+    try:
+        return os.stat(file_path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def iter_json_array(file: IO[str], chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yield the elements of a JSON array one at a time.
+
+    Only the current element and one chunk of text are held in memory, so
+    even very large receipt files can be streamed.
+
+    Args:
+        file: Text file positioned at the start of a JSON array
+        chunk_size: Number of characters read at a time
+
+    Raises:
+        json.JSONDecodeError: If the file is not a JSON array
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    eof = False
+
+    while True:
+        # Skip whitespace, the opening bracket and separators
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            buffer, position = file.read(chunk_size), 0
+            eof = not buffer
+        if position >= len(buffer):
+            raise json.JSONDecodeError("Unexpected end of JSON array", buffer, position)
+
+        if not started:
+            if buffer[position] != "[":
+                raise json.JSONDecodeError("Expected a JSON array", buffer, position)
+            started = True
+            position += 1
+            continue
+        if buffer[position] == "]":
+            return
+
+        # Decode the next element, reading more text while it is incomplete
+        # (a number at the end of the buffer may continue in the next chunk)
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+                if eof or buffer[end:].strip("0123456789+-.eE"):
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+        yield element
+        position = end
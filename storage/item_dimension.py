@@ -0,0 +1,265 @@
+"""Item dimension with integer product keys and columnar line items."""
+
+import re
+import json
+from typing import Dict, Any, List, Optional
+
+from .file_manager import load_existing_receipts, receipts_mtime_ns, sidecar_path, write_json_atomic
+from .archive import with_archived
+from .aggregates import is_countable, parse_purchase_date, to_cents, to_quantity
+
+ITEM_DIMENSION_VERSION = 3
+
+# Line item columns: receipt key, product key, quantity, line value and unit price in cents
+LINE_COLUMNS = ("receipt", "product", "quantity", "cents", "unit_cents")
+
+
+def item_dimension_path(receipts_file: Optional[str] = None) -> str:
+    """Get the item dimension file path belonging to a receipts file."""
+    return sidecar_path("items.json", receipts_file)
+
+
+def normalize_description(description: str) -> str:
+    """Normalize an article description for product matching."""
+    return re.sub(r"\s+", " ", description or "").strip().casefold()
+
+
+def _product_lookup_key(art_id: Optional[str], normalized: str) -> str:
+    """Lookup key of a product; without article number the name alone identifies it."""
+    return f"{art_id or ''}|{normalized}"
+
+
+def _empty_dimension() -> Dict[str, Any]:
+    return {
+        "version": ITEM_DIMENSION_VERSION,
+        "source_mtime_ns": None,
+        "receipts": [],  # receipt key -> receipt id
+        "receipt_days": [],  # receipt key -> purchase date as proleptic ordinal
+        "products": [],  # product key -> product attributes
+        "lines": {column: [] for column in LINE_COLUMNS},
+    }
+
+
+def _product_key(
+    dimension: Dict[str, Any], index: Dict[str, int], item: Dict[str, Any]
+) -> int:
+    """Get the key of an item's product, registering new products."""
+    normalized = normalize_description(item.get("name", ""))
+    art_id = item.get("art_id")
+    name_key = _product_lookup_key(None, normalized)
+    if not art_id:
+        # Receipts stored before article numbers were parsed
+        key = index.get(name_key)
+    else:
+        key = index.get(_product_lookup_key(art_id, normalized))
+        if key is None:
+            # A product known only by its name so far gets the article number
+            key = index.get(name_key)
+            if key is not None and dimension["products"][key]["art_id"]:
+                key = None
+            if key is not None:
+                dimension["products"][key]["art_id"] = art_id
+                index[_product_lookup_key(art_id, normalized)] = key
+    if key is None:
+        key = len(dimension["products"])
+        dimension["products"].append(
+            {
+                "art_id": art_id,
+                "name": item.get("name", ""),
+                "normalized": normalized,
+                "unit": item.get("unit", "stk"),
+                "is_deposit": "pfand" in normalized,
+            }
+        )
+        if art_id:
+            index[_product_lookup_key(art_id, normalized)] = key
+        index.setdefault(name_key, key)
+    return key
+
+
+def _product_index(dimension: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Index products by article number and name, and by name alone.
+
+    The name alone resolves items without article number; it points to the
+    first product with an article number of that name, if there is one.
+    """
+    index: Dict[str, int] = {}
+    for key, product in enumerate(dimension["products"]):
+        name_key = _product_lookup_key(None, product["normalized"])
+        if product["art_id"]:
+            index[_product_lookup_key(product["art_id"], product["normalized"])] = key
+            if not dimension["products"][index.get(name_key, key)]["art_id"]:
+                index[name_key] = key
+        index.setdefault(name_key, key)
+    return index
+
+
+def _remove_lines(dimension: Dict[str, Any], receipt_key: int) -> None:
+    lines = dimension["lines"]
+    keep = [i for i, key in enumerate(lines["receipt"]) if key != receipt_key]
+    if len(keep) != len(lines["receipt"]):
+        for column in LINE_COLUMNS:
+            values = lines[column]
+            lines[column] = [values[i] for i in keep]
+
+
+def add_receipt_lines(
+    dimension: Dict[str, Any],
+    receipt: Dict[str, Any],
+    receipt_index: Optional[Dict[str, int]] = None,
+    product_index: Optional[Dict[str, int]] = None,
+) -> None:
+    """Register a receipt and its line items (replacing lines of a known receipt)."""
+    if receipt_index is None:
+        receipt_index = {rid: key for key, rid in enumerate(dimension["receipts"])}
+    if product_index is None:
+        product_index = _product_index(dimension)
+
+    receipt_id = receipt.get("id") or receipt.get("url", "")
+    if not is_countable(receipt):
+        if receipt_id in receipt_index:
+            _remove_lines(dimension, receipt_index[receipt_id])
+        return
+
+    day = parse_purchase_date(receipt["purchase_date"]).toordinal()
+    receipt_key = receipt_index.get(receipt_id)
+    if receipt_key is None:
+        receipt_key = len(dimension["receipts"])
+        dimension["receipts"].append(receipt_id)
+        dimension["receipt_days"].append(day)
+        receipt_index[receipt_id] = receipt_key
+    else:
+        dimension["receipt_days"][receipt_key] = day
+        _remove_lines(dimension, receipt_key)
+
+    lines = dimension["lines"]
+    for item in receipt["items"]:
+        if not item.get("name"):
+            continue
+        quantity = to_quantity(item.get("quantity"))
+        unit_cents = to_cents(item.get("price"))
+        lines["receipt"].append(receipt_key)
+        lines["product"].append(_product_key(dimension, product_index, item))
+        lines["quantity"].append(quantity)
+        lines["cents"].append(int(round(unit_cents * quantity)))
+        lines["unit_cents"].append(unit_cents)
+
+
+def build_item_dimension(
+    receipts: List[Dict[str, Any]],
+    previous: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Build the item dimension and line items from scratch.
+
+    Products of a `previous` dimension are kept so product keys stay stable
+    across rebuilds.
+    """
+    dimension = _empty_dimension()
+    if previous is not None:
+        dimension["products"] = previous["products"]
+    receipt_index: Dict[str, int] = {}
+    product_index = _product_index(dimension)
+    for receipt in receipts:
+        add_receipt_lines(dimension, receipt, receipt_index, product_index)
+    return dimension
+
+
+def save_item_dimension(
+    dimension: Dict[str, Any], receipts_file: Optional[str] = None
+) -> None:
+    """Persist the item dimension, stamped with the receipts file it describes."""
+    dimension["source_mtime_ns"] = receipts_mtime_ns(receipts_file)
+    write_json_atomic(dimension, item_dimension_path(receipts_file), separators=(",", ":"))
+
+
+def _read_item_dimension(
+    receipts_file: Optional[str], any_version: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    Read the persisted item dimension.
+
+    With `any_version`, a dimension of an older version is returned as well;
+    it is only good as `previous` of a rebuild, which carries its products
+    over so product keys in the price history, line store and search index
+    stay valid across a version change.
+    """
+    try:
+        with open(item_dimension_path(receipts_file), "r", encoding="utf-8") as file:
+            dimension = json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if dimension.get("version") != ITEM_DIMENSION_VERSION and not any_version:
+        return None
+    return dimension
+
+
+def _is_current(dimension: Optional[Dict[str, Any]], source_mtime_ns: Optional[int]) -> bool:
+    return (
+        dimension is not None
+        and source_mtime_ns is not None
+        and dimension.get("version") == ITEM_DIMENSION_VERSION
+        and dimension.get("source_mtime_ns") == source_mtime_ns
+    )
+
+
+def load_item_dimension(
+    receipts_file: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Load the item dimension for a receipts file, rebuilding it if missing or stale.
+
+    Like the rollups (see load_aggregates), a stale dimension is only rebuilt
+    in memory; persisting it is left to the writers.
+
+    Args:
+        receipts_file: Path to the receipts JSON file. If None, uses default from config.
+
+    Returns:
+        dict: Item dimension, or None if the receipts file does not exist
+    """
+    source_mtime = receipts_mtime_ns(receipts_file)
+    if source_mtime is None:
+        return None
+
+    dimension = _read_item_dimension(receipts_file, any_version=True)
+    if _is_current(dimension, source_mtime):
+        return dimension
+
+    # Derived files cover the receipts file and its archive partitions
+    _, receipts = load_existing_receipts(receipts_file)
+    return build_item_dimension(with_archived(receipts, receipts_file), dimension)
+
+
+def update_item_dimension(
+    receipts: List[Dict[str, Any]],
+    new_receipt: Dict[str, Any],
+    previous_mtime_ns: Optional[int] = None,
+    receipts_file: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Apply a single added/replaced receipt to the persisted item dimension.
+
+    Must be called right after the receipts file was written; falls back to a
+    rebuild from `receipts` if the stored dimension was already out of sync.
+
+    Returns:
+        dict: The updated item dimension
+    """
+    dimension = _read_item_dimension(receipts_file, any_version=True)
+    if not _is_current(dimension, previous_mtime_ns):
+        dimension = build_item_dimension(with_archived(receipts, receipts_file), dimension)
+    else:
+        add_receipt_lines(dimension, new_receipt)
+    save_item_dimension(dimension, receipts_file)
+    return dimension
+
+
+def restamp_item_dimension(
+    previous_mtime_ns: Optional[int], receipts_file: Optional[str] = None
+) -> None:
+    """Mark the item dimension as current after a content-preserving rewrite."""
+    dimension = _read_item_dimension(receipts_file)
+    if dimension is not None and dimension.get("source_mtime_ns") == previous_mtime_ns:
+        save_item_dimension(dimension, receipts_file)
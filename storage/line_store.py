@@ -0,0 +1,235 @@
+"""Fixed-width binary file of all line items, opened with np.memmap."""
+
+import os
+from itertools import takewhile
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from .file_manager import receipts_mtime_ns, sidecar_path
+from .item_dimension import ITEM_DIMENSION_VERSION, load_item_dimension
+
+LINE_STORE_VERSION = 1
+
+LINE_STORE_MAGIC = b"LIDLLINE"
+
+# File header followed by one record per line item
+HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<i8"),
+        ("dimension_version", "<i8"),
+        ("source_mtime_ns", "<i8"),
+    ]
+)
+
+# Line item record: receipt and product key of the item dimension, purchase
+# day (proleptic ordinal), quantity in thousandths, unit price and line value
+# in cents and the flags below
+LINE_DTYPE = np.dtype(
+    [
+        ("receipt", "<i4"),
+        ("product", "<i4"),
+        ("day", "<i4"),
+        ("quantity_milli", "<i4"),
+        ("unit_cents", "<i4"),
+        ("cents", "<i4"),
+        ("flags", "u1"),
+    ]
+)
+
+FLAG_WEIGHED = 1  # quantity in kg
+FLAG_DEPOSIT = 2  # Pfand item
+
+
+def line_store_path(receipts_file: Optional[str] = None) -> str:
+    """Get the line item file path belonging to a receipts file."""
+    return sidecar_path("lines.bin", receipts_file)
+
+
+def _records(dimension: Dict[str, Any], first_line: int = 0) -> np.ndarray:
+    """Line item records of the item dimension from line `first_line` on."""
+    lines = dimension["lines"]
+    receipt = np.asarray(lines["receipt"][first_line:], dtype=np.int32)
+    product = np.asarray(lines["product"][first_line:], dtype=np.int32)
+
+    products = dimension["products"]
+    product_flags = np.fromiter(
+        (
+            (FLAG_WEIGHED if product["unit"] == "kg" else 0)
+            | (FLAG_DEPOSIT if product["is_deposit"] else 0)
+            for product in products
+        ),
+        dtype=np.uint8,
+        count=len(products),
+    )
+
+    records = np.empty(len(receipt), dtype=LINE_DTYPE)
+    records["receipt"] = receipt
+    records["product"] = product
+    records["day"] = np.asarray(dimension["receipt_days"], dtype=np.int32)[receipt]
+    records["quantity_milli"] = np.rint(
+        np.asarray(lines["quantity"][first_line:], dtype=np.float64) * 1000
+    )
+    records["unit_cents"] = np.asarray(lines["unit_cents"][first_line:], dtype=np.int32)
+    records["cents"] = np.asarray(lines["cents"][first_line:], dtype=np.int32)
+    records["flags"] = product_flags[product]
+    return records
+
+
+def build_line_store(dimension: Dict[str, Any]) -> np.ndarray:
+    """Build the records of all line items of the item dimension."""
+    return _records(dimension)
+
+
+def _header(receipts_file: Optional[str]) -> np.ndarray:
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = LINE_STORE_MAGIC
+    header["version"] = LINE_STORE_VERSION
+    header["dimension_version"] = ITEM_DIMENSION_VERSION
+    header["source_mtime_ns"] = receipts_mtime_ns(receipts_file) or -1
+    return header
+
+
+def save_line_store(records: np.ndarray, receipts_file: Optional[str] = None) -> None:
+    """Write all line items, stamped with the receipts file they describe."""
+    path = line_store_path(receipts_file)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(_header(receipts_file).tobytes())
+        file.write(np.ascontiguousarray(records, dtype=LINE_DTYPE).tobytes())
+    os.replace(temp_path, path)
+
+
+def _read_header(receipts_file: Optional[str]) -> Tuple[Optional[int], int]:
+    """Get the stamp and record count of a current line item file (None if unusable)."""
+    path = line_store_path(receipts_file)
+    try:
+        size = os.path.getsize(path)
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    except (OSError, ValueError):
+        return None, 0
+    if (
+        len(header) != 1
+        or header["magic"][0] != LINE_STORE_MAGIC
+        or int(header["version"][0]) != LINE_STORE_VERSION
+        # Product keys are only stable within one item dimension version
+        or int(header["dimension_version"][0]) != ITEM_DIMENSION_VERSION
+        or (size - HEADER_DTYPE.itemsize) % LINE_DTYPE.itemsize
+    ):
+        return None, 0
+    return int(header["source_mtime_ns"][0]), (size - HEADER_DTYPE.itemsize) // LINE_DTYPE.itemsize
+
+
+def load_line_store(receipts_file: Optional[str] = None) -> Optional[np.ndarray]:
+    """
+    Open the line items of a receipts file, rebuilding the file if missing or stale.
+
+    The records are memory-mapped, so opening costs no time even for long
+    histories; the operating system only reads the pages a query touches.
+    A stale file is not rewritten (that is left to the writers, see
+    load_aggregates); the records are then built in memory instead.
+
+    Args:
+        receipts_file: Path to the receipts JSON file. If None, uses default from config.
+
+    Returns:
+        np.ndarray: Records (LINE_DTYPE, read-only if mapped), or None if the receipts file does not exist
+    """
+    source_mtime = receipts_mtime_ns(receipts_file)
+    if source_mtime is None:
+        return None
+
+    stamp, count = _read_header(receipts_file)
+    if stamp != source_mtime:
+        return _records(load_item_dimension(receipts_file))
+    if count == 0:  # np.memmap can't map an empty range
+        return np.empty(0, dtype=LINE_DTYPE)
+    return np.memmap(
+        line_store_path(receipts_file),
+        dtype=LINE_DTYPE,
+        mode="r",
+        offset=HEADER_DTYPE.itemsize,
+        shape=(count,),
+    )
+
+
+def update_line_store(
+    dimension: Dict[str, Any],
+    new_receipt: Dict[str, Any],
+    previous_mtime_ns: Optional[int] = None,
+    receipts_file: Optional[str] = None,
+) -> None:
+    """
+    Apply a single added/replaced receipt to the line item file.
+
+    Must be called right after the item dimension was updated. The lines of a
+    new receipt are the last lines of the item dimension and are appended; a
+    replaced receipt or a file that was already out of sync is rewritten.
+    """
+    stamp, count = _read_header(receipts_file)
+    receipt_id = new_receipt.get("id") or new_receipt.get("url", "")
+    receipt_lines = dimension["lines"]["receipt"]
+    try:
+        receipt_key = dimension["receipts"].index(receipt_id)
+        new_lines = sum(1 for _ in takewhile(lambda key: key == receipt_key, reversed(receipt_lines)))
+    except ValueError:
+        new_lines = 0
+
+    if (
+        stamp is None
+        or previous_mtime_ns is None
+        or stamp != previous_mtime_ns
+        or count != len(receipt_lines) - new_lines
+    ):
+        save_line_store(_records(dimension), receipts_file)
+        return
+
+    # Records first, then the stamp: an interrupted append leaves a stale file
+    with open(line_store_path(receipts_file), "r+b") as file:
+        file.seek(0, os.SEEK_END)
+        file.write(_records(dimension, count).tobytes())
+        file.seek(0)
+        file.write(_header(receipts_file).tobytes())
+
+
+def restamp_line_store(
+    previous_mtime_ns: Optional[int], receipts_file: Optional[str] = None
+) -> None:
+    """Mark the line item file as current after a content-preserving rewrite."""
+    stamp, _ = _read_header(receipts_file)
+    if stamp is not None and stamp == previous_mtime_ns:
+        with open(line_store_path(receipts_file), "r+b") as file:
+            file.write(_header(receipts_file).tobytes())
+
+
+def product_totals(
+    records: np.ndarray, product_count: int, start_day: int, end_day: int
+) -> Dict[str, np.ndarray]:
+    """
+    Sum the line items of a date range per product, excluding Pfand items.
+
+    Args:
+        records: Line items as returned by load_line_store
+        product_count: Number of products of the item dimension
+        start_day: First day of the range (proleptic ordinal, inclusive)
+        end_day: Last day of the range (proleptic ordinal, inclusive)
+
+    Returns:
+        dict: Per-product arrays 'lines' (number of line items), 'quantity'
+              (pieces or kg) and 'cents' (total value)
+    """
+    day = records["day"]
+    mask = (day >= start_day) & (day <= end_day) & ((records["flags"] & FLAG_DEPOSIT) == 0)
+    product = records["product"][mask]
+    return {
+        "lines": np.bincount(product, minlength=product_count),
+        "quantity": np.bincount(
+            product, weights=records["quantity_milli"][mask], minlength=product_count
+        )
+        / 1000,
+        # float64 sums of integer cents are exact below 2**53
+        "cents": np.bincount(
+            product, weights=records["cents"][mask], minlength=product_count
+        ).astype(np.int64),
+    }
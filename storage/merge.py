@@ -0,0 +1,40 @@
+"""Combine the receipt files of several accounts into one analytics view."""
+
+from typing import Dict
+
+from .file_manager import load_existing_receipts, save_receipts_to_json
+from .archive import with_archived
+from .receipt_repository import rebuild_derived_files
+
+
+def merge_receipt_files(sources: Dict[str, str], target_file: str) -> int:
+    """
+    Write the receipts of several accounts into a single receipts file.
+
+    Every receipt (including archived ones) is tagged with its account name;
+    receipts are ordered by date (newest first) and all derived files of the
+    merged file (rollups, dimensions, line items, price history, search index)
+    are written.
+
+    Args:
+        sources: Mapping of account name to receipts file
+        target_file: Path of the merged receipts file
+
+    Returns:
+        int: Number of receipts in the merged file
+    """
+    merged = {}
+    for account, file_path in sources.items():
+        _, receipts = load_existing_receipts(file_path, strict=True)
+        for receipt in with_archived(receipts, file_path):
+            key = (account, receipt.get("id") or receipt.get("url", ""))
+            merged[key] = {**receipt, "account": account}
+
+    receipts = sorted(
+        merged.values(), key=lambda receipt: receipt.get("purchase_date") or "", reverse=True
+    )
+    save_receipts_to_json(receipts, target_file)
+
+    # Build the derived files now instead of on every dashboard load
+    rebuild_derived_files(receipts, target_file)
+    return len(receipts)
@@ -0,0 +1,201 @@
+"""Per-product price history index stored as sorted NumPy columns."""
+
+import os
+import zipfile
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from .file_manager import receipts_mtime_ns, sidecar_path
+from .item_dimension import ITEM_DIMENSION_VERSION, load_item_dimension
+
+PRICE_HISTORY_VERSION = 1
+
+# Observation columns, sorted by product key and then purchase day
+HISTORY_COLUMNS = ("product", "day", "unit_cents", "receipt")
+
+
+def price_history_path(receipts_file: Optional[str] = None) -> str:
+    """Get the price history file path belonging to a receipts file."""
+    return sidecar_path("prices.npz", receipts_file)
+
+
+def _observations(
+    dimension: Dict[str, Any], receipt_key: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Unit price observations of the item dimension's line items.
+
+    Args:
+        dimension: Item dimension as returned by load_item_dimension
+        receipt_key: Only return the lines of this receipt
+
+    Returns:
+        dict: Unsorted observation columns
+    """
+    lines = dimension["lines"]
+    receipt = np.asarray(lines["receipt"], dtype=np.int32)
+    quantity = np.asarray(lines["quantity"], dtype=np.float64)
+    mask = quantity > 0
+    if receipt_key is not None:
+        mask &= receipt == receipt_key
+
+    receipt = receipt[mask]
+    return {
+        "product": np.asarray(lines["product"], dtype=np.int32)[mask],
+        "day": np.asarray(dimension["receipt_days"], dtype=np.int32)[receipt],
+        "unit_cents": np.asarray(lines["unit_cents"], dtype=np.int32)[mask],
+        "receipt": receipt,
+    }
+
+
+def _sort_key(product: np.ndarray, day: np.ndarray) -> np.ndarray:
+    return (product.astype(np.int64) << 32) | day.astype(np.int64)
+
+
+def _with_offsets(history: Dict[str, np.ndarray], product_count: int) -> Dict[str, np.ndarray]:
+    # offsets[p]:offsets[p + 1] is the slice of product p
+    history["offsets"] = np.searchsorted(history["product"], np.arange(product_count + 1))
+    return history
+
+
+def build_price_history(dimension: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Build the price history of all products from the item dimension."""
+    observations = _observations(dimension)
+    order = np.lexsort((observations["day"], observations["product"]))
+    history = {column: observations[column][order] for column in HISTORY_COLUMNS}
+    return _with_offsets(history, len(dimension["products"]))
+
+
+def add_receipt_prices(
+    history: Dict[str, np.ndarray], dimension: Dict[str, Any], receipt_id: str
+) -> None:
+    """Insert the prices of an added receipt (replacing those of a known receipt)."""
+    try:
+        receipt_key = dimension["receipts"].index(receipt_id)
+    except ValueError:
+        return
+
+    keep = history["receipt"] != receipt_key
+    if not keep.all():
+        for column in HISTORY_COLUMNS:
+            history[column] = history[column][keep]
+
+    observations = _observations(dimension, receipt_key)
+    order = np.lexsort((observations["day"], observations["product"]))
+    new_keys = _sort_key(observations["product"][order], observations["day"][order])
+    positions = np.searchsorted(
+        _sort_key(history["product"], history["day"]), new_keys, side="right"
+    )
+    for column in HISTORY_COLUMNS:
+        history[column] = np.insert(history[column], positions, observations[column][order])
+    _with_offsets(history, len(dimension["products"]))
+
+
+def save_price_history(
+    history: Dict[str, np.ndarray], receipts_file: Optional[str] = None
+) -> None:
+    """Persist the price history, stamped with the receipts file it describes."""
+    path = price_history_path(receipts_file)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        np.savez(
+            file,
+            version=np.int64(PRICE_HISTORY_VERSION),
+            dimension_version=np.int64(ITEM_DIMENSION_VERSION),
+            source_mtime_ns=np.int64(receipts_mtime_ns(receipts_file) or -1),
+            **history,
+        )
+    os.replace(temp_path, path)
+
+
+def _read_price_history(
+    receipts_file: Optional[str],
+) -> Tuple[Optional[Dict[str, np.ndarray]], Optional[int]]:
+    try:
+        with np.load(price_history_path(receipts_file)) as data:
+            # Product keys are only stable within one item dimension version
+            if (
+                int(data["version"]) != PRICE_HISTORY_VERSION
+                or int(data["dimension_version"]) != ITEM_DIMENSION_VERSION
+            ):
+                return None, None
+            history = {name: data[name] for name in (*HISTORY_COLUMNS, "offsets")}
+            return history, int(data["source_mtime_ns"])
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        return None, None
+
+
+def load_price_history(
+    receipts_file: Optional[str] = None,
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Load the price history for a receipts file, rebuilding it if missing or stale.
+
+    Like the rollups (see load_aggregates), a stale history is only rebuilt
+    in memory; persisting it is left to the writers.
+
+    Args:
+        receipts_file: Path to the receipts JSON file. If None, uses default from config.
+
+    Returns:
+        dict: Price history columns, or None if the receipts file does not exist
+    """
+    source_mtime = receipts_mtime_ns(receipts_file)
+    if source_mtime is None:
+        return None
+
+    history, stamp = _read_price_history(receipts_file)
+    if history is not None and stamp == source_mtime:
+        return history
+
+    return build_price_history(load_item_dimension(receipts_file))
+
+
+def update_price_history(
+    dimension: Dict[str, Any],
+    new_receipt: Dict[str, Any],
+    previous_mtime_ns: Optional[int] = None,
+    receipts_file: Optional[str] = None,
+) -> None:
+    """
+    Apply a single added/replaced receipt to the persisted price history.
+
+    Must be called right after the item dimension was updated; falls back to a
+    rebuild from `dimension` if the stored history was already out of sync.
+    """
+    history, stamp = _read_price_history(receipts_file)
+    if history is None or previous_mtime_ns is None or stamp != previous_mtime_ns:
+        history = build_price_history(dimension)
+    else:
+        add_receipt_prices(history, dimension, new_receipt.get("id") or new_receipt.get("url", ""))
+    save_price_history(history, receipts_file)
+
+
+def restamp_price_history(
+    previous_mtime_ns: Optional[int], receipts_file: Optional[str] = None
+) -> None:
+    """Mark the price history as current after a content-preserving rewrite."""
+    history, stamp = _read_price_history(receipts_file)
+    if history is not None and stamp == previous_mtime_ns:
+        save_price_history(history, receipts_file)
+
+
+def product_prices(
+    history: Dict[str, np.ndarray], product_key: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the price history of one product (independent of the history size).
+
+    Args:
+        history: Price history as returned by load_price_history
+        product_key: Product key of the item dimension
+
+    Returns:
+        tuple: (purchase days as proleptic ordinals, unit prices in cents), sorted by day
+    """
+    offsets = history["offsets"]
+    if product_key + 1 >= len(offsets):
+        return history["day"][:0], history["unit_cents"][:0]
+    start, end = offsets[product_key], offsets[product_key + 1]
+    return history["day"][start:end], history["unit_cents"][start:end]
@@ -1,23 +1,53 @@
 """Receipt repository for CRUD operations."""
 
-from datetime import datetime
-from typing import Dict, Any
+from datetime import date, datetime
+from typing import Dict, Any, List, Optional
 
-from .file_manager import load_existing_receipts, save_receipts_to_json
+from metrics import METRICS
+from .file_manager import load_existing_receipts, save_receipts_to_json, receipts_mtime_ns
+from .aggregates import update_aggregates, restamp_aggregates, build_aggregates, save_aggregates
+from .item_dimension import (
+    update_item_dimension,
+    restamp_item_dimension,
+    build_item_dimension,
+    save_item_dimension,
+    _read_item_dimension,
+)
+from .search_index import update_search_index, restamp_search_index, build_search_index
+from .store_dimension import (
+    update_store_dimension,
+    restamp_store_dimension,
+    build_store_dimension,
+    save_store_dimension,
+    _read_store_dimension,
+)
+from .archive import (
+    partition_key,
+    load_manifest,
+    save_manifest,
+    read_partition,
+    write_partition,
+    find_archived_receipt,
+    with_archived,
+)
 
 
-def add_receipt_to_json(receipt_data: Dict[str, Any], verbose: bool = True) -> None:
+def add_receipt_to_json(
+    receipt_data: Dict[str, Any], verbose: bool = True, file_path: Optional[str] = None
+) -> None:
     """Add or update a single receipt in the JSON file immediately."""
-    existing_ids, existing_receipts = load_existing_receipts()
+    existing_ids, existing_receipts = load_existing_receipts(file_path, strict=True)
 
     # Check if receipt already exists and update it
     receipt_updated = False
+    old_receipt = None
     for i, existing_receipt in enumerate(existing_receipts):
         # Check both 'id' and 'url' fields for compatibility
         existing_key = existing_receipt.get("id") or existing_receipt.get("url", "")
         new_key = receipt_data.get("id") or receipt_data.get("url", "")
 
         if existing_key == new_key:
+            old_receipt = existing_receipt
             existing_receipts[i] = receipt_data
             receipt_updated = True
             break
@@ -26,7 +56,27 @@ def add_receipt_to_json(receipt_data: Dict[str, Any], verbose: bool = True) -> N
     if not receipt_updated:
         existing_receipts.append(receipt_data)
 
-    save_receipts_to_json(existing_receipts)
+        # A re-fetched archived receipt replaces the archived copy in the rollups
+        new_key = receipt_data.get("id") or receipt_data.get("url", "")
+        if new_key in existing_ids:
+            old_receipt = find_archived_receipt(new_key, file_path)
+
+    # The numpy-based derived files are only imported once a receipt is written
+    from .price_history import update_price_history
+    from .line_store import update_line_store
+
+    with METRICS.timer("storage_write_seconds", "Receipt write incl. derived files"):
+        previous_mtime = receipts_mtime_ns(file_path)
+        save_receipts_to_json(existing_receipts, file_path)
+
+        # Keep the dashboard rollups, item dimension, price history, line items,
+        # search index and store dimension in sync
+        update_aggregates(existing_receipts, receipt_data, old_receipt, previous_mtime, file_path)
+        dimension = update_item_dimension(existing_receipts, receipt_data, previous_mtime, file_path)
+        update_price_history(dimension, receipt_data, previous_mtime, file_path)
+        update_line_store(dimension, receipt_data, previous_mtime, file_path)
+        update_search_index(dimension, previous_mtime, file_path)
+        update_store_dimension(existing_receipts, receipt_data, previous_mtime, file_path)
 
     if verbose:
         action = "aktualisiert" if receipt_updated else "hinzugefügt"
@@ -35,9 +85,106 @@ def add_receipt_to_json(receipt_data: Dict[str, Any], verbose: bool = True) -> N
         )
 
 
-def sort_receipts_by_date() -> int:
+def rebuild_derived_files(
+    receipts: List[Dict[str, Any]], file_path: Optional[str] = None
+) -> None:
+    """
+    Build all derived files of a receipts file from scratch and persist them.
+
+    For bulk rewrites of the receipts file (merging, re-parsing), where one
+    rebuild is much cheaper than an incremental update per receipt. Must be
+    called right after the receipts file was written. Product and store keys
+    of the existing dimensions are kept.
+
+    Args:
+        receipts: All receipts, including the archived ones (see with_archived)
+        file_path: Path to the receipts file. If None, uses default from config.
+    """
+    from .price_history import build_price_history, save_price_history
+    from .line_store import build_line_store, save_line_store
+
+    save_aggregates(build_aggregates(receipts), file_path)
+    dimension = build_item_dimension(
+        receipts, _read_item_dimension(file_path, any_version=True)
+    )
+    save_item_dimension(dimension, file_path)
+    save_price_history(build_price_history(dimension), file_path)
+    save_line_store(build_line_store(dimension), file_path)
+    build_search_index(dimension, file_path)
+    save_store_dimension(
+        build_store_dimension(receipts, _read_store_dimension(file_path)), file_path
+    )
+
+
+def replace_receipts(
+    replacements: List[Dict[str, Any]],
+    file_path: Optional[str] = None,
+    rebuild_derived: bool = True,
+) -> None:
+    """
+    Replace many stored receipts with a single write per file.
+
+    Receipts of the receipts file are replaced in place, archived ones in
+    their partition (each affected partition is rewritten once); unknown
+    receipts are added to the receipts file. The derived files are then
+    rebuilt once, or only restamped if the replacements don't change their
+    content (e.g. a new parser version that parses to the same data).
+
+    Args:
+        replacements: New versions of the receipts
+        file_path: Path to the receipts file. If None, uses default from config.
+        rebuild_derived: Rebuild the derived files (False: only restamp them)
+    """
+    _, receipts = load_existing_receipts(file_path, strict=True)
+    pending = {receipt.get("id") or receipt.get("url", ""): receipt for receipt in replacements}
+    for i, receipt in enumerate(receipts):
+        key = receipt.get("id") or receipt.get("url", "")
+        if key in pending:
+            receipts[i] = pending.pop(key)
+
+    # Partitions first: a crash before the receipts file is written leaves
+    # the derived files stale, so they are rebuilt on the next write
+    manifest = load_manifest(file_path)
+    months = [
+        month
+        for month, partition in manifest["partitions"].items()
+        if any(key in pending for key in partition["ids"])
+    ]
+    for month in months:
+        month_receipts = [
+            pending.pop(receipt.get("id") or receipt.get("url", ""), receipt)
+            for receipt in read_partition(month, file_path)
+        ]
+        manifest["partitions"][month] = write_partition(month, month_receipts, file_path)
+    if months:
+        save_manifest(manifest, file_path)
+    receipts.extend(pending.values())
+
+    with METRICS.timer("storage_write_seconds", "Receipt write incl. derived files"):
+        previous_mtime = receipts_mtime_ns(file_path)
+        save_receipts_to_json(receipts, file_path)
+        if rebuild_derived:
+            rebuild_derived_files(with_archived(receipts, file_path), file_path)
+        else:
+            restamp_derived_files(previous_mtime, file_path)
+
+
+def restamp_derived_files(previous_mtime: Optional[int], file_path: Optional[str] = None) -> None:
+    """Mark all derived files as current after a content-preserving rewrite."""
+    from .price_history import restamp_price_history
+    from .line_store import restamp_line_store
+
+    restamp_aggregates(previous_mtime, file_path)
+    restamp_item_dimension(previous_mtime, file_path)
+    restamp_price_history(previous_mtime, file_path)
+    restamp_line_store(previous_mtime, file_path)
+    restamp_search_index(previous_mtime, file_path)
+    restamp_store_dimension(previous_mtime, file_path)
+
+
+def sort_receipts_by_date(file_path: Optional[str] = None) -> int:
     """Sort all receipts in the JSON file by date (newest first)."""
-    _, receipts = load_existing_receipts()
+    _, receipts = load_existing_receipts(file_path, strict=True)
 
     def get_date_key(receipt):
         date_str = receipt.get("purchase_date")
@@ -52,5 +199,63 @@ def sort_receipts_by_date() -> int:
                 return datetime.min
 
     sorted_receipts = sorted(receipts, key=get_date_key, reverse=True)
-    save_receipts_to_json(sorted_receipts)
+    previous_mtime = receipts_mtime_ns(file_path)
+    save_receipts_to_json(sorted_receipts, file_path)
+    restamp_derived_files(previous_mtime, file_path)
     return len(sorted_receipts)
+
+
+def archive_closed_months(
+    file_path: Optional[str] = None, hot_months: int = 1, today: Optional[date] = None
+) -> int:
+    """
+    Move the receipts of closed months into compressed archive partitions.
+
+    Only the last `hot_months` months (including the current one) stay in the
+    receipts file. Older receipts are merged into one gzip-compressed file per
+    month next to it; receipts without a valid date stay in the receipts file.
+
+    Args:
+        file_path: Path to the receipts file. If None, uses default from config.
+        hot_months: Number of months kept in the receipts file
+        today: Reference day (defaults to today)
+
+    Returns:
+        int: Number of receipts moved to the archive
+    """
+    today = today or date.today()
+    month_index = today.year * 12 + today.month - 1 - (max(hot_months, 1) - 1)
+    first_hot_month = f"{month_index // 12:04d}-{month_index % 12 + 1:02d}"
+
+    _, receipts = load_existing_receipts(file_path, strict=True)
+    hot: List[Dict[str, Any]] = []
+    closed: Dict[str, List[Dict[str, Any]]] = {}
+    for receipt in receipts:
+        month = partition_key(receipt)
+        if month is None or month >= first_hot_month:
+            hot.append(receipt)
+        else:
+            closed.setdefault(month, []).append(receipt)
+
+    if not closed:
+        return 0
+
+    # Write the partitions first, so a crash never loses receipts (at worst
+    # they are in both places, and the receipts file wins)
+    manifest = load_manifest(file_path)
+    for month, month_receipts in closed.items():
+        merged = {
+            receipt.get("id") or receipt.get("url", ""): receipt
+            for receipt in read_partition(month, file_path) + month_receipts
+        }
+        partition = sorted(
+            merged.values(), key=lambda receipt: receipt.get("purchase_date") or "", reverse=True
+        )
+        manifest["partitions"][month] = write_partition(month, partition, file_path)
+    save_manifest(manifest, file_path)
+
+    # The archive holds the same receipts, so the derived files stay valid
+    previous_mtime = receipts_mtime_ns(file_path)
+    save_receipts_to_json(hot, file_path)
+    restamp_derived_files(previous_mtime, file_path)
+    return len(receipts) - len(hot)
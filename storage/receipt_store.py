@@ -0,0 +1,83 @@
+"""In-memory receipt store for long-running processes."""
+
+from typing import Dict, Any, List, Optional
+
+from metrics import METRICS
+from .file_manager import load_existing_receipts, save_receipts_to_json, receipts_mtime_ns
+from .aggregates import update_aggregates
+from .item_dimension import update_item_dimension
+from .search_index import update_search_index
+from .store_dimension import update_store_dimension
+
+
+class ReceiptStore:
+    """
+    Keep the receipts file and its known-id index loaded between writes.
+
+    Unlike add_receipt_to_json, adding a receipt does not re-read the whole
+    file first. The file is only reloaded if another process changed it.
+    """
+
+    def __init__(self, file_path: Optional[str] = None) -> None:
+        """
+        Args:
+            file_path: Path to the receipts file. If None, uses default from config.
+        """
+        self.file_path = file_path
+        self.ids: set[str] = set()
+        self.receipts: List[Dict[str, Any]] = []
+        self._mtime_ns: Optional[int] = None
+        self.reload()
+
+    def reload(self) -> None:
+        """Load the receipts file and remember its modification stamp."""
+        self._mtime_ns = receipts_mtime_ns(self.file_path)
+        self.ids, self.receipts = load_existing_receipts(self.file_path, strict=True)
+
+    def refresh(self) -> bool:
+        """
+        Reload the receipts file if it was changed by another process.
+
+        Returns:
+            bool: True if the file was reloaded
+        """
+        if receipts_mtime_ns(self.file_path) == self._mtime_ns:
+            return False
+        self.reload()
+        return True
+
+    def __contains__(self, receipt_id: str) -> bool:
+        return receipt_id in self.ids
+
+    def __len__(self) -> int:
+        # Known receipts, including the archived ones
+        return len(self.ids)
+
+    def add(self, receipt_data: Dict[str, Any]) -> None:
+        """Store a new receipt (newest first) and update the derived files."""
+        self.refresh()
+        if receipt_data["id"] in self.ids:
+            return
+
+        self.receipts.insert(0, receipt_data)
+        self.ids.add(receipt_data["id"])
+
+        # The numpy-based derived files are only imported once a receipt is written
+        from .price_history import update_price_history
+        from .line_store import update_line_store
+
+        with METRICS.timer("storage_write_seconds", "Receipt write incl. derived files"):
+            previous_mtime = self._mtime_ns
+            save_receipts_to_json(self.receipts, self.file_path)
+            self._mtime_ns = receipts_mtime_ns(self.file_path)
+
+            # Keep the dashboard rollups, item dimension, price history, line items,
+            # search index and store dimension in sync
+            update_aggregates(self.receipts, receipt_data, None, previous_mtime, self.file_path)
+            dimension = update_item_dimension(
+                self.receipts, receipt_data, previous_mtime, self.file_path
+            )
+            update_price_history(dimension, receipt_data, previous_mtime, self.file_path)
+            update_line_store(dimension, receipt_data, previous_mtime, self.file_path)
+            update_search_index(dimension, previous_mtime, self.file_path)
+            update_store_dimension(self.receipts, receipt_data, previous_mtime, self.file_path)
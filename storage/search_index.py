@@ -0,0 +1,264 @@
+"""Full-text search index over the names of all purchased products (SQLite FTS5)."""
+
+import difflib
+import os
+import pathlib
+import re
+import sqlite3
+import unicodedata
+from typing import Dict, Any, List, Optional
+
+from .file_manager import receipts_mtime_ns, sidecar_path
+from .item_dimension import ITEM_DIMENSION_VERSION, load_item_dimension
+
+SEARCH_INDEX_VERSION = 1
+
+# Words closer than this (difflib ratio) count as a fuzzy match
+FUZZY_CUTOFF = 0.75
+
+
+def search_index_path(receipts_file: Optional[str] = None) -> str:
+    """Get the search index file path belonging to a receipts file."""
+    return sidecar_path("search.sqlite", receipts_file)
+
+
+def fold_text(text: str) -> str:
+    """Normalize text for matching (case, umlauts/accents and whitespace)."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return re.sub(r"\s+", " ", stripped).strip().casefold()
+
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"\w+", text)
+
+
+def _has_fts5(connection: sqlite3.Connection) -> bool:
+    try:
+        connection.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        connection.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _create_schema(connection: sqlite3.Connection) -> None:
+    connection.executescript(
+        """
+        DROP TABLE IF EXISTS meta;
+        DROP TABLE IF EXISTS products;
+        DROP TABLE IF EXISTS words;
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value INTEGER);
+        CREATE TABLE words (word TEXT PRIMARY KEY) WITHOUT ROWID;
+        """
+    )
+    if _has_fts5(connection):
+        # Trigrams match any part of a word (e.g. 'milch' in 'vollmilch')
+        connection.execute(
+            "CREATE VIRTUAL TABLE products USING fts5(text, tokenize = 'trigram')"
+        )
+    else:  # SQLite without FTS5: plain table searched with LIKE
+        connection.execute("CREATE TABLE products (rowid INTEGER PRIMARY KEY, text TEXT)")
+
+
+def _set_meta(connection: sqlite3.Connection, **values: Optional[int]) -> None:
+    connection.executemany(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", values.items()
+    )
+
+
+def _get_meta(connection: sqlite3.Connection) -> Dict[str, Optional[int]]:
+    try:
+        return dict(connection.execute("SELECT key, value FROM meta"))
+    except sqlite3.DatabaseError:
+        return {}
+
+
+def _add_products(
+    connection: sqlite3.Connection, dimension: Dict[str, Any], first_key: int
+) -> None:
+    """Index the products of the item dimension from `first_key` on."""
+    rows = []
+    words = set()
+    for key, product in enumerate(dimension["products"][first_key:], start=first_key):
+        text = fold_text(product["name"])
+        if product.get("art_id"):
+            text = f"{text} {product['art_id']}"
+        rows.append((key, text))
+        words.update(_words(text))
+    connection.executemany("INSERT INTO products (rowid, text) VALUES (?, ?)", rows)
+    connection.executemany("INSERT OR IGNORE INTO words (word) VALUES (?)", ((w,) for w in words))
+
+
+def _is_current(meta: Dict[str, Optional[int]]) -> bool:
+    # Product keys are only stable within one item dimension version
+    return (
+        meta.get("version") == SEARCH_INDEX_VERSION
+        and meta.get("dimension_version") == ITEM_DIMENSION_VERSION
+    )
+
+
+def _fill_search_index(
+    connection: sqlite3.Connection, dimension: Dict[str, Any], receipts_file: Optional[str]
+) -> None:
+    with connection:
+        _create_schema(connection)
+        _add_products(connection, dimension, 0)
+        _set_meta(
+            connection,
+            version=SEARCH_INDEX_VERSION,
+            dimension_version=ITEM_DIMENSION_VERSION,
+            products=len(dimension["products"]),
+            source_mtime_ns=receipts_mtime_ns(receipts_file),
+        )
+
+
+def build_search_index(
+    dimension: Dict[str, Any], receipts_file: Optional[str] = None
+) -> None:
+    """Build the search index of all products of the item dimension from scratch."""
+    connection = sqlite3.connect(search_index_path(receipts_file))
+    try:
+        _fill_search_index(connection, dimension, receipts_file)
+    finally:
+        connection.close()
+
+
+def update_search_index(
+    dimension: Dict[str, Any],
+    previous_mtime_ns: Optional[int] = None,
+    receipts_file: Optional[str] = None,
+) -> None:
+    """
+    Index the products added to the item dimension by a new receipt.
+
+    Products are only ever appended to the item dimension, so only the new
+    ones are inserted; an index that was already out of sync is rebuilt.
+    """
+    with sqlite3.connect(search_index_path(receipts_file)) as connection:
+        meta = _get_meta(connection)
+        if (
+            _is_current(meta)
+            and previous_mtime_ns is not None
+            and meta.get("source_mtime_ns") == previous_mtime_ns
+        ):
+            _add_products(connection, dimension, meta["products"])
+            _set_meta(
+                connection,
+                products=len(dimension["products"]),
+                source_mtime_ns=receipts_mtime_ns(receipts_file),
+            )
+            update_done = True
+        else:
+            update_done = False
+    connection.close()
+
+    if not update_done:
+        build_search_index(dimension, receipts_file)
+
+
+def restamp_search_index(
+    previous_mtime_ns: Optional[int], receipts_file: Optional[str] = None
+) -> None:
+    """Mark the search index as current after a content-preserving rewrite."""
+    with sqlite3.connect(search_index_path(receipts_file)) as connection:
+        meta = _get_meta(connection)
+        if _is_current(meta) and meta.get("source_mtime_ns") == previous_mtime_ns:
+            _set_meta(connection, source_mtime_ns=receipts_mtime_ns(receipts_file))
+    connection.close()
+
+
+def open_search_index(receipts_file: Optional[str] = None) -> Optional[sqlite3.Connection]:
+    """
+    Open the search index for a receipts file, rebuilding it if missing or stale.
+
+    A stale index file is not rewritten (that is left to the writers, see
+    storage.load_aggregates); an in-memory index is built instead. The
+    connection may be shared between threads for reading.
+
+    Args:
+        receipts_file: Path to the receipts JSON file. If None, uses default from config.
+
+    Returns:
+        sqlite3.Connection: Search index, or None if the receipts file does not exist
+    """
+    source_mtime = receipts_mtime_ns(receipts_file)
+    if source_mtime is None:
+        return None
+
+    path = search_index_path(receipts_file)
+    if os.path.exists(path):
+        # Read-only, so a reader never creates or changes the index file
+        uri = f"{pathlib.Path(os.path.abspath(path)).as_uri()}?mode=ro"
+        connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        meta = _get_meta(connection)
+        if _is_current(meta) and meta.get("source_mtime_ns") == source_mtime:
+            return connection
+        connection.close()
+
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    _fill_search_index(connection, load_item_dimension(receipts_file), receipts_file)
+    return connection
+
+
+def _match_products(
+    connection: sqlite3.Connection, alternatives: List[List[str]], limit: int
+) -> List[int]:
+    """Products matching every term (a term matches if any of its alternatives does)."""
+    conditions = []
+    params: List[str] = []
+    for words in alternatives:
+        # Trigram matching needs three characters, shorter words use LIKE
+        conditions.append(" OR ".join("text LIKE ?" for _ in words))
+        params.extend(f"%{word}%" for word in words)
+    sql = f"SELECT rowid FROM products WHERE ({') AND ('.join(conditions)})"
+    if all(len(word) >= 3 for words in alternatives for word in words):
+        try:
+            query = " AND ".join(
+                "(" + " OR ".join(f'"{word}"' for word in words) + ")" for words in alternatives
+            )
+            rows = connection.execute(
+                "SELECT rowid FROM products WHERE products MATCH ? ORDER BY rank LIMIT ?",
+                (query, limit),
+            ).fetchall()
+            return [row[0] for row in rows]
+        except sqlite3.OperationalError:  # no FTS5 table
+            pass
+    rows = connection.execute(f"{sql} LIMIT ?", (*params, limit)).fetchall()
+    return [row[0] for row in rows]
+
+
+def search_products(
+    connection: sqlite3.Connection, query: str, limit: int = 20, fuzzy: bool = True
+) -> List[int]:
+    """
+    Find products by name (or article number).
+
+    All words of the query must occur in the product name, also as part of a
+    word ('milch' finds 'Vollmilch'). If nothing matches and `fuzzy` is set,
+    misspelled words are replaced by the closest known words ('jogurt' finds
+    'Joghurt').
+
+    Args:
+        connection: Search index as returned by open_search_index
+        query: Search text
+        limit: Maximum number of results
+        fuzzy: Retry with similar words if there are no exact matches
+
+    Returns:
+        list: Product keys of the item dimension, best matches first
+    """
+    terms = _words(fold_text(query))
+    if not terms:
+        return []
+
+    results = _match_products(connection, [[term] for term in terms], limit)
+    if results or not fuzzy:
+        return results
+
+    vocabulary = [row[0] for row in connection.execute("SELECT word FROM words")]
+    alternatives = []
+    for term in terms:
+        close = difflib.get_close_matches(term, vocabulary, n=5, cutoff=FUZZY_CUTOFF)
+        alternatives.append(close or [term])
+    return _match_products(connection, alternatives, limit)
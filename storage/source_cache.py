@@ -0,0 +1,83 @@
+"""Cache of the raw receipt sources (API ticket fields and HTML) for re-parsing."""
+
+import hashlib
+import json
+import sqlite3
+import zlib
+from typing import Dict, Any, Optional
+
+from .file_manager import sidecar_path
+
+# Ticket fields the parser needs besides the HTML
+SOURCE_FIELDS = ("id", "date", "totalAmount", "store", "store_info")
+
+
+def source_cache_path(receipts_file: Optional[str] = None) -> str:
+    """Get the source cache file path belonging to a receipts file."""
+    return sidecar_path("sources.sqlite", receipts_file)
+
+
+def source_hash(html: str) -> str:
+    """Get the content hash of a receipt's HTML."""
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def _connect(receipts_file: Optional[str]) -> sqlite3.Connection:
+    connection = sqlite3.connect(source_cache_path(receipts_file), timeout=30)
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sources (
+            id TEXT PRIMARY KEY,
+            hash TEXT NOT NULL,
+            ticket TEXT NOT NULL,
+            html BLOB NOT NULL
+        )
+        """
+    )
+    return connection
+
+
+def save_receipt_source(source: Dict[str, Any], receipts_file: Optional[str] = None) -> None:
+    """
+    Store the source of a receipt (replacing an older version).
+
+    Args:
+        source: Ticket fields (see SOURCE_FIELDS) and 'html'
+        receipts_file: Path to the receipts JSON file. If None, uses default from config.
+    """
+    ticket = {field: source.get(field) for field in SOURCE_FIELDS}
+    connection = _connect(receipts_file)
+    try:
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sources (id, hash, ticket, html) VALUES (?, ?, ?, ?)",
+                (
+                    source["id"],
+                    source_hash(source["html"]),
+                    json.dumps(ticket, ensure_ascii=False),
+                    zlib.compress(source["html"].encode("utf-8")),
+                ),
+            )
+    finally:
+        connection.close()
+
+
+def load_receipt_source(
+    receipt_id: str, receipts_file: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Load the cached source of a receipt.
+
+    Returns:
+        dict: Ticket fields and 'html', or None if the receipt is not cached
+    """
+    connection = _connect(receipts_file)
+    try:
+        row = connection.execute(
+            "SELECT ticket, html FROM sources WHERE id = ?", (receipt_id,)
+        ).fetchone()
+    finally:
+        connection.close()
+    if row is None:
+        return None
+    return {**json.loads(row[0]), "html": zlib.decompress(row[1]).decode("utf-8")}
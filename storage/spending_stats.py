@@ -0,0 +1,229 @@
+"""Rolling spending statistics, forecast and anomaly detection on the rollups.
+
+The rollups keep weekly totals (overall and per store) and running statistics
+[count, sum, sum of squares] of the weekly totals, the weekly totals per store
+and the monthly totals per calendar month (seasonality). A receipt changes one
+week and one month, so each statistic is updated in O(1) by replacing that
+period's old total with its new one. All amounts are integer cents.
+"""
+
+import calendar
+import math
+from datetime import date, timedelta
+from typing import Dict, Any, List, Optional
+
+# Periods averaged by the moving averages
+WEEKLY_WINDOW = 4
+MONTHLY_WINDOW = 3
+
+# Weeks per series (overall and per store) checked for anomalies, and the
+# |z| that counts as anomaly
+RECENT_WEEKS = 8
+ANOMALY_Z = 2.0
+
+# Other weeks needed before a week's z-score is meaningful
+MIN_WEEKS = 4
+
+# Calendar months needed (over the years) before the seasonal baseline is used
+MIN_SEASON_MONTHS = 2
+
+
+def week_start(day: date) -> date:
+    """Get the Monday of a day's week."""
+    return day - timedelta(days=day.weekday())
+
+
+def empty_spending_stats() -> Dict[str, Any]:
+    """Running statistics of an empty history."""
+    return {"weeks": [0, 0, 0], "stores": {}, "season": {}}
+
+
+def _replace(stats: List[int], old: int, new: int) -> None:
+    """Replace one observation of [count, sum, sum of squares] (0 = no observation)."""
+    if old:
+        stats[0] -= 1
+        stats[1] -= old
+        stats[2] -= old * old
+    if new:
+        stats[0] += 1
+        stats[1] += new
+        stats[2] += new * new
+
+
+def _add_to_period(totals: Dict[str, int], key: str, cents: int) -> int:
+    """Add to a period total (dropping empty periods) and return the old total."""
+    old = totals.get(key, 0)
+    if old + cents:
+        totals[key] = old + cents
+    else:
+        totals.pop(key, None)
+    return old
+
+
+def update_spending_stats(
+    aggregates: Dict[str, Any], day: date, store: str, cents: int
+) -> None:
+    """
+    Apply a receipt's total to the weekly totals and running statistics.
+
+    Must be called after the monthly rollup was updated with the receipt.
+
+    Args:
+        aggregates: Rollups
+        day: Purchase day of the receipt
+        store: Store name of the receipt
+        cents: Receipt total in cents (negative to remove a receipt)
+    """
+    stats = aggregates["stats"]
+    week = week_start(day).isoformat()
+
+    old = _add_to_period(aggregates["weekly"], week, cents)
+    _replace(stats["weeks"], old, old + cents)
+
+    store_weeks = aggregates["store_weekly"].setdefault(store, {})
+    old = _add_to_period(store_weeks, week, cents)
+    _replace(stats["stores"].setdefault(store, [0, 0, 0]), old, old + cents)
+    if not store_weeks:
+        del aggregates["store_weekly"][store]
+        del stats["stores"][store]
+
+    month_bucket = aggregates["monthly"].get(day.isoformat()[:7])
+    new = month_bucket["total"] if month_bucket else 0
+    season = stats["season"].setdefault(f"{day.month:02d}", [0, 0, 0])
+    _replace(season, new - cents, new)
+
+
+def _mean(stats: List[int]) -> Optional[float]:
+    return stats[1] / stats[0] if stats[0] else None
+
+
+def _z_score(stats: List[int], value: int) -> Optional[float]:
+    """z-score of one observation against all others of the statistics."""
+    count = stats[0] - 1
+    if count < MIN_WEEKS:
+        return None
+    mean = (stats[1] - value) / count
+    variance = max((stats[2] - value * value) / count - mean * mean, 0.0)
+    if variance == 0:
+        return None
+    return (value - mean) / math.sqrt(variance)
+
+
+def _add_months(month_start: date, months: int) -> date:
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def weekly_totals(aggregates: Dict[str, Any], start: date, end: date) -> List[List[Any]]:
+    """
+    Return [week start, total cents] for every week of a range (weeks without receipts are 0).
+
+    Args:
+        aggregates: Rollups as returned by load_aggregates
+        start: A day in the first week
+        end: A day in the last week
+    """
+    weeks = []
+    week = week_start(start)
+    while week <= end:
+        weeks.append([week, aggregates["weekly"].get(week.isoformat(), 0)])
+        week += timedelta(days=7)
+    return weeks
+
+
+def spending_forecast(aggregates: Dict[str, Any], today: date) -> Dict[str, Any]:
+    """
+    Moving averages and a spending forecast for the current and next month.
+
+    The current month is projected from its spending so far plus the
+    recent daily rate. The next month is the monthly moving average, scaled
+    by the seasonal baseline of its calendar month once that month was seen
+    in at least MIN_SEASON_MONTHS years.
+
+    Args:
+        aggregates: Rollups as returned by load_aggregates
+        today: Reference day (e.g. the last purchase day)
+
+    Returns:
+        dict: Amounts in cents ('week_spent', 'weekly_average', 'monthly_average',
+              'month_spent', 'month_forecast', 'next_month_forecast'), the
+              'next_month' (first day) and its 'seasonal_factor' (None without baseline)
+    """
+    this_week = week_start(today)
+    previous_weeks = weekly_totals(
+        aggregates, this_week - timedelta(days=7 * WEEKLY_WINDOW), this_week - timedelta(days=7)
+    )
+    weekly_average = sum(total for _, total in previous_weeks) / WEEKLY_WINDOW
+
+    this_month = today.replace(day=1)
+    monthly_average = (
+        sum(
+            aggregates["monthly"].get(_add_months(this_month, -i).isoformat()[:7], {}).get("total", 0)
+            for i in range(1, MONTHLY_WINDOW + 1)
+        )
+        / MONTHLY_WINDOW
+    )
+
+    month_spent = aggregates["monthly"].get(this_month.isoformat()[:7], {}).get("total", 0)
+    remaining_days = calendar.monthrange(today.year, today.month)[1] - today.day
+    month_forecast = month_spent + weekly_average / 7 * remaining_days
+
+    next_month = _add_months(this_month, 1)
+    season = aggregates["stats"]["season"]
+    seasonal_factor = None
+    month_stats = season.get(f"{next_month.month:02d}")
+    all_months = [sum(stats[i] for stats in season.values()) for i in range(2)]
+    if month_stats and month_stats[0] >= MIN_SEASON_MONTHS and all_months[1] > 0:
+        seasonal_factor = _mean(month_stats) / (all_months[1] / all_months[0])
+    next_month_forecast = monthly_average * (seasonal_factor or 1.0)
+
+    return {
+        "week_spent": aggregates["weekly"].get(this_week.isoformat(), 0),
+        "weekly_average": weekly_average,
+        "monthly_average": monthly_average,
+        "month_spent": month_spent,
+        "month_forecast": month_forecast,
+        "next_month": next_month,
+        "next_month_forecast": next_month_forecast,
+        "seasonal_factor": seasonal_factor,
+    }
+
+
+def spending_anomalies(
+    aggregates: Dict[str, Any], threshold: float = ANOMALY_Z
+) -> List[Dict[str, Any]]:
+    """
+    Find recent weeks whose spending deviates strongly from the usual weeks.
+
+    Each of the last RECENT_WEEKS weeks with receipts is compared, overall and
+    per store, with all other weeks with receipts (z-score). Receipts carry no
+    product categories, so the store is the only breakdown.
+
+    Args:
+        aggregates: Rollups as returned by load_aggregates
+        threshold: Minimum |z| of an anomaly
+
+    Returns:
+        list: Dicts with 'store' (None for all stores), 'week' (Monday),
+              'cents', 'mean' (cents of the other weeks) and 'z', largest |z| first
+    """
+    series = [(None, aggregates["weekly"], aggregates["stats"]["weeks"])]
+    for store, weeks in aggregates["store_weekly"].items():
+        series.append((store, weeks, aggregates["stats"]["stores"][store]))
+
+    anomalies = []
+    for store, weeks, stats in series:
+        for week in sorted(weeks)[-RECENT_WEEKS:]:
+            cents = weeks[week]
+            z = _z_score(stats, cents)
+            if z is not None and abs(z) >= threshold:
+                anomalies.append(
+                    {
+                        "store": store,
+                        "week": date.fromisoformat(week),
+                        "cents": cents,
+                        "mean": (stats[1] - cents) / (stats[0] - 1),
+                        "z": z,
+                    }
+                )
+    return sorted(anomalies, key=lambda anomaly: -abs(anomaly["z"]))
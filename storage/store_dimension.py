@@ -0,0 +1,186 @@
+"""Store dimension with integer store keys and a store -> receipts index."""
+
+import json
+from typing import Dict, Any, List, Optional
+
+from .file_manager import load_existing_receipts, receipts_mtime_ns, sidecar_path, write_json_atomic
+from .archive import with_archived
+from .aggregates import is_countable, parse_purchase_date, to_cents
+
+STORE_DIMENSION_VERSION = 1
+
+
+def store_dimension_path(receipts_file: Optional[str] = None) -> str:
+    """Get the store dimension file path belonging to a receipts file."""
+    return sidecar_path("stores.json", receipts_file)
+
+
+def _empty_dimension() -> Dict[str, Any]:
+    return {
+        "version": STORE_DIMENSION_VERSION,
+        "source_mtime_ns": None,
+        "stores": [],  # store key -> {'id', 'name', 'info' (store object of the API)}
+        "receipt_stores": {},  # receipt id -> store key
+        # store key -> receipt columns: receipt id, purchase date as proleptic ordinal, total in cents
+        "index": [],
+    }
+
+
+def _store_lookup(dimension: Dict[str, Any]) -> Dict[str, int]:
+    lookup: Dict[str, int] = {}
+    for key, store in enumerate(dimension["stores"]):
+        lookup.setdefault(f"name:{store['name']}", key)
+        if store["id"]:
+            lookup[f"id:{store['id']}"] = key
+    return lookup
+
+
+def _store_key(dimension: Dict[str, Any], lookup: Dict[str, int], receipt: Dict[str, Any]) -> int:
+    """Get the key of a receipt's store, registering new stores."""
+    info = receipt.get("store_info") or None
+    store_id = str(info["id"]) if info and info.get("id") else None
+    name = receipt.get("store") or (info or {}).get("name") or "Unknown"
+
+    key = lookup.get(f"id:{store_id}") if store_id else None
+    if key is None:
+        # Receipts stored before store objects were kept only carry the name
+        key = lookup.get(f"name:{name}")
+        if key is not None and store_id and dimension["stores"][key]["id"] not in (None, store_id):
+            key = None
+    if key is None:
+        key = len(dimension["stores"])
+        dimension["stores"].append({"id": None, "name": name, "info": None})
+        dimension["index"].append({"receipts": [], "days": [], "cents": []})
+        lookup.setdefault(f"name:{name}", key)
+
+    if info:
+        # The newest store object wins (e.g. a changed address)
+        dimension["stores"][key].update(id=store_id, info=info)
+        if store_id:
+            lookup[f"id:{store_id}"] = key
+    return key
+
+
+def _remove_receipt(dimension: Dict[str, Any], receipt_id: str) -> None:
+    key = dimension["receipt_stores"].pop(receipt_id, None)
+    if key is None:
+        return
+    entries = dimension["index"][key]
+    position = entries["receipts"].index(receipt_id)
+    for column in entries.values():
+        del column[position]
+
+
+def add_receipt_store(
+    dimension: Dict[str, Any], receipt: Dict[str, Any], lookup: Optional[Dict[str, int]] = None
+) -> None:
+    """Register a receipt with its store (replacing the entry of a known receipt)."""
+    if lookup is None:
+        lookup = _store_lookup(dimension)
+
+    receipt_id = receipt.get("id") or receipt.get("url", "")
+    _remove_receipt(dimension, receipt_id)
+    if not is_countable(receipt):
+        return
+
+    key = _store_key(dimension, lookup, receipt)
+    entries = dimension["index"][key]
+    entries["receipts"].append(receipt_id)
+    entries["days"].append(parse_purchase_date(receipt["purchase_date"]).toordinal())
+    entries["cents"].append(to_cents(receipt.get("total_price")))
+    dimension["receipt_stores"][receipt_id] = key
+
+
+def build_store_dimension(
+    receipts: List[Dict[str, Any]], previous: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Build the store dimension and index from scratch.
+
+    Stores of a `previous` dimension are kept so store keys stay stable
+    across rebuilds.
+    """
+    dimension = _empty_dimension()
+    if previous is not None:
+        dimension["stores"] = previous["stores"]
+        dimension["index"] = [{"receipts": [], "days": [], "cents": []} for _ in previous["stores"]]
+    lookup = _store_lookup(dimension)
+    for receipt in receipts:
+        add_receipt_store(dimension, receipt, lookup)
+    return dimension
+
+
+def save_store_dimension(dimension: Dict[str, Any], receipts_file: Optional[str] = None) -> None:
+    """Persist the store dimension, stamped with the receipts file it describes."""
+    dimension["source_mtime_ns"] = receipts_mtime_ns(receipts_file)
+    write_json_atomic(dimension, store_dimension_path(receipts_file), separators=(",", ":"))
+
+
+def _read_store_dimension(receipts_file: Optional[str]) -> Optional[Dict[str, Any]]:
+    try:
+        with open(store_dimension_path(receipts_file), "r", encoding="utf-8") as file:
+            dimension = json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if dimension.get("version") != STORE_DIMENSION_VERSION:
+        return None
+    return dimension
+
+
+def load_store_dimension(receipts_file: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Load the store dimension for a receipts file, rebuilding it if missing or stale.
+
+    Like the rollups (see load_aggregates), a stale dimension is only rebuilt
+    in memory; persisting it is left to the writers.
+
+    Args:
+        receipts_file: Path to the receipts JSON file. If None, uses default from config.
+
+    Returns:
+        dict: Store dimension, or None if the receipts file does not exist
+    """
+    source_mtime = receipts_mtime_ns(receipts_file)
+    if source_mtime is None:
+        return None
+
+    dimension = _read_store_dimension(receipts_file)
+    if dimension is not None and dimension.get("source_mtime_ns") == source_mtime:
+        return dimension
+
+    # Derived files cover the receipts file and its archive partitions
+    _, receipts = load_existing_receipts(receipts_file)
+    return build_store_dimension(with_archived(receipts, receipts_file), dimension)
+
+
+def update_store_dimension(
+    receipts: List[Dict[str, Any]],
+    new_receipt: Dict[str, Any],
+    previous_mtime_ns: Optional[int] = None,
+    receipts_file: Optional[str] = None,
+) -> None:
+    """
+    Apply a single added/replaced receipt to the persisted store dimension.
+
+    Must be called right after the receipts file was written; falls back to a
+    rebuild from `receipts` if the stored dimension was already out of sync.
+    """
+    dimension = _read_store_dimension(receipts_file)
+    if (
+        dimension is None
+        or previous_mtime_ns is None
+        or dimension.get("source_mtime_ns") != previous_mtime_ns
+    ):
+        dimension = build_store_dimension(with_archived(receipts, receipts_file), dimension)
+    else:
+        add_receipt_store(dimension, new_receipt)
+    save_store_dimension(dimension, receipts_file)
+
+
+def restamp_store_dimension(
+    previous_mtime_ns: Optional[int], receipts_file: Optional[str] = None
+) -> None:
+    """Mark the store dimension as current after a content-preserving rewrite."""
+    dimension = _read_store_dimension(receipts_file)
+    if dimension is not None and dimension.get("source_mtime_ns") == previous_mtime_ns:
+        save_store_dimension(dimension, receipts_file)
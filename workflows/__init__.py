@@ -1,12 +1,25 @@
 """Workflows module for business logic orchestration."""
 
-from .initial_setup import initial_setup
-from .update_workflow import update_data
-from .collector import collect_all_receipt_ids, process_all_tickets
-
-__all__ = [
-    "initial_setup",
-    "update_data",
-    "collect_all_receipt_ids",
-    "process_all_tickets",
-]
+import importlib
+
+# Submodules are only imported on first attribute access (PEP 562) so that
+# e.g. `get_data.py --help` does not load requests, bs4 or browser_cookie3.
+_EXPORTS = {
+    "initial_setup": ".initial_setup",
+    "update_data": ".update_workflow",
+    "collect_all_receipt_ids": ".collector",
+    "process_all_tickets": ".collector",
+    "run_batch": ".batch",
+    "watch_receipts": ".watch",
+    "refresh_receipts": ".refresh",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,116 @@
+"""Batch workflow ingesting several accounts concurrently."""
+
+import contextlib
+import contextvars
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, TextIO
+
+from config import LidlProfile
+from storage import merge_receipt_files
+from .initial_setup import initial_setup
+from .update_workflow import update_data
+
+
+class _PrefixedOutput:
+    """
+    Stdout wrapper prefixing every line with the profile of the writing thread.
+
+    The label is a context variable, so helper threads started in the
+    profile's context (e.g. the progress display's render thread) inherit it.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self._lock = threading.Lock()
+        self._label: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+            "output_label", default=None
+        )
+        self._local = threading.local()  # unterminated line of each thread
+
+    def start(self, label: str) -> None:
+        """Prefix all output of the current thread with `label`."""
+        self._label.set(label)
+        self._local.buffer = ""
+
+    def finish(self) -> None:
+        """Write any unterminated output of the current thread."""
+        if getattr(self._local, "buffer", ""):
+            self.write("\n")
+        self._label.set(None)
+
+    def write(self, text: str) -> int:
+        label = self._label.get()
+        if label is None:
+            with self._lock:
+                self.stream.write(text)
+            return len(text)
+
+        # Only complete lines are written so lines of different threads never mix
+        buffer = getattr(self._local, "buffer", "")
+        *lines, self._local.buffer = (buffer + text).split("\n")
+        if lines:
+            with self._lock:
+                for line in lines:
+                    line = line.lstrip("\r")
+                    self.stream.write(f"[{label}] {line}\n")
+        return len(text)
+
+    def flush(self) -> None:
+        with self._lock:
+            self.stream.flush()
+
+    def isatty(self) -> bool:
+        # Several threads must not redraw in-place progress blocks
+        return False
+
+
+def run_batch(
+    profiles: List[LidlProfile],
+    initial: bool = False,
+    max_workers: Optional[int] = None,
+    merged_file: Optional[str] = None,
+) -> bool:
+    """
+    Ingest several accounts concurrently, each with its own session and files.
+
+    Args:
+        profiles: Account profiles (with auth method and receipts file each)
+        initial: Run the initial setup instead of the update for every account
+        max_workers: Number of accounts processed at the same time (default: all)
+        merged_file: If set, write the receipts of all accounts to this file afterwards
+
+    Returns:
+        bool: True if all accounts were processed successfully
+    """
+    workflow = initial_setup if initial else update_data
+    output = _PrefixedOutput(sys.stdout)
+
+    def run(profile: LidlProfile) -> bool:
+        output.start(profile.name)
+        try:
+            return workflow(profile=profile)
+        except Exception as e:
+            print(f"✗ Unerwarteter Fehler: {e}")
+            return False
+        finally:
+            output.finish()
+
+    print(f"=== BATCH: {len(profiles)} Konten ===")
+    with contextlib.redirect_stdout(output):
+        with ThreadPoolExecutor(max_workers=max_workers or len(profiles)) as executor:
+            results = list(executor.map(run, profiles))
+
+    print("\n=== BATCH ABGESCHLOSSEN ===")
+    for profile, success in zip(profiles, results):
+        status = "✓" if success else "✗"
+        print(f"{status} {profile.name} ({profile.get_country_code()}): {profile.receipts_file}")
+
+    if merged_file:
+        count = merge_receipt_files(
+            {profile.name: profile.receipts_file for profile in profiles}, merged_file
+        )
+        print(f"Zusammengeführte Ansicht: {count} Kassenbons in {merged_file}")
+
+    return all(results)
@@ -1,33 +1,88 @@
 """Receipt ID collection and processing logic."""
 
-import time
-from typing import List, Tuple
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
 import requests
 
-from config import LidlConfig
-from api import get_tickets_page, get_receipt_details_and_html
+from config import LidlProfile, resolve_profile
+from metrics import METRICS
+from api import get_tickets_page, fetch_and_parse_receipts, RequestPacer
 from storage import load_existing_receipts, add_receipt_to_json
 from .progress_display import ReceiptProgressDisplay, ProgressState
 
 
-def collect_all_receipt_ids(session: requests.Session) -> List[str]:
+def ticket_fingerprints(tickets: List[Any]) -> Dict[str, str]:
     """
-    Collect all receipt IDs from all pages efficiently.
+    Fingerprint the listing entries of tickets with a digital (HTML) receipt.
+
+    The fingerprint is a hash of all listing fields of a ticket (date, amount,
+    returns, ...), so a changed receipt can be detected without fetching it.
+
+    Args:
+        tickets: 'items' list of a tickets page
+
+    Returns:
+        dict: Receipt ID -> listing fingerprint, in page order
+    """
+    fingerprints = {}
+    for ticket in tickets:
+        if isinstance(ticket, dict):
+            if "ticket" in ticket:
+                ticket_data = ticket["ticket"]
+                receipt_id = ticket_data["id"]
+                has_html = ticket_data.get("isHtml", False)
+            else:
+                ticket_data = ticket
+                receipt_id = ticket.get("id", "")
+                has_html = ticket.get("isHtml", False)
+
+            if receipt_id and has_html:
+                listing = json.dumps(ticket_data, sort_keys=True, ensure_ascii=False)
+                fingerprints[receipt_id] = hashlib.sha256(listing.encode("utf-8")).hexdigest()
+    return fingerprints
+
+
+def extract_receipt_ids(tickets: List[Any]) -> List[str]:
+    """
+    Extract the receipt IDs of tickets with a digital (HTML) receipt.
+
+    Args:
+        tickets: 'items' list of a tickets page
+
+    Returns:
+        list: Receipt IDs in page order
+    """
+    return list(ticket_fingerprints(tickets))
+
+
+def collect_all_tickets(
+    session: requests.Session,
+    profile: Optional[LidlProfile] = None,
+    first_page: Optional[Dict[str, Any]] = None,
+) -> Dict[str, str]:
+    """
+    Collect all receipt IDs and their listing fingerprints from all pages.
 
     Args:
         session: requests.Session with authentication
+        profile: Account profile. If None, uses the settings from config.
+        first_page: Already fetched first tickets page (e.g. from the API test)
 
     Returns:
-        list: List of all receipt IDs
+        dict: Receipt ID -> listing fingerprint (see ticket_fingerprints), newest first
     """
-    all_receipt_ids = []
+    all_receipt_ids = {}
     page = 1
 
     print("Sammle alle Kassenbon-IDs mit digitalem Kassenbon über API...")
 
     while True:
-        # Get tickets for current page
-        tickets_data = get_tickets_page(session, page)
+        # Get tickets for current page (the first one may be known already)
+        if page == 1 and first_page is not None:
+            tickets_data = first_page
+        else:
+            tickets_data = get_tickets_page(session, page, profile)
 
         if not tickets_data or "items" not in tickets_data:
             break
@@ -38,18 +93,7 @@ def collect_all_receipt_ids(session: requests.Session) -> List[str]:
             break
 
         # Extract receipt IDs from tickets (only those with HTML documents)
-        for ticket in tickets:
-            if isinstance(ticket, dict):
-                if "ticket" in ticket:
-                    ticket_data = ticket["ticket"]
-                    receipt_id = ticket_data["id"]
-                    has_html = ticket_data.get("isHtml", False)
-                else:
-                    receipt_id = ticket.get("id", "")
-                    has_html = ticket.get("isHtml", False)
-
-                if receipt_id and has_html:
-                    all_receipt_ids.append(receipt_id)
+        all_receipt_ids.update(ticket_fingerprints(tickets))
 
         page += 1
 
@@ -65,24 +109,54 @@ def collect_all_receipt_ids(session: requests.Session) -> List[str]:
     return all_receipt_ids
 
 
-def process_all_tickets(session: requests.Session) -> Tuple[int, int, int]:
+def collect_all_receipt_ids(
+    session: requests.Session,
+    profile: Optional[LidlProfile] = None,
+    first_page: Optional[Dict[str, Any]] = None,
+) -> List[str]:
+    """
+    Collect all receipt IDs from all pages efficiently.
+
+    Args:
+        session: requests.Session with authentication
+        profile: Account profile. If None, uses the settings from config.
+        first_page: Already fetched first tickets page (e.g. from the API test)
+
+    Returns:
+        list: List of all receipt IDs
+    """
+    return list(collect_all_tickets(session, profile, first_page))
+
+
+def process_all_tickets(
+    session: requests.Session,
+    profile: Optional[LidlProfile] = None,
+    first_page: Optional[Dict[str, Any]] = None,
+) -> Tuple[int, int, int]:
     """
     Process all tickets efficiently by collecting IDs first, then fetching HTML.
 
     Args:
         session: requests.Session with authentication
+        profile: Account profile. If None, uses the settings from config.
+        first_page: Already fetched first tickets page (e.g. from the API test)
 
     Returns:
         tuple: (processed_count, skipped_count, total_pages)
+
+    Raises:
+        ValueError: If the receipts file is corrupt
     """
+    profile = resolve_profile(profile)
     processed_count = 0
     skipped_count = 0
 
-    # Load existing receipts to avoid duplicates
-    existing_ids, _ = load_existing_receipts()
+    # Load existing receipts to avoid duplicates (raises on a corrupt file,
+    # which new receipts would otherwise overwrite)
+    existing_ids, _ = load_existing_receipts(profile.receipts_file, strict=True)
 
-    # Collect all receipt IDs first
-    all_receipt_ids = collect_all_receipt_ids(session)
+    # Collect all receipt IDs (with their listing fingerprints) first
+    all_receipt_ids = collect_all_tickets(session, profile, first_page)
 
     print(f"Zu verarbeitende Kassenbons: {len(all_receipt_ids)}")
     print(f"Bereits vorhandene: {len(existing_ids)}")
@@ -110,29 +184,20 @@ def process_all_tickets(session: requests.Session) -> Tuple[int, int, int]:
         )
     )
 
-    # Process each new receipt
-    for i, receipt_id in enumerate(new_receipt_ids, 1):
+    # Process each new receipt (downloads overlap with parsing)
+    pacer = RequestPacer.from_profile(profile)
+    receipts = fetch_and_parse_receipts(session, new_receipt_ids, profile, pacer)
+    for i, (receipt_id, receipt_data) in enumerate(receipts, 1):
         current_receipt = receipt_id
-        progress.render(
-            ProgressState(
-                current=i - 1,
-                total=total_new,
-                added=processed_count,
-                skipped=skipped_count,
-                errors=error_count,
-                items=total_items,
-                current_receipt=current_receipt,
-            )
-        )
-
-        # Get receipt details and HTML
-        receipt_data = get_receipt_details_and_html(session, receipt_id)
 
         if receipt_data and receipt_data["items"]:
-            add_receipt_to_json(receipt_data, verbose=False)
+            receipt_data["listing_hash"] = all_receipt_ids[receipt_id]
+            add_receipt_to_json(receipt_data, verbose=False, file_path=profile.receipts_file)
+            METRICS.counter("receipts_added_total", "Receipts stored").inc()
             processed_count += 1
             total_items += len(receipt_data["items"])
         else:
+            METRICS.counter("receipts_failed_total", "Receipts skipped due to errors").inc()
             skipped_count += 1
             error_count += 1
 
@@ -148,9 +213,8 @@ def process_all_tickets(session: requests.Session) -> Tuple[int, int, int]:
             )
         )
 
-        # Add pause between requests to be respectful
-        time.sleep(LidlConfig.REQUEST_DELAY)
-
     progress.close()
+    if pacer.requests:
+        print(pacer.summary())
 
     return processed_count, skipped_count, len(all_receipt_ids) // 10 + 1
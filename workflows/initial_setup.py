@@ -3,13 +3,16 @@
 from typing import Optional
 
 from auth import setup_and_test_session
-from storage import sort_receipts_by_date
+from config import LidlProfile, resolve_profile
+from metrics import METRICS
+from storage import load_existing_receipts, sort_receipts_by_date, archive_closed_months
 from .collector import process_all_tickets
 
 
 def initial_setup(
     auth_method: Optional[str] = None,
     cookies_file: Optional[str] = None,
+    profile: Optional[LidlProfile] = None,
 ) -> bool:
     """
     Extract all historical receipt data using the API.
@@ -18,24 +21,43 @@ def initial_setup(
         auth_method: Authentication method - 'firefox', 'chrome', 'chromium', or 'file'.
                      If None, prompts user interactively.
         cookies_file: Path to cookies file (only used when auth_method is 'file').
+        profile: Account profile. If None, uses the settings from config.
 
     Returns:
         bool: True if successful, False otherwise
     """
+    profile = resolve_profile(profile)
     print("=== INITIAL SETUP: Extrahiere alle Kassenbons ===")
 
     # Setup session with browser selection, cookie extraction, and API testing
-    session = setup_and_test_session(auth_method, cookies_file)
+    with METRICS.timer("stage_session_setup_seconds", "Cookie extraction and API test"):
+        session, first_page = setup_and_test_session(auth_method, cookies_file, profile)
     if not session:
         return False
 
     # Process all tickets
-    processed_count, skipped_count, total_pages = process_all_tickets(session)
+    with METRICS.timer("stage_process_seconds", "Receipt collection and processing"):
+        try:
+            processed_count, skipped_count, total_pages = process_all_tickets(
+                session, profile, first_page
+            )
+        except ValueError as e:  # corrupt receipts file
+            print(f"✗ {e}")
+            return False
 
     # Final sort
-    total_receipts = sort_receipts_by_date()
+    with METRICS.timer("stage_sort_seconds", "Final sort of the receipts file"):
+        total_receipts = sort_receipts_by_date(profile.receipts_file)
     print(f"Alle Kassenbons nach Datum sortiert.")
 
+    # Move closed months out of the receipts file
+    if profile.archive_hot_months:
+        archived = archive_closed_months(profile.receipts_file, profile.archive_hot_months)
+        if archived:
+            print(f"{archived} Kassenbons aus abgeschlossenen Monaten archiviert.")
+        # Receipts in the receipts file and the archive
+        total_receipts = len(load_existing_receipts(profile.receipts_file)[0])
+
     print("\n=== INITIAL SETUP ABGESCHLOSSEN ===")
     print(f"Verarbeitete Seiten: {total_pages}")
     print(f"Neue Kassenbons extrahiert: {processed_count}")
@@ -2,10 +2,15 @@
 
 from __future__ import annotations
 
+import contextvars
+import sys
+import threading
+import time
 from dataclasses import dataclass
+from typing import Optional, TextIO
 
 
-@dataclass
+@dataclass(frozen=True)
 class ProgressState:
     """Current progress metrics for rendering."""
 
@@ -18,24 +23,88 @@ class ProgressState:
     current_receipt: str = "-"
 
 
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    return f"{minutes}m{seconds:02d}s"
+
+
 class ReceiptProgressDisplay:
-    """Render a fixed 3-line progress block in the terminal."""
+    """
+    Render receipt progress from a background thread at a limited rate.
+
+    `render` only swaps in the latest state, so callers can report progress as
+    often as they like. On a terminal a fixed 3-line block is redrawn at most
+    `fps` times per second; when stdout is redirected (e.g. to a log file) a
+    one-line summary with throughput and ETA is written every
+    `summary_interval` seconds instead.
+    """
 
-    def __init__(self, bar_width: int = 35) -> None:
+    def __init__(
+        self,
+        bar_width: int = 35,
+        fps: float = 10.0,
+        summary_interval: float = 10.0,
+        stream: Optional[TextIO] = None,
+    ) -> None:
         self.bar_width = bar_width
+        self.stream = stream or sys.stdout
+        self.interactive = self.stream.isatty()
+        self.interval = 1.0 / fps if self.interactive else summary_interval
+        self._state: Optional[ProgressState] = None
+        self._drawn_state: Optional[ProgressState] = None
         self._initialized = False
+        self._started_at = time.monotonic()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
 
     def render(self, state: ProgressState) -> None:
-        """Render progress in-place using ANSI cursor control."""
+        """Publish the latest progress (drawn asynchronously by the render thread)."""
+        # Assigning a reference to an immutable state object is atomic
+        self._state = state
+        if self._thread is None:
+            # The render thread runs in the caller's context, so context-bound
+            # output settings (e.g. the account prefix of a batch run) apply
+            context = contextvars.copy_context()
+            self._thread = threading.Thread(
+                target=context.run, args=(self._run,), name="progress-display", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        if self.interactive:
+            self._draw()
+        while not self._stop.wait(self.interval):
+            self._draw()
+
+    def _draw(self) -> None:
+        state = self._state
+        if state is None or state == self._drawn_state:
+            return
+        self._drawn_state = state
+        if self.interactive:
+            self._draw_block(state)
+        else:
+            self._draw_summary(state)
+
+    def _draw_block(self, state: ProgressState) -> None:
+        """Redraw the 3-line block in-place using ANSI cursor control."""
         total = max(state.total, 1)
         fraction = min(max(state.current / total, 0.0), 1.0)
         filled = int(self.bar_width * fraction)
-        cart_pos = min(filled, self.bar_width - 1)
 
-        bar_chars = ["="] * filled + ["-"] * (self.bar_width - filled)
         if self.bar_width > 0:
-            bar_chars[cart_pos] = "🛒"
-        bar = "".join(bar_chars)
+            cart_pos = min(filled, self.bar_width - 1)
+            bar = (
+                "=" * min(filled, cart_pos)
+                + "🛒"
+                + "=" * max(filled - cart_pos - 1, 0)
+                + "-" * (self.bar_width - max(filled, cart_pos + 1))
+            )
+        else:
+            bar = ""
         percentage = fraction * 100
 
         line1 = f"[{bar}] {state.current}/{state.total} ({percentage:5.1f}%)"
@@ -45,16 +114,35 @@ class ReceiptProgressDisplay:
         )
         line3 = f"Aktuell: {state.current_receipt}"
 
-        if self._initialized:
-            print("\033[3F", end="")
-        else:
-            self._initialized = True
+        cursor_up = "\033[3F" if self._initialized else ""
+        self._initialized = True
+        self.stream.write(
+            f"{cursor_up}\r\033[K{line1}\n\r\033[K{line2}\n\r\033[K{line3}\n"
+        )
+        self.stream.flush()
 
-        print(f"\r\033[K{line1}")
-        print(f"\r\033[K{line2}")
-        print(f"\r\033[K{line3}", flush=True)
+    def _draw_summary(self, state: ProgressState) -> None:
+        """Write a single log-friendly progress line with throughput and ETA."""
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        rate = state.current / elapsed
+        if rate > 0:
+            eta = _format_duration(max(state.total - state.current, 0) / rate)
+        else:
+            eta = "?"
+        self._initialized = True
+        self.stream.write(
+            f"Fortschritt: {state.current}/{state.total} | Neu: {state.added} "
+            f"| Fehler: {state.errors} | Artikel: {state.items} "
+            f"| {rate:.2f} Kassenbons/s | ETA {eta}\n"
+        )
+        self.stream.flush()
 
     def close(self) -> None:
-        """Finalize rendering and move to the next line."""
-        if self._initialized:
-            print()
+        """Stop the render thread, draw the final state and move to the next line."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._draw()
+        if self._initialized and self.interactive:
+            self.stream.write("\n")
+            self.stream.flush()
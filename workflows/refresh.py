@@ -0,0 +1,217 @@
+"""Refresh workflow re-fetching changed and re-parsing outdated receipts."""
+
+from typing import Any, Dict, Optional, Set, Tuple
+
+from config import LidlProfile, resolve_profile
+from metrics import METRICS
+from parsing import PARSER_VERSION
+from auth import setup_and_test_session
+from api import fetch_receipt_source_paced, parse_receipt_source, RequestPacer
+from storage import (
+    load_existing_receipts,
+    with_archived,
+    add_receipt_to_json,
+    replace_receipts,
+    sort_receipts_by_date,
+    archive_closed_months,
+    load_receipt_source,
+    save_receipt_source,
+    source_hash,
+)
+from .collector import collect_all_tickets
+from .progress_display import ReceiptProgressDisplay, ProgressState
+
+
+def _stored_receipts(receipts_file: str) -> Dict[str, Dict[str, Any]]:
+    """All stored receipts (including archived ones) by receipt ID."""
+    _, receipts = load_existing_receipts(receipts_file)
+    return {
+        receipt.get("id") or receipt.get("url", ""): receipt
+        for receipt in with_archived(receipts, receipts_file)
+    }
+
+
+def _parsed_content(receipt: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in receipt.items() if key != "parser_version"}
+
+
+def reparse_stale_receipts(profile: LidlProfile) -> Tuple[int, int, Set[str]]:
+    """
+    Re-parse stored receipts of an older parser version from the source cache.
+
+    All re-parsed receipts are stored in one pass (see replace_receipts); the
+    derived files are only rebuilt if a receipt parsed to different data.
+
+    Args:
+        profile: Account profile
+
+    Returns:
+        tuple: (number of re-parsed receipts, number of those whose data changed,
+               IDs of outdated receipts without cached source)
+    """
+    replacements = []
+    changed = 0
+    missing = set()
+    for receipt_id, receipt in _stored_receipts(profile.receipts_file).items():
+        if receipt.get("parser_version") == PARSER_VERSION:
+            continue
+
+        source = load_receipt_source(receipt_id, profile.receipts_file)
+        if source is None:
+            missing.add(receipt_id)
+            continue
+
+        try:
+            receipt_data = parse_receipt_source(source)
+        except Exception as e:
+            print(f"  Kassenbon {receipt_id} konnte nicht geparst werden: {e}")
+            continue
+        if not receipt_data["items"]:
+            continue
+
+        if "listing_hash" in receipt:
+            receipt_data["listing_hash"] = receipt["listing_hash"]
+        METRICS.counter("receipts_reparsed_total", "Receipts re-parsed from cached sources").inc()
+        replacements.append(receipt_data)
+        if _parsed_content(receipt_data) != _parsed_content(receipt):
+            changed += 1
+
+    if replacements:
+        # Unchanged receipts only get the new parser version recorded
+        replace_receipts(replacements, profile.receipts_file, rebuild_derived=changed > 0)
+    return len(replacements), changed, missing
+
+
+def refresh_receipts(
+    auth_method: Optional[str] = None,
+    cookies_file: Optional[str] = None,
+    profile: Optional[LidlProfile] = None,
+    fetch: bool = True,
+) -> bool:
+    """
+    Bring all stored receipts up to date with as little work as possible.
+
+    Receipts parsed by an older parser version are re-parsed from the source
+    cache without any request. Then all tickets are listed and only those
+    whose listing entry changed (or that are new) are fetched; a fetched
+    receipt whose HTML is unchanged is not parsed again.
+
+    Args:
+        auth_method: Authentication method - 'firefox', 'chrome', 'chromium', or 'file'.
+                     If None, prompts user interactively.
+        cookies_file: Path to cookies file (only used when auth_method is 'file').
+        profile: Account profile. If None, uses the settings from config.
+        fetch: Also list the tickets and re-fetch changed receipts
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    profile = resolve_profile(profile)
+    print("=== REFRESH: Aktualisiere geänderte und veraltete Kassenbons ===")
+
+    with METRICS.timer("stage_reparse_seconds", "Re-parsing of cached receipt sources"):
+        reparsed, changed, missing = reparse_stale_receipts(profile)
+    print(
+        f"Aus dem Cache neu geparst (Parser-Version {PARSER_VERSION}): {reparsed}, "
+        f"davon mit geänderten Daten: {changed}"
+    )
+
+    fetched = unchanged = error_count = 0
+    if fetch:
+        with METRICS.timer("stage_session_setup_seconds", "Cookie extraction and API test"):
+            session, first_page = setup_and_test_session(auth_method, cookies_file, profile)
+        if not session:
+            return False
+
+        listing = collect_all_tickets(session, profile, first_page)
+        stored = _stored_receipts(profile.receipts_file)
+        refresh_ids = [
+            receipt_id
+            for receipt_id, fingerprint in listing.items()
+            if receipt_id not in stored
+            or stored[receipt_id].get("listing_hash") != fingerprint
+            or receipt_id in missing
+            # Stored before the store object was kept (see store dimension)
+            or "store_info" not in stored[receipt_id]
+        ]
+        print(f"Neue oder geänderte Kassenbons: {len(refresh_ids)} von {len(listing)}")
+
+        pacer = RequestPacer.from_profile(profile)
+        progress = ReceiptProgressDisplay()
+        for i, receipt_id in enumerate(refresh_ids, 1):
+            progress.render(
+                ProgressState(
+                    current=i - 1,
+                    total=len(refresh_ids),
+                    added=fetched,
+                    skipped=unchanged,
+                    errors=error_count,
+                    items=0,
+                    current_receipt=receipt_id,
+                )
+            )
+            source = fetch_receipt_source_paced(session, receipt_id, pacer, profile)
+            if source is None:
+                error_count += 1
+                continue
+            save_receipt_source(source, profile.receipts_file)
+
+            old_receipt = stored.get(receipt_id)
+            if (
+                old_receipt is not None
+                and old_receipt.get("source_hash") == source_hash(source["html"])
+                and old_receipt.get("parser_version") == PARSER_VERSION
+            ):
+                # Same HTML and parser: only remember the new listing entry
+                # (and the store object, which older receipts lack)
+                receipt_data = dict(old_receipt)
+                receipt_data["store_info"] = source["store_info"]
+                unchanged += 1
+            else:
+                try:
+                    receipt_data = parse_receipt_source(source)
+                except Exception as e:
+                    print(f"  Kassenbon {receipt_id} konnte nicht geparst werden: {e}")
+                    error_count += 1
+                    continue
+                if not receipt_data["items"]:
+                    error_count += 1
+                    continue
+                fetched += 1
+
+            receipt_data["listing_hash"] = listing[receipt_id]
+            add_receipt_to_json(receipt_data, verbose=False, file_path=profile.receipts_file)
+
+        progress.render(
+            ProgressState(
+                current=len(refresh_ids),
+                total=len(refresh_ids),
+                added=fetched,
+                skipped=unchanged,
+                errors=error_count,
+                items=0,
+                current_receipt="-",
+            )
+        )
+        progress.close()
+        if pacer.requests:
+            print(pacer.summary())
+
+    if reparsed or fetched or unchanged:
+        with METRICS.timer("stage_sort_seconds", "Final sort of the receipts file"):
+            sort_receipts_by_date(profile.receipts_file)
+        if profile.archive_hot_months:
+            archived = archive_closed_months(profile.receipts_file, profile.archive_hot_months)
+            if archived:
+                print(f"{archived} Kassenbons aus abgeschlossenen Monaten archiviert.")
+
+    print("\n=== REFRESH ABGESCHLOSSEN ===")
+    print(f"Neu geparst (Cache): {reparsed}")
+    if fetch:
+        print(f"Neu abgerufen und geparst: {fetched}")
+        print(f"Abgerufen, HTML unverändert: {unchanged}")
+        print(f"Fehler/Uebersprungen: {error_count}")
+    elif missing:
+        print(f"Veraltet ohne Cache (erneut abrufen ohne --no-fetch): {len(missing)}")
+
+    return True
@@ -1,18 +1,65 @@
 """Update workflow for adding only new receipts."""
 
-import time
+from datetime import timedelta
 from typing import Optional
 
-from config import LidlConfig
+from config import LidlProfile, resolve_profile
+from metrics import METRICS
 from auth import setup_and_test_session
-from api import get_tickets_page, get_receipt_details_and_html
-from storage import load_existing_receipts, add_receipt_to_json, sort_receipts_by_date
+from api import get_tickets_page, fetch_and_parse_receipts, RequestPacer
+from storage import (
+    load_existing_receipts,
+    add_receipt_to_json,
+    sort_receipts_by_date,
+    archive_closed_months,
+    load_aggregates,
+    date_bounds,
+    spending_forecast,
+    spending_anomalies,
+)
+from .collector import ticket_fingerprints
 from .progress_display import ReceiptProgressDisplay, ProgressState
 
 
+def print_spending_summary(receipts_file: Optional[str] = None) -> None:
+    """Print the spending of the last week, the forecast and recent anomalies."""
+    aggregates = load_aggregates(receipts_file)
+    bounds = date_bounds(aggregates) if aggregates else None
+    if not bounds:
+        return
+
+    # Relative to the last purchase
+    last_day = bounds[1]
+    forecast = spending_forecast(aggregates, last_day)
+    week = last_day - timedelta(days=last_day.weekday())
+
+    print("\n=== AUSGABEN ===")
+    print(
+        f"Woche ab {week:%d.%m.%Y}: {forecast['week_spent'] / 100:.2f} € "
+        f"(Durchschnitt der 4 Wochen davor: {forecast['weekly_average'] / 100:.2f} €)"
+    )
+    print(
+        f"Monat {last_day:%m/%Y}: bisher {forecast['month_spent'] / 100:.2f} €, "
+        f"Prognose {forecast['month_forecast'] / 100:.2f} €"
+    )
+    print(
+        f"Prognose {forecast['next_month']:%m/%Y}: {forecast['next_month_forecast'] / 100:.2f} €"
+        + (" (saisonal angepasst)" if forecast["seasonal_factor"] else "")
+    )
+    for anomaly in spending_anomalies(aggregates)[:3]:
+        level = "hoch" if anomaly["z"] > 0 else "niedrig"
+        where = anomaly["store"] or "alle Filialen"
+        print(
+            f"Auffällig {level}: Woche ab {anomaly['week']:%d.%m.%Y} ({where}): "
+            f"{anomaly['cents'] / 100:.2f} € statt üblich {anomaly['mean'] / 100:.2f} € "
+            f"(z = {anomaly['z']:.1f})"
+        )
+
+
 def update_data(
     auth_method: Optional[str] = None,
     cookies_file: Optional[str] = None,
+    profile: Optional[LidlProfile] = None,
 ) -> bool:
     """
     Add only new receipts and sort by date at the end.
@@ -21,22 +68,41 @@ def update_data(
         auth_method: Authentication method - 'firefox', 'chrome', 'chromium', or 'file'.
                      If None, prompts user interactively.
         cookies_file: Path to cookies file (only used when auth_method is 'file').
+        profile: Account profile. If None, uses the settings from config.
 
     Returns:
         bool: True if successful, False otherwise
     """
+    profile = resolve_profile(profile)
     print("=== UPDATE: Füge neue Kassenbons hinzu ===")
 
     # Setup session with browser selection, cookie extraction, and API testing
-    session = setup_and_test_session(auth_method, cookies_file)
+    with METRICS.timer("stage_session_setup_seconds", "Cookie extraction and API test"):
+        session, first_page = setup_and_test_session(auth_method, cookies_file, profile)
     if not session:
         return False
 
-    # Collect recent receipt IDs (check first few pages)
-    recent_receipt_ids = []
+    # Load existing receipts (a corrupt file must not be overwritten by new receipts)
+    try:
+        existing_ids, _ = load_existing_receipts(profile.receipts_file, strict=True)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return False
+    print(f"Bereits vorhandene Kassenbons: {len(existing_ids)}")
+
+    # Plan the pages to check from the first page fetched by the API test
+    page_size = first_page.get("size") or len(first_page["items"])
+    total_pages = (first_page.get("totalCount", 0) + page_size - 1) // page_size
+    pages_to_check = max(min(profile.pages_to_check, total_pages), 1)
 
-    for page in range(1, LidlConfig.PAGES_TO_CHECK + 1):
-        tickets_data = get_tickets_page(session, page)
+    # Collect recent receipt IDs with their listing fingerprints (check first few pages)
+    recent_receipt_ids = {}
+
+    for page in range(1, pages_to_check + 1):
+        if page == 1:
+            tickets_data = first_page
+        else:
+            tickets_data = get_tickets_page(session, page, profile)
 
         if not tickets_data or "items" not in tickets_data:
             break
@@ -46,22 +112,12 @@ def update_data(
             break
 
         # Extract receipt IDs from tickets (only those with HTML documents)
-        for ticket in tickets:
-            if isinstance(ticket, dict):
-                if "ticket" in ticket:
-                    ticket_data = ticket["ticket"]
-                    receipt_id = ticket_data["id"]
-                    has_html = ticket_data.get("isHtml", False)
-                else:
-                    receipt_id = ticket.get("id", "")
-                    has_html = ticket.get("isHtml", False)
-
-                if receipt_id and has_html:
-                    recent_receipt_ids.append(receipt_id)
-
-    # Load existing receipts
-    existing_ids, existing_receipts = load_existing_receipts()
-    print(f"Bereits vorhandene Kassenbons: {len(existing_receipts)}")
+        page_receipt_ids = ticket_fingerprints(tickets)
+        recent_receipt_ids.update(page_receipt_ids)
+
+        # Older pages can be skipped once a page contains only stored receipts
+        if page_receipt_ids and all(rid in existing_ids for rid in page_receipt_ids):
+            break
 
     # Filter for new receipts
     new_receipt_ids = [rid for rid in recent_receipt_ids if rid not in existing_ids]
@@ -89,27 +145,20 @@ def update_data(
         )
     )
 
-    for i, receipt_id in enumerate(new_receipt_ids, 1):
+    # Downloads overlap with parsing
+    pacer = RequestPacer.from_profile(profile)
+    receipts = fetch_and_parse_receipts(session, new_receipt_ids, profile, pacer)
+    for i, (receipt_id, receipt_data) in enumerate(receipts, 1):
         current_receipt = receipt_id
-        progress.render(
-            ProgressState(
-                current=i - 1,
-                total=total_new,
-                added=processed_count,
-                skipped=skipped_count,
-                errors=error_count,
-                items=total_items,
-                current_receipt=current_receipt,
-            )
-        )
-
-        receipt_data = get_receipt_details_and_html(session, receipt_id)
 
         if receipt_data and receipt_data["items"]:
-            add_receipt_to_json(receipt_data, verbose=False)
+            receipt_data["listing_hash"] = recent_receipt_ids[receipt_id]
+            add_receipt_to_json(receipt_data, verbose=False, file_path=profile.receipts_file)
+            METRICS.counter("receipts_added_total", "Receipts stored").inc()
             processed_count += 1
             total_items += len(receipt_data["items"])
         else:
+            METRICS.counter("receipts_failed_total", "Receipts skipped due to errors").inc()
             skipped_count += 1
             error_count += 1
 
@@ -125,22 +174,34 @@ def update_data(
             )
         )
 
-        time.sleep(LidlConfig.REQUEST_DELAY)
-
     progress.close()
+    if pacer.requests:
+        print(pacer.summary())
 
     # Final sort if we added new receipts
     if processed_count > 0:
-        total_receipts = sort_receipts_by_date()
+        with METRICS.timer("stage_sort_seconds", "Final sort of the receipts file"):
+            sort_receipts_by_date(profile.receipts_file)
         print(f"\n{processed_count} neue Kassenbons hinzugefügt und sortiert.")
     else:
-        total_receipts = len(existing_receipts)
         print("\nKeine neuen Kassenbons gefunden.")
 
+    # Move closed months out of the receipts file (also after a month change
+    # without new receipts)
+    if profile.archive_hot_months:
+        archived = archive_closed_months(profile.receipts_file, profile.archive_hot_months)
+        if archived:
+            print(f"{archived} Kassenbons aus abgeschlossenen Monaten archiviert.")
+
+    # Receipts in the receipts file and the archive
+    total_receipts = len(existing_ids) + processed_count
+
     print("\n=== UPDATE ABGESCHLOSSEN ===")
     print(f"Neue Kassenbons hinzugefügt: {processed_count}")
     print(f"Fehler/Uebersprungen: {skipped_count}")
     print(f"Verarbeitete Artikel: {total_items}")
     print(f"Gesamte Kassenbons in Datei: {total_receipts}")
 
+    print_spending_summary(profile.receipts_file)
+
     return True
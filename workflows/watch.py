@@ -0,0 +1,173 @@
+"""Watch workflow keeping the receipts file in sync from a long-running process."""
+
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+import requests
+
+from config import LidlConfig, LidlProfile, resolve_profile
+from metrics import METRICS
+from auth import setup_and_test_session
+from cli.prompts import select_auth_method
+from api import get_tickets_page, fetch_and_parse_receipts
+from storage import ReceiptStore, archive_closed_months
+from .collector import ticket_fingerprints
+
+
+def find_new_receipt_ids(
+    session: requests.Session,
+    store: ReceiptStore,
+    profile: LidlProfile,
+    first_page: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, str]]:
+    """
+    Page through the tickets (newest first) until a known receipt appears.
+
+    In steady state this is a single request for the first page.
+
+    Args:
+        session: requests.Session with authentication
+        store: Receipt store with the known receipt IDs
+        profile: Account profile
+        first_page: Already fetched first tickets page (e.g. from the API test)
+
+    Returns:
+        dict: New receipt IDs (newest first) with their listing fingerprints,
+              or None if the tickets could not be fetched
+    """
+    new_receipt_ids = {}
+    page = 1
+
+    while True:
+        if page == 1 and first_page is not None:
+            tickets_data = first_page
+        else:
+            tickets_data = get_tickets_page(session, page, profile)
+        if not tickets_data or "items" not in tickets_data:
+            return None if page == 1 else new_receipt_ids
+
+        tickets = tickets_data["items"]
+        receipt_ids = ticket_fingerprints(tickets)
+        page_new_ids = {rid: listing for rid, listing in receipt_ids.items() if rid not in store}
+        new_receipt_ids.update(page_new_ids)
+
+        total_count = tickets_data.get("totalCount", 0)
+        page_size = tickets_data.get("size", 10) or 10
+        total_pages = (total_count + page_size - 1) // page_size
+
+        # A known receipt on this page means everything older is stored already
+        if not tickets or len(page_new_ids) < len(receipt_ids) or page >= total_pages:
+            return new_receipt_ids
+        page += 1
+
+
+def sync_new_receipts(
+    session: requests.Session,
+    store: ReceiptStore,
+    profile: LidlProfile,
+    first_page: Optional[Dict[str, Any]] = None,
+) -> Optional[int]:
+    """
+    Fetch and store all receipts that are not in the store yet.
+
+    Args:
+        session: requests.Session with authentication
+        store: Receipt store with the known receipt IDs
+        profile: Account profile
+        first_page: Already fetched first tickets page (e.g. from the API test)
+
+    Returns:
+        int: Number of added receipts, or None if the tickets could not be fetched
+    """
+    # Changes written by another process (e.g. a manual update) are picked up first
+    store.refresh()
+
+    new_receipt_ids = find_new_receipt_ids(session, store, profile, first_page)
+    if new_receipt_ids is None:
+        return None
+
+    added = 0
+    # Oldest first, so the newest receipt ends up at the top of the file
+    receipts = fetch_and_parse_receipts(session, reversed(list(new_receipt_ids)), profile)
+    for receipt_id, receipt_data in receipts:
+        if receipt_data and receipt_data["items"]:
+            receipt_data["listing_hash"] = new_receipt_ids[receipt_id]
+            store.add(receipt_data)
+            METRICS.counter("receipts_added_total", "Receipts stored").inc()
+            added += 1
+        else:
+            METRICS.counter("receipts_failed_total", "Receipts skipped due to errors").inc()
+
+    return added
+
+
+def watch_receipts(
+    auth_method: Optional[str] = None,
+    cookies_file: Optional[str] = None,
+    profile: Optional[LidlProfile] = None,
+    interval: float = LidlConfig.WATCH_INTERVAL,
+    jitter: float = LidlConfig.WATCH_JITTER,
+    max_cycles: Optional[int] = None,
+) -> bool:
+    """
+    Poll for new receipts on a schedule and add them incrementally.
+
+    The authenticated session and the receipt store stay loaded between polls;
+    the session is only set up again if the tickets can no longer be fetched.
+
+    Args:
+        auth_method: Authentication method - 'firefox', 'chrome', 'chromium', or 'file'.
+                     If None, uses the profile's method or prompts user interactively.
+        cookies_file: Path to cookies file (only used when auth_method is 'file').
+        profile: Account profile. If None, uses the settings from config.
+        interval: Seconds between polls
+        jitter: Random deviation of the interval as a fraction (0.1 = ±10%)
+        max_cycles: Stop after this many polls (default: run until interrupted)
+
+    Returns:
+        bool: True if the watch ended normally, False if the session setup failed
+    """
+    profile = resolve_profile(profile)
+    print("=== WATCH: Synchronisiere neue Kassenbons fortlaufend ===")
+
+    # Resolved once, so re-authenticating later never prompts in the unattended loop
+    auth_method = auth_method or profile.auth_method
+    if auth_method is None:
+        auth_method = select_auth_method()
+
+    with METRICS.timer("stage_session_setup_seconds", "Cookie extraction and API test"):
+        session, first_page = setup_and_test_session(auth_method, cookies_file, profile)
+    if not session:
+        return False
+
+    store = ReceiptStore(profile.receipts_file)
+    print(f"Bekannte Kassenbons: {len(store)}")
+    print(f"Prüfintervall: {interval:.0f}s (±{jitter:.0%}) - Beenden mit Strg+C")
+
+    cycle = 0
+    try:
+        while True:
+            cycle += 1
+            with METRICS.timer("watch_poll_seconds", "Duration of a watch sync cycle"):
+                added = sync_new_receipts(session, store, profile, first_page)
+            # The page from the API test is only current for the first cycle
+            first_page = None
+
+            timestamp = datetime.now().strftime("%H:%M:%S")
+            if added is None:
+                print(f"[{timestamp}] Tickets konnten nicht abgerufen werden, authentifiziere erneut...")
+                new_session, _ = setup_and_test_session(auth_method, cookies_file, profile)
+                session = new_session or session
+            elif added:
+                print(f"[{timestamp}] {added} neue Kassenbons hinzugefügt (gesamt: {len(store)})")
+                if profile.archive_hot_months:
+                    archive_closed_months(profile.receipts_file, profile.archive_hot_months)
+
+            if max_cycles is not None and cycle >= max_cycles:
+                break
+            time.sleep(interval * random.uniform(1 - jitter, 1 + jitter))
+    except KeyboardInterrupt:
+        print("\nWatch-Modus beendet.")
+
+    return True